@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+from latexcrop.cli import main
+
+if __name__ == "__main__":
+    # `latexcrop serve` と同じ。入出力はこのスクリプトのディレクトリ基準で解決する
+    cli_dir = Path(__file__).resolve().parent
+    sys.exit(main(["-C", str(cli_dir), "serve", *sys.argv[1:]]))
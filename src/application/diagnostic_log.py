@@ -0,0 +1,20 @@
+from typing import Callable
+
+from application.dto.compile_request import CompileRequest
+from domain.models.tex_diagnostic import TexDiagnostic
+
+
+def diagnostic_collector(
+    request: CompileRequest, lines: list[str]
+) -> Callable[[TexDiagnostic], None]:
+    """
+    診断をログ行として lines に蓄積しつつ，request.log_sink があれば逐次渡す関数を返す。
+    """
+
+    def collect(diagnostic: TexDiagnostic) -> None:
+        line = f"[TeX {diagnostic.level}] {diagnostic}"
+        lines.append(line)
+        if request.log_sink is not None:
+            request.log_sink(line)
+
+    return collect
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """
+    Attributes:
+        item_id (str): 出力ファイル名に使う識別子（パス区切りを含まないこと）
+        tex_content (str): LaTeX ソースコード全体
+        latexmkrc_content (str): latexmk 設定ファイルの内容
+        margins (Tuple[int, int, int, int]): (left, top, right, bottom) の余白設定（pt単位）
+    """
+
+    item_id: str
+    tex_content: str
+    latexmkrc_content: str
+    margins: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+    def __post_init__(self):
+        if not self.item_id or any(sep in self.item_id for sep in ("\\", "/")):
+            raise ValueError(f"Invalid batch item id: {self.item_id!r}")
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """
+    DTO that will be passed to ProcessBatchUseCase.
+
+    Attributes:
+        items (List[BatchItem]): 処理する項目のリスト
+        output_dir (Path): 出力ファイルと manifest.json を書き出すディレクトリ
+        jobs (int): 並列に実行するパイプラインの数
+        output_format (str): 'pdf' または 'svg'
+        resume (bool): 入力が変わっておらず出力が残っている項目をスキップするかどうか
+    """
+
+    items: List[BatchItem]
+    output_dir: Path
+    jobs: int = 1
+    output_format: str = "pdf"
+    resume: bool = True
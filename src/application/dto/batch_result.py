@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    """
+    Attributes:
+        item_id (str): 項目の識別子
+        status (str): 'ok', 'skipped', 'failed' のいずれか
+        input_hash (str): 入力（TeX, latexmkrc, 余白, 出力形式）のハッシュ
+        output_path (Optional[Path]): 出力ファイルへのパス
+        elapsed (float): 処理に要した秒数
+        error (Optional[str]): 失敗時のエラーメッセージ
+        logs (List[str]): 実行時に生成されたログメッセージのリスト
+    """
+
+    item_id: str
+    status: str
+    input_hash: str
+    output_path: Optional[Path] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    logs: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    DTO that will be returned from ProcessBatchUseCase.
+
+    Attributes:
+        items (List[BatchItemResult]): 入力順の項目ごとの結果
+        manifest_path (Path): 書き出した manifest.json へのパス
+    """
+
+    items: List[BatchItemResult]
+    manifest_path: Path
+
+    @property
+    def is_success(self) -> bool:
+        return all(item.status != "failed" for item in self.items)
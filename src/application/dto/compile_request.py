@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
 
 @dataclass(frozen=True)
@@ -9,7 +11,13 @@ class CompileRequest:
     Attributes:
         tex_content (str): LaTeX ソースコード全体
         latexmkrc_content (str): latexmk 設定ファイルの内容
+        workdir (Optional[Path]): 使い回す作業ディレクトリ（省略時は毎回新規作成）
+        assets (Dict[str, str]): 作業ディレクトリに配置するアセット（プロジェクト内のパス → SHA-256）
+        log_sink (Optional[Callable[[str], None]]): コンパイル中の診断を届いた順に受け取る関数
     """
 
     tex_content: str
     latexmkrc_content: str
+    workdir: Optional[Path] = None
+    assets: Dict[str, str] = field(default_factory=dict, hash=False)
+    log_sink: Optional[Callable[[str], None]] = field(default=None, compare=False)
@@ -13,7 +13,11 @@ class EmbedRequest:
     Attributes:
         pdf_path (Path): 添付対象の PDF ファイルへのパス
         embedded_files (List[EmbeddedFile]): 添付するファイルのリスト
+        linearize (bool): 出力 PDF を線形化 (Fast Web View) するかどうか
+        bundle (bool): 複数のファイルを 1 つの圧縮バンドルにまとめて添付するかどうか
     """
 
     pdf_path: Path
     embedded_files: List[EmbeddedFile]
+    linearize: bool = False
+    bundle: bool = False
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import List
+
+from domain.models.embedded_file import EmbeddedFile
+from domain.models.project_bundle import BundleEntry
+
+
+@dataclass(frozen=True)
+class ExtractFilesResult:
+    """
+    PDF に埋め込まれたファイルの一覧と，個別に取り出したファイルを保持する DTO。
+    Attributes:
+        entries: 埋め込まれたファイル（バンドル内を含む）の名前・サイズ・ハッシュ
+        files:   ExtractRequest.file_names で指定したファイル（指定順）
+    """
+    entries: List[BundleEntry]
+    files: List[EmbeddedFile]
@@ -1,15 +1,17 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 @dataclass(frozen=True)
 class ExtractRequest:
     """
     PDF から埋め込み TeX を抽出するリクエスト DTO。
     - pdf_path か pdf_bytes のどちらかを指定する。
+    - file_names は ExtractFilesUseCase で個別に取り出すファイル名（プロジェクト内の相対パス）。
     """
     pdf_path: Optional[Path] = None
     pdf_bytes: Optional[bytes] = None
+    file_names: Tuple[str, ...] = ()
 
     def __post_init__(self):
         if not (self.pdf_path or self.pdf_bytes):
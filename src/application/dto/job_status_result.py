@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class JobStatusResult:
+    """
+    DTO that will be returned from GetJobStatusUseCase.
+
+    Attributes:
+        job_id (str): ジョブ ID
+        status (str): 'queued', 'running', 'done', 'failed' のいずれか
+        attempts (int): 実行を試みた回数
+        pdf_path (Optional[Path]): 完了時の出力ファイルへのパス
+        logs (List[str]): 実行時に生成されたログメッセージのリスト
+        timings (Dict[str, float]): ステージ名ごとの所要時間（秒）
+        error (Optional[str]): 直近のエラーメッセージ
+    """
+
+    job_id: str
+    status: str
+    attempts: int = 0
+    pdf_path: Optional[Path] = None
+    logs: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
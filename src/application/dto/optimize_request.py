@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class OptimizeRequest:
+    """
+    Attributes:
+        pdf_path (Path): 入力 PDF ファイルへのパス
+        output_name (Optional[str]): 出力ファイル名（省略時は '<stem>-opt.pdf'）
+        linearize (bool): 出力 PDF を線形化 (Fast Web View) するかどうか
+    """
+    pdf_path: Path
+    output_name: Optional[str] = None
+    linearize: bool = False
@@ -1,8 +1,53 @@
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# マシン固有・プロセス内専用のため直列化しないフィールド
+_LOCAL_FIELDS = ("workdir", "log_sink")
 
 @dataclass(frozen=True)
 class PipelineRequest:
+    """
+    Attributes:
+        tex_content (str): LaTeX ソースコード全体
+        latexmkrc_content (str): latexmk 設定ファイルの内容
+        margins (Tuple[int, int, int, int]): (left, top, right, bottom) の余白設定（pt単位）
+        linearize (bool): 最終出力を線形化 (Fast Web View) するかどうか
+        output_format (str): 'pdf' または 'svg'（DVI から直接 SVG を生成する高速経路）
+        mask_color (Tuple[float, float, float]): 透過させる背景色の RGB 値 (0.0-1.0)
+        skip_stages (Tuple[str, ...]): 省略するステージ名（例: ('transparency',)）
+        split_pages (bool): 最終出力を 1 ページ 1 ファイルに分割して page_paths にも返すかどうか
+        assets (Dict[str, str]): アセットストアから作業ディレクトリに配置するファイル
+                                 （プロジェクト内のパス → SHA-256）。指定時は PDF にバンドルとして埋め込む
+        workdir (Optional[Path]): 差分コンパイル用に使い回す作業ディレクトリ
+        log_sink (Optional[Callable[[str], None]]): コンパイル中の診断を届いた順に受け取る関数
+    """
     tex_content: str
     latexmkrc_content: str
     margins: Tuple[int, int, int, int]
+    linearize: bool = False
+    output_format: str = "pdf"
+    mask_color: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+    skip_stages: Tuple[str, ...] = ()
+    split_pages: bool = False
+    assets: Dict[str, str] = field(default_factory=dict, hash=False)
+    workdir: Optional[Path] = None
+    log_sink: Optional[Callable[[str], None]] = field(default=None, compare=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        ジョブキューやワーカー間で受け渡すための JSON 互換の dict に変換する。
+        """
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in _LOCAL_FIELDS}
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in data.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PipelineRequest":
+        known = {f.name for f in fields(cls)} - set(_LOCAL_FIELDS)
+        return cls(
+            **{
+                k: tuple(v) if isinstance(v, list) else v
+                for k, v in data.items()
+                if k in known
+            }
+        )
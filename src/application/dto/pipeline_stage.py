@@ -0,0 +1,35 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from application.dto.pipeline_request import PipelineRequest
+from application.dto.process_result import ProcessResult
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """
+    パイプラインを構成する 1 ステージの宣言。
+    inputs に挙げた成果物（前段のステージの output）から output の成果物を作る。
+
+    Attributes:
+        name (str): ステージ名（timings・cache_hits・skip_stages で使う）
+        inputs (Tuple[str, ...]): 入力となる成果物の名前。先頭が処理対象のファイル
+        output (str): 出力する成果物の名前
+        run (Callable[[PipelineRequest, List[Path]], ProcessResult]):
+            inputs の順に並んだ成果物のパスを受け取り，出力を ProcessResult で返す関数
+        params (Callable[[PipelineRequest], Tuple[str, ...]]):
+            出力に影響するリクエストのパラメータ。入力の成果物とあわせてメモ化のキーになる
+        optional (bool): skip_stages で省略できるか。省略時は先頭の入力をそのまま出力とする
+        memoize (bool): 出力をキャッシュするか
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    output: str
+    run: Callable[[PipelineRequest, List[Path]], ProcessResult] = field(compare=False)
+    params: Callable[[PipelineRequest], Tuple[str, ...]] = field(
+        default=lambda req: (), compare=False
+    )
+    optional: bool = False
+    memoize: bool = True
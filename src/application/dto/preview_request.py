@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class PreviewRequest:
+    """
+    DTO that will be passed to RenderPreviewUseCase.
+
+    Attributes:
+        pdf_path (Path): プレビュー画像を生成する PDF ファイルへのパス
+        dpis (Tuple[int, ...]): 生成する解像度の一覧
+        image_format (str): 'png' または 'webp'
+    """
+
+    pdf_path: Path
+    dpis: Tuple[int, ...] = (144, 288)
+    image_format: str = "png"
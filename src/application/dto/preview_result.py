@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class PreviewResult:
+    """
+    DTO that will be returned from RenderPreviewUseCase.
+
+    Attributes:
+        images (Dict[int, List[Path]]): DPI ごとのページ順画像ファイルパス
+        logs (List[str]): 実行時に生成されたログメッセージのリスト
+    """
+
+    images: Dict[int, List[Path]]
+    logs: List[str]
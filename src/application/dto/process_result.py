@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 
 @dataclass(frozen=True)
@@ -9,10 +9,19 @@ class ProcessResult:
     DTO that will be returned from Use Cases.
 
     Attributes:
-        pdf_path (Path): 処理後の PDF ファイルへのパス
+        pdf_path (Path): 処理後の PDF ファイル（SVG 出力時は SVG ファイル）へのパス
         logs (List[str]): 実行時に生成されたログメッセージのリスト
+        is_success (bool): 処理が成功したかどうか
+        timings (Dict[str, float]): ステージ名ごとの所要時間（秒）
+        cache_hits (List[str]): キャッシュから出力を再利用したステージ名
+        page_paths (List[Path]): split_pages を指定した場合の，ページごとの PDF へのパス
+        size_metrics (Dict[str, int]): 出力サイズの最適化の前後のバイト数と削減量
     """
 
     pdf_path: Path
     logs: List[str]
     is_success: bool = True
+    timings: Dict[str, float] = field(default_factory=dict)
+    cache_hits: List[str] = field(default_factory=list)
+    page_paths: List[Path] = field(default_factory=list)
+    size_metrics: Dict[str, int] = field(default_factory=dict)
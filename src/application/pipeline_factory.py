@@ -0,0 +1,70 @@
+import os
+import tempfile
+from pathlib import Path
+
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.usecases.generate_pdf_usecase import GeneratePdfUseCase
+from application.usecases.trim_pdf_usecase import TrimPdfUseCase
+from application.usecases.embed_tex_usecase import EmbedTexUseCase
+from application.usecases.make_transparent_usecase import MakeTransparentUseCase
+from application.usecases.generate_svg_usecase import GenerateSvgUseCase
+from application.usecases.optimize_pdf_usecase import OptimizePdfUseCase
+from domain.services.latex_compile_service import LatexCompileService
+from domain.services.pdf_background_service import PdfBackgroundService
+from domain.services.pdf_bbox_service import PdfBboxService
+from domain.services.pdf_crop_service import PdfCropService
+from domain.services.pdf_embed_service import PdfEmbedService
+from domain.services.pdf_optimize_service import PdfOptimizeService
+from domain.services.pdf_transparency_service import PdfTransparencyService
+from domain.services.svg_embed_service import SvgEmbedService
+from domain.services.file_cache_service import FileCache
+from domain.services.ghostscript_service import GhostscriptService
+from domain.services.asset_store_service import AssetStore
+
+# キャッシュ類の既定の置き場所
+DEFAULT_CACHE_ROOT = Path(tempfile.gettempdir()) / "latexcrop"
+
+
+def build_pipeline_usecase(
+    cache_root: Path | None = DEFAULT_CACHE_ROOT,
+) -> ProcessPdfPipelineUseCase:
+    """
+    サービスとユースケースを組み立てて ProcessPdfPipelineUseCase を返す。
+    CLI・Web UI・ローカルサーバで同じ構成を共有するためのファクトリ。
+
+    Args:
+        cache_root: キャッシュを置くディレクトリ（None の場合はキャッシュしない）
+    """
+    svg_cache = FileCache(cache_root / "svg") if cache_root is not None else None
+    failure_cache = FileCache(cache_root / "failures") if cache_root is not None else None
+    # 余白や透過色だけを変えた再実行では，コンパイル結果と描画範囲を再利用する
+    stage_cache = FileCache(cache_root / "stages") if cache_root is not None else None
+    bbox_cache = FileCache(cache_root / "bbox") if cache_root is not None else None
+    # 画像などの入力は 1 度だけ受け取り，作業ディレクトリへはリンクで配置する
+    asset_store = AssetStore(cache_root / "assets") if cache_root is not None else None
+    # 単純な文書はエンジンを直接 1 回だけ起動する（再実行が必要なら latexmk に切り替える）
+    compile_svc = LatexCompileService(
+        svg_cache=svg_cache,
+        failure_cache=failure_cache,
+        fast_mode=True,
+        asset_store=asset_store,
+    )
+    # bbox と透過処理で libgs のインスタンスを共有し，複数ページの文書はページ範囲ごとに並列に処理する
+    workers = min(4, os.cpu_count() or 1)
+    ghostscript = GhostscriptService(pool_size=workers)
+
+    return ProcessPdfPipelineUseCase(
+        generate_uc=GeneratePdfUseCase(compile_svc),
+        trim_uc=TrimPdfUseCase(
+            PdfCropService(), PdfBboxService(bbox_cache, ghostscript, max_workers=workers)
+        ),
+        embed_uc=EmbedTexUseCase(PdfEmbedService()),
+        transparency_uc=MakeTransparentUseCase(
+            PdfTransparencyService(ghostscript, max_workers=workers), PdfBackgroundService()
+        ),
+        svg_uc=GenerateSvgUseCase(compile_svc, SvgEmbedService()),
+        cache=stage_cache,
+        asset_store=asset_store,
+        # 配信・保存するサイズを抑える（skip_stages=('optimize',) で省略できる）
+        optimize_uc=OptimizePdfUseCase(PdfOptimizeService()),
+    )
@@ -0,0 +1,5 @@
+def build_tex_content(preamble: str, body: str) -> str:
+    """
+    プリアンブルと本文から，コンパイルする TeX ソース全体を組み立てる。
+    """
+    return preamble + "\n\\begin{document}\n" + body + "\n\\end{document}\n"
@@ -0,0 +1,82 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from application.dto.pipeline_request import PipelineRequest
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from domain.services.compile_cluster_service import ClusterClient
+
+
+class ClusterWorkerUseCase:
+    """
+    コーディネータに接続し，割り当てられた PipelineRequest をローカルで実行して
+    結果のバイト列とステージごとの所要時間を返すワーカー。
+    コンパイルに成功したプリアンブルのキーを覚えておき，再接続時の登録で通知する。
+    """
+
+    def __init__(
+        self,
+        pipeline_uc: ProcessPdfPipelineUseCase,
+        capacity: int | None = None,
+        worker_id: str | None = None,
+        secret: str | None = None,
+    ):
+        self.pipeline_uc = pipeline_uc
+        self.secret = secret
+        self.capacity = capacity or os.cpu_count() or 1
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._preambles: set[str] = set()
+        self._preambles_lock = threading.Lock()
+
+    def run(self, host: str, port: int) -> int:
+        """
+        コーディネータが切断するまでジョブを処理する。
+
+        Returns:
+            処理したジョブの数
+        """
+        with self._preambles_lock:
+            preambles = sorted(self._preambles)
+        client = ClusterClient(
+            host, port, self.worker_id, self.capacity, preambles, secret=self.secret
+        )
+        processed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.capacity) as pool:
+                client.pull(self.capacity)
+                while (job := client.receive()) is not None:
+                    pool.submit(self._run_job, client, job)
+                    processed += 1
+        finally:
+            client.close()
+        return processed
+
+    def _run_job(self, client: ClusterClient, job: dict) -> None:
+        start = time.perf_counter()
+        try:
+            request = PipelineRequest.from_dict(job["request"])
+            result = self.pipeline_uc.execute(request)
+            data = result.pdf_path.read_bytes()
+            result.pdf_path.unlink(missing_ok=True)
+            if result.is_success:
+                with self._preambles_lock:
+                    self._preambles.add(job.get("affinity_key", ""))
+            client.send_result(
+                job["job_id"],
+                ok=result.is_success,
+                data=data,
+                logs=result.logs,
+                timings={**result.timings, "worker": time.perf_counter() - start},
+                error=None if result.is_success else "Pipeline reported failure.",
+            )
+        except Exception as e:
+            try:
+                client.send_result(job["job_id"], ok=False, error=str(e))
+            except OSError:
+                return
+        try:
+            client.pull(1)
+        except OSError:
+            pass
@@ -20,7 +20,16 @@ class EmbedTexUseCase:
         logs.append("Validated PdfDocument.")
 
         # 添付実行
-        embedded = self.embed_service.embed(pdf_doc, request.embedded_files)
+        embedded = self.embed_service.embed(
+            pdf_doc,
+            request.embedded_files,
+            linearize=request.linearize,
+            bundle=request.bundle,
+        )
         logs.append(f"Embedded files into PDF at {embedded.path}")
+        if request.bundle:
+            logs.append(f"Bundled {len(request.embedded_files)} file(s) into one attachment.")
+        if request.linearize:
+            logs.append("Linearized PDF for fast web view.")
 
         return ProcessResult(pdf_path=embedded.path, logs=logs)
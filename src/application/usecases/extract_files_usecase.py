@@ -0,0 +1,26 @@
+from application.dto.extract_request import ExtractRequest
+from application.dto.extract_files_result import ExtractFilesResult
+from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_extract_service import PdfExtractService
+
+
+class ExtractFilesUseCase:
+    """
+    ユースケース：PDF に埋め込まれたファイル（プロジェクトのバンドルを含む）を一覧し，
+    指定したファイルだけを取り出す。
+    """
+
+    def __init__(self, extract_service: PdfExtractService):
+        self.extract_service = extract_service
+
+    def execute(self, request: ExtractRequest) -> ExtractFilesResult:
+        if request.pdf_bytes is not None:
+            pdf_doc = PdfDocument.from_bytes_tempfile(request.pdf_bytes)
+        else:
+            pdf_doc = PdfDocument(path=request.pdf_path)  # type: ignore
+
+        pdf_doc.validate()
+        return ExtractFilesResult(
+            entries=self.extract_service.list_files(pdf_doc),
+            files=[self.extract_service.extract_file(pdf_doc, name) for name in request.file_names],
+        )
@@ -3,19 +3,38 @@
 import re
 from application.dto.extract_request import ExtractRequest
 from application.dto.extract_result import ExtractResult
+from domain.models.embedded_file import EmbeddedFile
 from domain.models.pdf_document import PdfDocument
+from domain.models.svg_document import SvgDocument
 from domain.services.pdf_extract_service import PdfExtractService
+from domain.services.svg_extract_service import SvgExtractService
 
 class ExtractTexUseCase:
     """
-    ユースケース：PDF に埋め込まれた最初の .tex ファイルから
+    ユースケース：PDF（または SVG）に埋め込まれた最初の .tex ファイルから
     preamble と body を抽出して返却する。
     """
 
-    def __init__(self, extract_service: PdfExtractService):
+    def __init__(
+        self,
+        extract_service: PdfExtractService,
+        svg_extract_service: SvgExtractService | None = None,
+    ):
         self.extract_service = extract_service
+        self.svg_extract_service = svg_extract_service
 
     def execute(self, request: ExtractRequest) -> ExtractResult:
+        # SVG 出力から抽出する場合
+        if self.svg_extract_service is not None and self._is_svg(request):
+            if request.pdf_bytes is not None:
+                svg_path = PdfDocument.from_bytes_tempfile(
+                    request.pdf_bytes, suffix=".svg"
+                ).path
+            else:
+                svg_path = request.pdf_path  # type: ignore
+            files = self.svg_extract_service.extract(SvgDocument(path=svg_path))
+            return self._split(files)
+
         # PdfDocument をバイナリ or パスから生成
         if request.pdf_bytes is not None:
             pdf_doc = PdfDocument.from_bytes_tempfile(request.pdf_bytes)
@@ -25,6 +44,16 @@ class ExtractTexUseCase:
         pdf_doc.validate()
         # 全ての埋め込み .tex ファイルを抽出
         files = self.extract_service.extract(pdf_doc)
+        return self._split(files)
+
+    @staticmethod
+    def _is_svg(request: ExtractRequest) -> bool:
+        if request.pdf_bytes is not None:
+            return request.pdf_bytes.lstrip()[:1] == b"<"
+        return request.pdf_path is not None and request.pdf_path.suffix.lower() == ".svg"
+
+    @staticmethod
+    def _split(files: list[EmbeddedFile]) -> ExtractResult:
         if not files:
             raise ValueError("PDF内に .tex ファイルが埋め込まれていません。")
 
@@ -1,8 +1,10 @@
+from application.diagnostic_log import diagnostic_collector
 from application.dto.compile_request import CompileRequest
 from application.dto.process_result import ProcessResult
 from domain.models.tex_document import TexDocument
 from domain.models.latexmkrc_source import LatexmkrcSource
 from domain.services.latex_compile_service import LatexCompileService
+from domain.services.tex_preflight_service import TexPreflightService
 
 
 class GeneratePdfUseCase:
@@ -10,8 +12,13 @@ class GeneratePdfUseCase:
     Use Case that executes CompileRequest.
     """
 
-    def __init__(self, compile_service: LatexCompileService):
+    def __init__(
+        self,
+        compile_service: LatexCompileService,
+        preflight_service: TexPreflightService | None = None,
+    ):
         self.compile_service = compile_service
+        self.preflight_service = preflight_service or TexPreflightService()
 
     def execute(self, request: CompileRequest) -> ProcessResult:
         logs: list[str] = []
@@ -19,14 +26,30 @@ class GeneratePdfUseCase:
         tex_doc = TexDocument(content=request.tex_content)
         tex_doc.validate()
         logs.append("Validated TexDocument.")
+        # 括弧や環境の対応などを TeX を起動する前に検査する
+        warnings = self.preflight_service.validate(tex_doc)
+        logs.extend(f"[Pre-flight] {w}" for w in warnings)
+        logs.append("Passed pre-flight checks.")
 
         rc_source = LatexmkrcSource(content=request.latexmkrc_content)
         rc_source.validate()
         logs.append("Validated LatexmkrcSource.")
 
         # PDF を生成
-        result = self.compile_service.compile(tex_doc, rc_source)
+        diagnostics: list[str] = []
+        result = self.compile_service.compile(
+            tex_doc,
+            rc_source,
+            workdir=request.workdir,
+            on_diagnostic=diagnostic_collector(request, diagnostics),
+            assets=request.assets,
+        )
+        logs.extend(diagnostics)
+        if request.assets:
+            logs.append(f"Linked {len(request.assets)} asset(s) into the workdir.")
         pdf_doc = result
+        if request.workdir is not None:
+            logs.append(f"Reused warm workdir {request.workdir}.")
         logs.append(f"Generated PDF at {pdf_doc.path}")
 
         return ProcessResult(pdf_path=pdf_doc.path, logs=logs)
@@ -0,0 +1,61 @@
+from application.diagnostic_log import diagnostic_collector
+from application.dto.compile_request import CompileRequest
+from application.dto.process_result import ProcessResult
+from domain.models.embedded_file import EmbeddedFile
+from domain.models.tex_document import TexDocument
+from domain.models.latexmkrc_source import LatexmkrcSource
+from domain.services.latex_compile_service import LatexCompileService
+from domain.services.tex_preflight_service import TexPreflightService
+from domain.services.svg_embed_service import SvgEmbedService
+
+
+class GenerateSvgUseCase:
+    """
+    Use Case that executes CompileRequest via the DVI-to-SVG fast path.
+    SVG の背景は元々透明で，dvisvgm が最小のバウンディングボックスを計算するため，
+    トリミングと透過処理は不要。
+    """
+
+    def __init__(
+        self,
+        compile_service: LatexCompileService,
+        svg_embed_service: SvgEmbedService,
+        preflight_service: TexPreflightService | None = None,
+    ):
+        self.compile_service = compile_service
+        self.svg_embed_service = svg_embed_service
+        self.preflight_service = preflight_service or TexPreflightService()
+
+    def execute(self, request: CompileRequest) -> ProcessResult:
+        logs: list[str] = []
+        # 入力モデル生成と検証
+        tex_doc = TexDocument(content=request.tex_content)
+        tex_doc.validate()
+        logs.append("Validated TexDocument.")
+        # 括弧や環境の対応などを TeX を起動する前に検査する
+        warnings = self.preflight_service.validate(tex_doc)
+        logs.extend(f"[Pre-flight] {w}" for w in warnings)
+        logs.append("Passed pre-flight checks.")
+
+        rc_source = LatexmkrcSource(content=request.latexmkrc_content)
+        rc_source.validate()
+        logs.append("Validated LatexmkrcSource.")
+
+        # SVG を生成
+        diagnostics: list[str] = []
+        svg_doc = self.compile_service.compile_svg(
+            tex_doc,
+            rc_source,
+            on_diagnostic=diagnostic_collector(request, diagnostics),
+            assets=request.assets,
+            workdir=request.workdir,
+        )
+        logs.extend(diagnostics)
+        logs.append(f"Generated SVG at {svg_doc.path}")
+
+        # main.tex を SVG のメタデータとして埋め込む
+        emb_file = EmbeddedFile.from_content("main.tex", request.tex_content)
+        embedded = self.svg_embed_service.embed(svg_doc, [emb_file])
+        logs.append(f"Embedded files into SVG at {embedded.path}")
+
+        return ProcessResult(pdf_path=embedded.path, logs=logs)
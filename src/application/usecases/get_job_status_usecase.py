@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from application.dto.job_status_result import JobStatusResult
+from domain.services.job_queue_service import JobQueueService
+
+
+class GetJobStatusUseCase:
+    """
+    Use Case that looks up the status and stored result of a job.
+    """
+
+    def __init__(self, queue: JobQueueService):
+        self.queue = queue
+
+    def execute(self, job_id: str) -> JobStatusResult:
+        job = self.queue.get(job_id)
+        if job is None:
+            raise KeyError(f"Job not found: {job_id}")
+        result = job.result or {}
+        return JobStatusResult(
+            job_id=job.job_id,
+            status=job.status,
+            attempts=job.attempts,
+            pdf_path=Path(result["pdf_path"]) if "pdf_path" in result else None,
+            logs=result.get("logs", []),
+            timings=result.get("timings", {}),
+            error=job.error,
+        )
@@ -0,0 +1,99 @@
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import replace
+from pathlib import Path
+
+from application.dto.pipeline_request import PipelineRequest
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from domain.models.job import Job
+from domain.services.job_queue_service import JobQueueService
+from domain.services.latex_compile_service import LatexCompileError
+
+
+class JobWorkerUseCase:
+    """
+    キューからジョブを取得してパイプラインを実行し，結果とステージごとの所要時間を保存するワーカー。
+    実行中はリースを定期的に延長するため，長いコンパイルでも他のワーカーに横取りされない。
+    直前と同じプリアンブルのジョブを優先して取得し，workdir を指定した場合は
+    作業ディレクトリを使い回して latexmk の差分コンパイルを効かせる。
+    """
+
+    def __init__(
+        self,
+        queue: JobQueueService,
+        pipeline_uc: ProcessPdfPipelineUseCase,
+        result_dir: Path,
+        worker_id: str | None = None,
+        lease_seconds: float = 120.0,
+        workdir: Path | None = None,
+    ):
+        self.queue = queue
+        self.pipeline_uc = pipeline_uc
+        self.result_dir = result_dir
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.lease_seconds = lease_seconds
+        self.workdir = workdir
+        self._last_key: str | None = None
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+
+    def run_once(self) -> bool:
+        """
+        ジョブを 1 件処理する。
+
+        Returns:
+            ジョブを処理した場合は True，キューが空なら False
+        """
+        job = self.queue.claim(self.worker_id, self.lease_seconds, preferred_key=self._last_key)
+        if job is None:
+            return False
+        self._last_key = job.preamble_key
+        self._process(job)
+        return True
+
+    def run_forever(self, stop: threading.Event, poll_interval: float = 0.5) -> None:
+        while not stop.is_set():
+            if not self.run_once():
+                stop.wait(poll_interval)
+
+    def _process(self, job: Job) -> None:
+        stop_heartbeat = threading.Event()
+
+        def heartbeat() -> None:
+            while not stop_heartbeat.wait(self.lease_seconds / 3):
+                if not self.queue.extend_lease(job.job_id, self.worker_id, self.lease_seconds):
+                    return
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        start = time.perf_counter()
+        try:
+            request = PipelineRequest.from_dict(job.payload)
+            if self.workdir is not None:
+                request = replace(request, workdir=self.workdir)
+            result = self.pipeline_uc.execute(request)
+            if not result.is_success:
+                raise RuntimeError("Pipeline reported failure.")
+            dest = self.result_dir / f"{job.job_id}.{request.output_format}"
+            shutil.move(str(result.pdf_path), dest)
+        except (TypeError, ValueError, LatexCompileError) as e:
+            # 入力の誤りや TeX のエラーは再試行しても直らない
+            self.queue.fail(job.job_id, self.worker_id, str(e), retry=False)
+            return
+        except Exception as e:
+            self.queue.fail(job.job_id, self.worker_id, str(e))
+            return
+        finally:
+            stop_heartbeat.set()
+            beat.join()
+
+        self.queue.complete(
+            job.job_id,
+            self.worker_id,
+            {
+                "pdf_path": str(dest),
+                "logs": result.logs,
+                "timings": {**result.timings, "total": time.perf_counter() - start},
+            },
+        )
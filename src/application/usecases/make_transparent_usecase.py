@@ -1,18 +1,23 @@
 from application.dto.transparency_request import TransparencyRequest
 from application.dto.process_result import ProcessResult
 from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_background_service import PdfBackgroundService
 from domain.services.pdf_transparency_service import PdfTransparencyService
 
 class MakeTransparentUseCase:
     """
     PDF透過処理のユースケース
+    background_service を指定した場合，mask_color で塗られた背景がない PDF は
+    Ghostscript に通さずそのまま返す。
     """
 
     def __init__(
         self,
-        transparency_service: PdfTransparencyService
+        transparency_service: PdfTransparencyService,
+        background_service: PdfBackgroundService | None = None,
     ):
         self.transparency_service = transparency_service
+        self.background_service = background_service
 
     def execute(self, request: TransparencyRequest) -> ProcessResult:
         logs: list[str] = []
@@ -22,6 +27,13 @@ class MakeTransparentUseCase:
         pdf_doc.validate()
         logs.append(f"Validated PDF: {request.pdf_path}")
 
+        # 透過させる背景がなければ再出力しない
+        if self.background_service is not None and not self.background_service.has_background(
+            pdf_doc, request.mask_color
+        ):
+            logs.append("Skipped transparency: no background fill in mask color.")
+            return ProcessResult(pdf_path=pdf_doc.path, logs=logs)
+
         # 透過処理実行
         transp_doc = self.transparency_service.make_transparent(
             pdf_doc,
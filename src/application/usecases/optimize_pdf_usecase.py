@@ -0,0 +1,45 @@
+from application.dto.optimize_request import OptimizeRequest
+from application.dto.process_result import ProcessResult
+from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_optimize_service import PdfOptimizeService
+
+
+class OptimizePdfUseCase:
+    """
+    PDF の出力サイズを小さくするユースケース。
+    入出力のバイト数を size_metrics で返す。
+    """
+
+    def __init__(self, optimize_service: PdfOptimizeService):
+        self.optimize_service = optimize_service
+
+    def execute(self, request: OptimizeRequest) -> ProcessResult:
+        logs: list[str] = []
+
+        # 入力モデル生成と検証
+        pdf_doc = PdfDocument(path=request.pdf_path)
+        pdf_doc.validate()
+        logs.append(f"Validated PDF: {request.pdf_path}")
+
+        optimized, merged = self.optimize_service.optimize(
+            pdf_doc, output_name=request.output_name, linearize=request.linearize
+        )
+        input_bytes = pdf_doc.path.stat().st_size
+        output_bytes = optimized.path.stat().st_size
+        saved = input_bytes - output_bytes
+        if merged:
+            logs.append(f"Merged {merged} duplicate stream(s).")
+        logs.append(
+            f"Optimized PDF: {input_bytes} -> {output_bytes} bytes "
+            f"({saved / input_bytes:.1%} saved)."
+        )
+
+        return ProcessResult(
+            pdf_path=optimized.path,
+            logs=logs,
+            size_metrics={
+                "input_bytes": input_bytes,
+                "output_bytes": output_bytes,
+                "saved_bytes": saved,
+            },
+        )
@@ -0,0 +1,176 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from application.dto.batch_request import BatchItem, BatchRequest
+from application.dto.batch_result import BatchItemResult, BatchResult
+from application.dto.pipeline_request import PipelineRequest
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from domain.models.latexmkrc_source import LatexmkrcSource
+from domain.services.file_cache_service import content_hash
+from domain.services.preamble_grouping_service import PreambleGroupingService, preamble_key
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ProcessBatchUseCase:
+    """
+    複数の文書をワーカープールでパイプラインに通し，
+    項目ごとの状態と処理時間を manifest.json に記録するユースケース。
+    前回の manifest と入力ハッシュが一致し出力が残っている項目はスキップする。
+    同じプリアンブルの項目はまとめて同じワーカーで続けて処理し，作業ディレクトリを使い回す。
+    """
+
+    def __init__(
+        self,
+        pipeline_uc: ProcessPdfPipelineUseCase,
+        grouping: PreambleGroupingService | None = None,
+    ):
+        self.pipeline_uc = pipeline_uc
+        self.grouping = grouping or PreambleGroupingService()
+
+    def execute(self, request: BatchRequest) -> BatchResult:
+        if request.jobs < 1:
+            raise ValueError(f"jobs must be at least 1: {request.jobs}")
+        ids = [item.item_id for item in request.items]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Batch item ids must be unique.")
+
+        request.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = request.output_dir / MANIFEST_NAME
+        previous = self._load_manifest(manifest_path) if request.resume else {}
+
+        def run(group: list[BatchItem]) -> list[BatchItemResult]:
+            with tempfile.TemporaryDirectory(prefix="latexcrop-batch-") as workdir:
+                return [
+                    self._run_item(item, request, previous.get(item.item_id), Path(workdir))
+                    for item in group
+                ]
+
+        # グループが大きすぎてワーカーが遊ばないよう，グループの大きさを抑える
+        groups = self.grouping.group(
+            request.items,
+            self._group_key,
+            max_group=math.ceil(len(request.items) / request.jobs) or 1,
+        )
+        with ThreadPoolExecutor(max_workers=request.jobs) as pool:
+            by_id = {r.item_id: r for rs in pool.map(run, groups) for r in rs}
+        results = [by_id[item_id] for item_id in ids]
+
+        self._write_manifest(manifest_path, results)
+        return BatchResult(items=results, manifest_path=manifest_path)
+
+    @staticmethod
+    def input_hash(item: BatchItem, output_format: str) -> str:
+        # 出力には main.tex がそのまま埋め込まれるため，正規化前の内容でハッシュする
+        return content_hash(
+            item.tex_content,
+            LatexmkrcSource(content=item.latexmkrc_content).content,
+            ",".join(str(m) for m in item.margins),
+            output_format,
+        )
+
+    @staticmethod
+    def _group_key(item: BatchItem) -> str:
+        try:
+            return preamble_key(item.tex_content, item.latexmkrc_content)
+        except ValueError:
+            # 不正な項目は単独で処理して失敗させる
+            return f"invalid:{item.item_id}"
+
+    def _run_item(
+        self,
+        item: BatchItem,
+        request: BatchRequest,
+        previous: dict | None,
+        workdir: Path | None = None,
+    ) -> BatchItemResult:
+        output_path = request.output_dir / f"{item.item_id}.{request.output_format}"
+        try:
+            input_hash = self.input_hash(item, request.output_format)
+        except ValueError as e:
+            return BatchItemResult(
+                item_id=item.item_id, status="failed", input_hash="", error=str(e)
+            )
+
+        # 入力が変わっておらず出力が残っていればスキップ
+        if (
+            previous is not None
+            and previous.get("status") in ("ok", "skipped")
+            and previous.get("input_hash") == input_hash
+            and output_path.exists()
+        ):
+            return BatchItemResult(
+                item_id=item.item_id,
+                status="skipped",
+                input_hash=input_hash,
+                output_path=output_path,
+            )
+
+        start = time.perf_counter()
+        try:
+            result = self.pipeline_uc.execute(
+                PipelineRequest(
+                    tex_content=item.tex_content,
+                    latexmkrc_content=item.latexmkrc_content,
+                    margins=item.margins,
+                    output_format=request.output_format,
+                    workdir=workdir,
+                )
+            )
+            if not result.is_success:
+                raise RuntimeError("Pipeline reported failure.")
+            # 一時ディレクトリは別デバイスの場合があるため move を使う
+            shutil.move(str(result.pdf_path), output_path)
+        except Exception as e:
+            return BatchItemResult(
+                item_id=item.item_id,
+                status="failed",
+                input_hash=input_hash,
+                elapsed=time.perf_counter() - start,
+                error=str(e),
+            )
+
+        return BatchItemResult(
+            item_id=item.item_id,
+            status="ok",
+            input_hash=input_hash,
+            output_path=output_path,
+            elapsed=time.perf_counter() - start,
+            logs=result.logs,
+        )
+
+    @staticmethod
+    def _load_manifest(path: Path) -> dict[str, dict]:
+        if not path.exists():
+            return {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {entry["id"]: entry for entry in data.get("items", []) if "id" in entry}
+
+    @staticmethod
+    def _write_manifest(path: Path, results: list[BatchItemResult]) -> None:
+        data = {
+            "items": [
+                {
+                    "id": r.item_id,
+                    "status": r.status,
+                    "input_hash": r.input_hash,
+                    "output": r.output_path.name if r.output_path else None,
+                    "elapsed": round(r.elapsed, 3),
+                    "error": r.error,
+                }
+                for r in results
+            ]
+        }
+        # 書きかけの manifest が残らないよう一時ファイルから置き換える
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
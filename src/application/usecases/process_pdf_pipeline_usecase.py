@@ -1,65 +1,352 @@
+import json
+import shutil
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
 from application.dto.pipeline_request import PipelineRequest
+from application.dto.pipeline_stage import PipelineStage
 from application.dto.process_result import ProcessResult
 from application.dto.compile_request import CompileRequest
 from application.dto.crop_request import CropRequest
 from application.dto.transparency_request import TransparencyRequest
 from application.dto.embed_request import EmbedRequest
+from application.dto.optimize_request import OptimizeRequest
 from application.usecases.generate_pdf_usecase import GeneratePdfUseCase
 from application.usecases.trim_pdf_usecase import TrimPdfUseCase
 from application.usecases.embed_tex_usecase import EmbedTexUseCase
 from application.usecases.make_transparent_usecase import MakeTransparentUseCase
+from application.usecases.generate_svg_usecase import GenerateSvgUseCase
+from application.usecases.optimize_pdf_usecase import OptimizePdfUseCase
 from domain.models.embedded_file import EmbeddedFile
+from domain.models.latexmkrc_source import LatexmkrcSource
+from domain.models.tex_document import TexDocument
+from domain.models.pdf_document import PdfDocument
+from domain.services.asset_store_service import AssetStore
+from domain.services.latex_compile_service import LatexCompileService
+from domain.services.file_cache_service import FileCache, content_hash
+from domain.services.pdf_page_service import PdfPageService
+
+# メモ化したステージの出力ファイル名を記録するファイル
+_STAGE_META = "stage.json"
 
 
 class ProcessPdfPipelineUseCase:
+    """
+    PDF 出力のパイプライン。
+    ステージは成果物の依存関係として宣言する（既定は compile → crop → transparency → embed）。
+    cache を指定すると，各ステージの出力を「パラメータ + 入力の成果物のキー」のハッシュでメモ化する。
+    キーは前段のキーを含むため，パラメータが変わったステージより後ろだけが再計算される。
+    split_pages を指定すると，最終出力を 1 ページ 1 ファイルにも分割する（添付ファイルは各ページに付ける）。
+    assets を指定した場合は，main.tex とアセットを asset_store から読んで 1 つのバンドルとして埋め込む。
+    optimize_uc を指定すると，最後に出力サイズを小さくする optimize ステージを加える。
+    """
+
     def __init__(
         self,
         generate_uc: GeneratePdfUseCase,
         trim_uc: TrimPdfUseCase,
         embed_uc: EmbedTexUseCase,
         transparency_uc: MakeTransparentUseCase,
+        svg_uc: GenerateSvgUseCase | None = None,
+        cache: FileCache | None = None,
+        extra_stages: list[PipelineStage] | None = None,
+        page_service: PdfPageService | None = None,
+        asset_store: AssetStore | None = None,
+        optimize_uc: OptimizePdfUseCase | None = None,
     ):
         self.generate_uc     = generate_uc
         self.trim_uc         = trim_uc
         self.embed_uc        = embed_uc
         self.transparency_uc = transparency_uc
+        self.svg_uc          = svg_uc
+        self.cache           = cache
+        self.page_service    = page_service or PdfPageService()
+        self.asset_store     = asset_store
+        self.optimize_uc     = optimize_uc
+        self.stages          = self._validate_stages([*self.default_stages(), *(extra_stages or [])])
+
+    def default_stages(self) -> list[PipelineStage]:
+        stages = [
+            PipelineStage("compile", (), "compiled", self._compile, self._compile_params),
+            PipelineStage(
+                "crop", ("compiled",), "cropped", self._crop,
+                lambda req: (repr(req.margins),), optional=True,
+            ),
+            PipelineStage(
+                "transparency", ("cropped",), "transparent", self._make_transparent,
+                lambda req: (repr(req.mask_color),), optional=True,
+            ),
+            PipelineStage(
+                "embed", ("transparent",), "embedded", self._embed,
+                lambda req: (
+                    req.tex_content,
+                    str(req.linearize),
+                    *LatexCompileService.asset_key(req.assets),
+                ),
+                optional=True,
+            ),
+        ]
+        if self.optimize_uc is not None:
+            level = str(self.optimize_uc.optimize_service.compression_level)
+            stages.append(
+                PipelineStage(
+                    "optimize", ("embedded",), "optimized", self._optimize,
+                    lambda req: (level, str(req.linearize)), optional=True,
+                )
+            )
+        return stages
+
+    @staticmethod
+    def _validate_stages(stages: list[PipelineStage]) -> list[PipelineStage]:
+        """
+        ステージ名・成果物名が一意で，入力がすべて前段で作られることを確かめる。
+        """
+        produced: set[str] = set()
+        names: set[str] = set()
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in produced]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown artifacts: {missing}")
+            if stage.name in names or stage.output in produced:
+                raise ValueError(f"Duplicate stage or artifact: {stage.name} -> {stage.output}")
+            if stage.optional and not stage.inputs:
+                raise ValueError(f"Stage '{stage.name}' has no input to pass through when skipped.")
+            names.add(stage.name)
+            produced.add(stage.output)
+        if not stages:
+            raise ValueError("Pipeline has no stages.")
+        return stages
 
     def execute(self, req: PipelineRequest) -> ProcessResult:
+        # SVG 出力: DVI から直接変換し，トリミング・透過処理を省略
+        if req.output_format == "svg":
+            if self.svg_uc is None:
+                raise ValueError("SVG output is not configured for this pipeline.")
+            start = time.perf_counter()
+            svg_res = self.svg_uc.execute(
+                CompileRequest(
+                    tex_content=req.tex_content,
+                    latexmkrc_content=req.latexmkrc_content,
+                    workdir=req.workdir,
+                    log_sink=req.log_sink,
+                    assets=req.assets,
+                )
+            )
+            return replace(svg_res, timings={"svg": time.perf_counter() - start})
+        if req.output_format != "pdf":
+            raise ValueError(f"Unsupported output format: {req.output_format}")
+
+        skip = set(req.skip_stages)
+        unknown = skip - {stage.name for stage in self.stages}
+        if unknown:
+            raise ValueError(f"Unknown stages to skip: {sorted(unknown)}")
+        for stage in self.stages:
+            if stage.name in skip and not stage.optional:
+                raise ValueError(f"Stage '{stage.name}' cannot be skipped.")
+
         logs: list[str] = []
+        timings: dict[str, float] = {}
+        cache_hits: list[str] = []
+        size_metrics: dict[str, int] = {}
+        paths: dict[str, Path] = {}
+        keys: dict[str, str] = {}
+        reused: dict[str, tuple[ProcessResult, float]] = {}
+        needed = {stage.output for stage in self.stages}
+        if self.cache is not None:
+            keys = self._stage_keys(req, skip)
+            reused, needed = self._reuse_cached(req, skip, keys)
 
-        # 1. コンパイル
-        comp_req = CompileRequest(
-            tex_content=req.tex_content,
-            latexmkrc_content=req.latexmkrc_content
+        for stage in self.stages:
+            if stage.name in skip:
+                # 省略したステージは先頭の入力をそのまま出力とする
+                paths[stage.output] = paths.get(stage.inputs[0])
+                logs.append(f"Skipped {stage.name}.")
+                continue
+            if stage.output not in needed:
+                # 後段の出力をキャッシュから取り出したため，使われないステージ
+                continue
+            if stage.name in reused:
+                res, timings[stage.name] = reused[stage.name]
+                cache_hits.append(stage.name)
+            else:
+                inputs = [paths[name] for name in stage.inputs]
+                start = time.perf_counter()
+                res = stage.run(req, inputs)
+                if self.cache is not None and stage.memoize:
+                    self._store(keys[stage.output], res)
+                timings[stage.name] = time.perf_counter() - start
+            logs.extend(res.logs)
+            size_metrics.update(res.size_metrics)
+            paths[stage.output] = res.pdf_path
+
+        pdf_path = paths[self.stages[-1].output]
+        page_paths: list[Path] = []
+        if req.split_pages:
+            start = time.perf_counter()
+            pages = self.page_service.split(PdfDocument(path=pdf_path), keep_attachments=True)
+            page_paths = [page.path for page in pages]
+            timings["split"] = time.perf_counter() - start
+            logs.append(f"Split into {len(page_paths)} page(s).")
+
+        return ProcessResult(
+            pdf_path=pdf_path,
+            logs=logs,
+            timings=timings,
+            cache_hits=cache_hits,
+            page_paths=page_paths,
+            size_metrics=size_metrics,
         )
-        comp_res = self.generate_uc.execute(comp_req)
-        logs.extend(comp_res.logs)
 
-        # 2. トリミング
-        crop_req = CropRequest(
-            pdf_path=comp_res.pdf_path,
-            margins=req.margins
+    # --- メモ化 ---------------------------------------------------------------
+
+    def _stage_keys(self, req: PipelineRequest, skip: set[str]) -> dict[str, str]:
+        """
+        各成果物のキー（「パラメータ + 入力の成果物のキー」のハッシュ）。出力を作らなくても決まる。
+        """
+        keys: dict[str, str] = {}
+        for stage in self.stages:
+            if stage.name in skip:
+                keys[stage.output] = keys[stage.inputs[0]]
+            else:
+                keys[stage.output] = content_hash(
+                    stage.name, *stage.params(req), *(keys[name] for name in stage.inputs)
+                )
+        return keys
+
+    def _reuse_cached(
+        self, req: PipelineRequest, skip: set[str], keys: dict[str, str]
+    ) -> tuple[dict[str, tuple[ProcessResult, float]], set[str]]:
+        """
+        最終出力から逆向きに，必要な成果物ごとに最も後ろのキャッシュを探して取り出す。
+        キャッシュから取り出した成果物の入力は必要なくなるため，それより前のステージは
+        取り出しも実行もしない。他のステージが使わない成果物は常に必要とする。
+
+        Returns:
+            (ステージ名 → (キャッシュから取り出した結果, かかった時間), 必要な成果物の名前)
+        """
+        consumed = {name for stage in self.stages for name in stage.inputs}
+        needed = {stage.output for stage in self.stages if stage.output not in consumed}
+        reused: dict[str, tuple[ProcessResult, float]] = {}
+        directory: Path | None = None
+        for stage in reversed(self.stages):
+            if stage.output not in needed:
+                continue
+            if stage.name in skip:
+                needed.add(stage.inputs[0])
+                continue
+            if stage.memoize and self.cache.get(keys[stage.output]) is not None:
+                if directory is None:
+                    directory = self._materialize_dir(req)
+                start = time.perf_counter()
+                res = self._run_memoized(stage, keys[stage.output], directory)
+                if res is not None:
+                    reused[stage.name] = (res, time.perf_counter() - start)
+                    continue
+            needed.update(stage.inputs)
+        return reused, needed
+
+    @staticmethod
+    def _materialize_dir(req: PipelineRequest) -> Path:
+        """
+        キャッシュから取り出した出力を置くディレクトリ。
+        使い回す作業ディレクトリがあればその中に置き，実行のたびに増やさない。
+        """
+        if req.workdir is None:
+            return Path(tempfile.mkdtemp())
+        directory = req.workdir / "stages"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def _run_memoized(
+        self, stage: PipelineStage, key: str, directory: Path
+    ) -> ProcessResult | None:
+        """
+        Returns:
+            キャッシュにあった出力を directory に複製した結果。なければ None
+        """
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        try:
+            meta = json.loads((entry / _STAGE_META).read_text(encoding="utf-8"))
+            file_name = meta["file"]
+            # 後段の処理が出力の隣に書き込めるよう，キャッシュの外に複製する
+            path = directory / file_name
+            shutil.copy2(entry / file_name, path)
+        except (OSError, ValueError, KeyError):
+            self.cache.invalidate(key)
+            return None
+        return ProcessResult(
+            pdf_path=path,
+            logs=[f"Reused cached {stage.name} output."],
+            size_metrics=meta.get("size_metrics", {}),
         )
-        crop_res = self.trim_uc.execute(crop_req)
-        logs.extend(crop_res.logs)
 
-        # 3. 白背景透過
-        transp_req = TransparencyRequest(
-            pdf_path=crop_res.pdf_path
+    def _store(self, key: str, res: ProcessResult) -> None:
+        path = res.pdf_path
+
+        def populate(directory: Path) -> None:
+            shutil.copy2(path, directory / path.name)
+            meta = {"file": path.name, "size_metrics": res.size_metrics}
+            (directory / _STAGE_META).write_text(json.dumps(meta), encoding="utf-8")
+
+        self.cache.put(key, populate)
+
+    # --- 既定のステージ -------------------------------------------------------
+
+    def _compile_params(self, req: PipelineRequest) -> tuple[str, ...]:
+        # コメントや空白だけの違いは同じ入力とみなす（埋め込む main.tex は embed のキーで区別する）
+        # TeX Live の更新で古い PDF を返さないよう，ツールチェーンもキーに含める
+        rc_source = LatexmkrcSource(content=req.latexmkrc_content)
+        return (
+            TexDocument(content=req.tex_content).fingerprint(),
+            rc_source.fingerprint(),
+            *self.generate_uc.compile_service.toolchain(rc_source),
+            *LatexCompileService.asset_key(req.assets),
         )
-        transp_res = self.transparency_uc.execute(transp_req)
-        logs.extend(transp_res.logs)
-
-        # 4. TeX 埋め込み（tex_content から自動で EmbeddedFile を作成）
-        emb_file = EmbeddedFile.from_content("main.tex", req.tex_content)
-        embed_req = EmbedRequest(
-            pdf_path=transp_res.pdf_path,
-            embedded_files=[emb_file]
+
+    def _compile(self, req: PipelineRequest, inputs: list[Path]) -> ProcessResult:
+        return self.generate_uc.execute(
+            CompileRequest(
+                tex_content=req.tex_content,
+                latexmkrc_content=req.latexmkrc_content,
+                workdir=req.workdir,
+                log_sink=req.log_sink,
+                assets=req.assets,
+            )
         )
-        embed_res = self.embed_uc.execute(embed_req)
-        logs.extend(embed_res.logs)
 
-        return ProcessResult(
-            pdf_path=embed_res.pdf_path,
-            logs=logs
+    def _crop(self, req: PipelineRequest, inputs: list[Path]) -> ProcessResult:
+        return self.trim_uc.execute(CropRequest(pdf_path=inputs[0], margins=req.margins))
+
+    def _make_transparent(self, req: PipelineRequest, inputs: list[Path]) -> ProcessResult:
+        return self.transparency_uc.execute(
+            TransparencyRequest(pdf_path=inputs[0], mask_color=req.mask_color)
+        )
+
+    def _embed(self, req: PipelineRequest, inputs: list[Path]) -> ProcessResult:
+        # tex_content から自動で EmbeddedFile を作成
+        files = [EmbeddedFile.from_content("main.tex", req.tex_content)]
+        if req.assets:
+            if self.asset_store is None:
+                raise ValueError("Assets were given but no asset store is configured.")
+            # 画像や \input するファイルも含め，プロジェクト全体を 1 つのバンドルにする
+            files += [
+                EmbeddedFile(name=name, data=self.asset_store.read(digest))
+                for name, digest in sorted(req.assets.items())
+            ]
+        return self.embed_uc.execute(
+            EmbedRequest(
+                pdf_path=inputs[0],
+                embedded_files=files,
+                linearize=req.linearize,
+                bundle=bool(req.assets),
+            )
+        )
+
+    def _optimize(self, req: PipelineRequest, inputs: list[Path]) -> ProcessResult:
+        return self.optimize_uc.execute(
+            OptimizeRequest(pdf_path=inputs[0], linearize=req.linearize)
         )
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from application.dto.pipeline_request import PipelineRequest
+from application.dto.process_result import ProcessResult
+from domain.services.compile_cluster_service import ClusterCoordinator
+from domain.models.tex_document import TexDocument
+from domain.services.preamble_grouping_service import preamble_key
+from domain.services.tex_preflight_service import TexPreflightService
+
+# ワーカーが応答しなくなっても execute が戻るようにする既定の待ち時間（秒）
+DEFAULT_TIMEOUT = 600.0
+
+
+class RemoteCompileUseCase:
+    """
+    PipelineRequest をクラスタのワーカーで実行する Use Case。
+    ProcessPdfPipelineUseCase と同じインターフェースなので，バッチ処理などにそのまま渡せる。
+    """
+
+    def __init__(
+        self,
+        coordinator: ClusterCoordinator,
+        timeout: float = DEFAULT_TIMEOUT,
+        preflight_service: TexPreflightService | None = None,
+    ):
+        self.coordinator = coordinator
+        self.timeout = timeout
+        self.preflight_service = preflight_service or TexPreflightService()
+
+    @staticmethod
+    def affinity_key(request: PipelineRequest) -> str:
+        """
+        同じプリアンブルと latexmkrc を使うジョブを同じワーカーに寄せるためのキー。
+        """
+        return preamble_key(request.tex_content, request.latexmkrc_content)
+
+    def execute(self, request: PipelineRequest) -> ProcessResult:
+        start = time.perf_counter()
+        # 明らかに壊れた入力でワーカーのスロットを消費しない
+        self.preflight_service.validate(TexDocument(content=request.tex_content))
+        future = self.coordinator.submit(request.to_dict(), self.affinity_key(request))
+        # ワーカーでの失敗は ClusterJobError，時間切れは TimeoutError として送出される
+        try:
+            message = future.result(self.timeout)
+        except TimeoutError:
+            # まだワーカーに配られていなければ取り消し，後から空いたスロットを使わせない
+            future.cancel()
+            raise
+
+        fd, out = tempfile.mkstemp(prefix="latexcrop-remote-", suffix=f".{request.output_format}")
+        with os.fdopen(fd, "wb") as f:
+            f.write(message["data"])
+
+        timings = dict(message["timings"])
+        timings["dispatch"] = time.perf_counter() - start - timings.get("worker", 0.0)
+        return ProcessResult(
+            pdf_path=Path(out),
+            logs=[*message["logs"], f"Processed on worker {message['worker_id']}."],
+            timings=timings,
+        )
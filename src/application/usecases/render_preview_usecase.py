@@ -0,0 +1,35 @@
+from application.dto.preview_request import PreviewRequest
+from application.dto.preview_result import PreviewResult
+from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_raster_service import PdfRasterService
+
+
+class RenderPreviewUseCase:
+    """
+    Use Case that executes PreviewRequest.
+    """
+
+    def __init__(self, raster_service: PdfRasterService):
+        self.raster_service = raster_service
+
+    def execute(self, request: PreviewRequest) -> PreviewResult:
+        logs: list[str] = []
+        # 入力モデル生成と検証
+        pdf_doc = PdfDocument(path=request.pdf_path)
+        pdf_doc.validate()
+        logs.append("Validated PdfDocument.")
+
+        # DPI ごとにラスタライズ（ページ単位の並列化はサービス側で行う）
+        images = {}
+        for dpi in request.dpis:
+            pages, hit = self.raster_service.render(
+                pdf_doc, dpi=dpi, image_format=request.image_format
+            )
+            images[dpi] = pages
+            source = "cache" if hit else "Ghostscript"
+            logs.append(
+                f"Rendered {len(pages)} page(s) at {dpi} dpi "
+                f"as {request.image_format} ({source})."
+            )
+
+        return PreviewResult(images=images, logs=logs)
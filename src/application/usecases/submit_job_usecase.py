@@ -0,0 +1,31 @@
+from application.dto.pipeline_request import PipelineRequest
+from domain.models.tex_document import TexDocument
+from domain.models.latexmkrc_source import LatexmkrcSource
+from domain.services.job_queue_service import JobQueueService
+from domain.services.preamble_grouping_service import preamble_key
+from domain.services.tex_preflight_service import TexPreflightService
+
+
+class SubmitJobUseCase:
+    """
+    Use Case that enqueues PipelineRequests and returns their job IDs.
+    """
+
+    def __init__(self, queue: JobQueueService, preflight_service: TexPreflightService | None = None):
+        self.queue = queue
+        self.preflight_service = preflight_service or TexPreflightService()
+
+    def execute(self, request: PipelineRequest) -> str:
+        return self.execute_many([request])[0]
+
+    def execute_many(self, requests: list[PipelineRequest]) -> list[str]:
+        # 明らかに不正な入力はキューに積む前に弾く
+        for request in requests:
+            tex_doc = TexDocument(content=request.tex_content)
+            tex_doc.validate()
+            self.preflight_service.validate(tex_doc)
+            LatexmkrcSource(content=request.latexmkrc_content)
+        return self.queue.submit_many(
+            [request.to_dict() for request in requests],
+            [preamble_key(r.tex_content, r.latexmkrc_content) for r in requests],
+        )
@@ -1,16 +1,20 @@
 from application.dto.crop_request import CropRequest
 from application.dto.process_result import ProcessResult
 from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_bbox_service import PdfBboxService
 from domain.services.pdf_crop_service import PdfCropService
 
 
 class TrimPdfUseCase:
     """
     Use Case that executes CropRequest.
+    bbox_service を指定した場合は描画範囲の計算と余白の適用を分け，
+    計算結果をキャッシュから再利用する（余白だけを変えた再実行で gs を起動しない）。
     """
 
-    def __init__(self, crop_service: PdfCropService):
+    def __init__(self, crop_service: PdfCropService, bbox_service: PdfBboxService | None = None):
         self.crop_service = crop_service
+        self.bbox_service = bbox_service
 
     def execute(self, request: CropRequest) -> ProcessResult:
         logs: list[str] = []
@@ -20,7 +24,12 @@ class TrimPdfUseCase:
         logs.append("Validated PdfDocument.")
 
         # トリミング実行
-        cropped = self.crop_service.crop(pdf_doc, request.margins)
+        if self.bbox_service is None:
+            cropped = self.crop_service.crop(pdf_doc, request.margins)
+        else:
+            bboxes, hit = self.bbox_service.bbox(pdf_doc)
+            logs.append("Reused cached bounding box." if hit else "Computed bounding box.")
+            cropped = self.crop_service.crop_to_bbox(pdf_doc, bboxes, request.margins)
         logs.append(f"Cropped PDF at {cropped.path}")
 
         return ProcessResult(pdf_path=cropped.path, logs=logs)
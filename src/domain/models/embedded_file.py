@@ -2,12 +2,28 @@ from dataclasses import dataclass
 from pathlib import Path
 
 
+def validate_project_path(name: str) -> None:
+    """
+    Validate a '/'-separated path relative to the project root.
+    Raises:
+        ValueError: If name is empty, contains backslashes, is absolute,
+                    or has empty, '.' or '..' path components.
+    """
+    if not name:
+        raise ValueError("Attachment name must not be empty.")
+    if "\\" in name:
+        raise ValueError("Attachment name must use '/' as the path separator.")
+    if any(part in ("", ".", "..") for part in name.split("/")):
+        raise ValueError(f"Attachment name must be a relative path inside the project: {name}")
+
+
 @dataclass(frozen=True)
 class EmbeddedFile:
     """
     Domain model for an embedded file attachment.
     Attributes:
-        name (str): Filename of the attachment.
+        name (str): Filename of the attachment, or a '/'-separated path relative to
+                    the project root (e.g. 'figures/plot.pdf') for multi-file projects.
         data (bytes): Binary content of the attachment.
     """
 
@@ -21,22 +37,16 @@ class EmbeddedFile:
         """
         Validate the embedded file's metadata.
         Raises:
-            ValueError: If name is empty, contains path separators,
-                        or does not have a .tex extension.
+            ValueError: If name is not a valid project path (see validate_project_path).
         """
-        if not self.name:
-            raise ValueError("Attachment name must not be empty.")
-        if any(sep in self.name for sep in ("\\", "/")):
-            raise ValueError("Attachment name must not contain path separators.")
-        if not self.name.lower().endswith(".tex"):
-            raise ValueError("Embedded file must have a .tex extension.")
+        validate_project_path(self.name)
 
     @classmethod
     def from_path(cls, path: Path) -> "EmbeddedFile":
         """
         Create an EmbeddedFile from a filesystem path.
         Args:
-            path (Path): Path to a .tex file.
+            path (Path): Path to a file.
         Returns:
             EmbeddedFile: Instance with loaded content.
         Raises:
@@ -64,13 +74,14 @@ class EmbeddedFile:
 
     def write_to(self, directory: Path) -> Path:
         """
-        Write the embedded file's content into the given directory.
+        Write the embedded file's content into the given directory,
+        creating subdirectories for nested names.
         Args:
             directory (Path): Target directory.
         Returns:
             Path: Path to the written file.
         """
-        directory.mkdir(parents=True, exist_ok=True)
         dest = directory / self.name
+        dest.parent.mkdir(parents=True, exist_ok=True)
         dest.write_bytes(self.data)
         return dest
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Any
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class Job:
+    """
+    Domain model for a queued pipeline job.
+    Attributes:
+        job_id (str): Unique identifier returned on submission.
+        status (str): One of 'queued', 'running', 'done' or 'failed'.
+        payload (dict): Serialised request the worker should execute.
+        attempts (int): Number of times the job has been claimed.
+        result (dict | None): Stored result once the job is done.
+        error (str | None): Last error message, if any.
+        preamble_key (str | None): Normalised preamble + latexmkrc hash used for grouping.
+    """
+
+    job_id: str
+    status: str
+    payload: dict[str, Any]
+    attempts: int = 0
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    preamble_key: str | None = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
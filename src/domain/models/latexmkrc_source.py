@@ -1,7 +1,17 @@
+import hashlib
 from dataclasses import dataclass
 from pathlib import Path
 import re
 
+# A plain "$name = 'value';" assignment (no Perl expressions or interpolation)
+_ASSIGNMENT = re.compile(
+    r"""^\s*\$(\w+)\s*=\s*(?:'([^'\\]*)'|"([^"\\$@]*)"|(-?\d+))\s*;\s*(?:#.*)?$"""
+)
+# Perl tokens for canonical_content: quoted strings, comments and other code
+_RC_TOKEN = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|#.*|[^'"#]+""")
+_RC_SPACES = re.compile(r"\s+")
+_PUNCTUATION_SPACES = re.compile(r" ?([=;,(){}\[\]]) ?")
+
 
 @dataclass(frozen=True)
 class LatexmkrcSource:
@@ -32,6 +42,60 @@ class LatexmkrcSource:
                 "e.g. \"$latex = 'xelatex ...';\""
             )
 
+    def variables(self) -> dict[str, str] | None:
+        """
+        Parse the latexmkrc as a list of simple scalar assignments.
+        Returns:
+            dict[str, str]: Variable names (without '$') mapped to their values,
+            or None if the file contains anything else (subroutines, hooks, expressions).
+        """
+        result: dict[str, str] = {}
+        for line in self.content.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            m = _ASSIGNMENT.match(line)
+            if m is None:
+                return None
+            result[m[1]] = next(g for g in m.groups()[1:] if g is not None)
+        return result
+
+    def canonical_content(self) -> str:
+        """
+        Return the latexmkrc with differences Perl ignores removed:
+        line endings, '#' comments, blank lines and whitespace outside quotes
+        (runs collapse to one space; spaces next to punctuation are dropped).
+        Files with heredocs or $#array are returned unchanged.
+        """
+        text = self.content.replace("\r\n", "\n").replace("\r", "\n")
+        if "<<" in text or "$#" in text:
+            return text
+        lines = []
+        for line in text.split("\n"):
+            pieces = []
+            pos = 0
+            while pos < len(line) and (m := _RC_TOKEN.match(line, pos)):
+                token, pos = m.group(), m.end()
+                if token.startswith("#"):
+                    break
+                if token[0] not in "'\"":
+                    token = _PUNCTUATION_SPACES.sub(r"\1", _RC_SPACES.sub(" ", token))
+                pieces.append(token)
+            else:
+                if pos < len(line):
+                    # Unterminated quote: keep the rest as typed
+                    pieces.append(line[pos:])
+            canonical = "".join(pieces).strip()
+            if canonical:
+                lines.append(canonical)
+        return "\n".join(lines)
+
+    def fingerprint(self) -> str:
+        """
+        Return a SHA-256 digest of the canonical latexmkrc, used as a cache key.
+        """
+        return hashlib.sha256(self.canonical_content().encode("utf-8")).hexdigest()
+
     def write_to(self, directory: Path) -> Path:
         """
         Write this latexmkrc content into a file named 'latexmkrc' under the given directory.
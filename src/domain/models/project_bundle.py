@@ -0,0 +1,140 @@
+import hashlib
+import io
+import json
+import zipfile
+from dataclasses import dataclass
+
+from domain.models.embedded_file import EmbeddedFile
+
+# Attachment name of the bundle inside a PDF
+BUNDLE_NAME = "project.zip"
+# Archive member that lists the bundled files with their sizes and hashes
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+# Fixed member timestamp so that the same files always produce the same bytes
+_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class BundleEntry:
+    """
+    One file listed in a bundle manifest.
+    Attributes:
+        name (str): Path of the file relative to the project root.
+        size (int): Uncompressed size in bytes.
+        offset (int): Offset of the file's archive record within the bundle.
+        sha256 (str): Hex digest of the uncompressed content.
+    """
+
+    name: str
+    size: int
+    offset: int
+    sha256: str
+
+
+@dataclass(frozen=True)
+class ProjectBundle:
+    """
+    Domain model for a multi-file TeX project stored as a single compressed attachment.
+
+    The bundle is a ZIP archive whose members are deflated individually, plus a
+    manifest of per-file offsets and SHA-256 hashes. A single file can therefore be
+    read by seeking to its record without inflating the rest of the project.
+    Attributes:
+        data (bytes): Raw bytes of the archive.
+    """
+
+    data: bytes
+
+    @classmethod
+    def from_files(cls, files: list[EmbeddedFile], compresslevel: int = 9) -> "ProjectBundle":
+        """
+        Pack files into a bundle, keeping their order (the main file should come first).
+        Raises:
+            ValueError: If a name is duplicated or collides with the manifest.
+        """
+        names = [file.name for file in files]
+        if len(set(names)) != len(names):
+            raise ValueError("Bundled file names must be unique.")
+        if MANIFEST_NAME in names:
+            raise ValueError(f"'{MANIFEST_NAME}' is reserved for the bundle manifest.")
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            entries = []
+            for file in files:
+                file.validate()
+                digest = hashlib.sha256(file.data).hexdigest()
+                entries.append((file.name, len(file.data), buffer.tell(), digest))
+                archive.writestr(cls._member(file.name), file.data, compresslevel=compresslevel)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "files": [
+                    {"name": name, "size": size, "offset": offset, "sha256": digest}
+                    for name, size, offset, digest in entries
+                ],
+            }
+            archive.writestr(
+                cls._member(MANIFEST_NAME),
+                json.dumps(manifest, ensure_ascii=False),
+                compresslevel=compresslevel,
+            )
+        return cls(data=buffer.getvalue())
+
+    def entries(self) -> list[BundleEntry]:
+        """
+        Returns:
+            list[BundleEntry]: Files in the bundle, read from the manifest only.
+        Raises:
+            ValueError: If the data is not a bundle.
+        """
+        with self._open() as archive:
+            try:
+                manifest = json.loads(archive.read(MANIFEST_NAME))
+            except KeyError:
+                raise ValueError("Bundle has no manifest.")
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported bundle manifest version: {manifest.get('version')}")
+        return [BundleEntry(**entry) for entry in manifest["files"]]
+
+    def read(self, name: str) -> EmbeddedFile:
+        """
+        Inflate a single file from the bundle and check it against the manifest.
+        Raises:
+            FileNotFoundError: If the bundle has no such file.
+            ValueError: If the content does not match the manifest hash.
+        """
+        entry = next((e for e in self.entries() if e.name == name), None)
+        if entry is None:
+            raise FileNotFoundError(f"'{name}' is not in the bundle.")
+        with self._open() as archive:
+            return self._read(archive, entry)
+
+    def files(self) -> list[EmbeddedFile]:
+        """
+        Returns:
+            list[EmbeddedFile]: All bundled files in manifest order.
+        """
+        entries = self.entries()
+        with self._open() as archive:
+            return [self._read(archive, entry) for entry in entries]
+
+    @staticmethod
+    def _read(archive: zipfile.ZipFile, entry: BundleEntry) -> EmbeddedFile:
+        # ZipFile seeks to the member's local header and inflates only that member
+        data = archive.read(entry.name)
+        if hashlib.sha256(data).hexdigest() != entry.sha256:
+            raise ValueError(f"Bundled file '{entry.name}' does not match its manifest hash.")
+        return EmbeddedFile(name=entry.name, data=data)
+
+    def _open(self) -> zipfile.ZipFile:
+        try:
+            return zipfile.ZipFile(io.BytesIO(self.data))
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Invalid project bundle: {e}")
+
+    @staticmethod
+    def _member(name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=_EPOCH)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class SvgDocument:
+    path: Path
+
+    def validate(self) -> None:
+        """
+        Validate that:
+        - The file exists
+        - The file contains an '<svg' root element near the beginning
+        """
+        # 存在確認
+        if not self.path.exists():
+            raise FileNotFoundError(f"SVG file not found: {self.path}")
+
+        # ヘッダー検証（XML 宣言やコメントの後に <svg が現れる）
+        try:
+            with self.path.open("rb") as f:
+                head = f.read(4096)
+        except OSError as e:
+            raise ValueError(f"Cannot read file: {e}")
+        if b"<svg" not in head:
+            raise ValueError(f"File does not look like an SVG document: {self.path}")
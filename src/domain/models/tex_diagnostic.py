@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TexDiagnostic:
+    """
+    Domain model for a diagnostic parsed from a TeX log.
+    Attributes:
+        level (str): 'error', 'warning', 'badbox' or 'rerun'.
+        message (str): The message without the leading '!' or package prefix.
+        file (str | None): Source file the message refers to, if known.
+        line (int | None): Line number in that file, if known.
+    """
+
+    level: str
+    message: str
+    file: str | None = None
+    line: int | None = None
+
+    def __str__(self) -> str:
+        location = ":".join(str(p) for p in (self.file, self.line) if p is not None)
+        return f"{location}: {self.message}" if location else self.message
@@ -1,7 +1,94 @@
 import re
+import hashlib
 from dataclasses import dataclass
 from pathlib import Path
 
+# Environments whose body is not read as TeX (kept verbatim when canonicalising)
+VERBATIM_ENVIRONMENTS = frozenset(
+    {"verbatim", "verbatim*", "Verbatim", "BVerbatim", "lstlisting", "minted", "comment"}
+)
+# Constructs that change catcodes in ways the canonical form cannot follow;
+# sources using them are hashed as typed.
+_CATCODE_CHANGES = re.compile(
+    r"\\(?:catcode|obeyspaces|obeylines|url|href|nolinkurl|path|Verb|lstinline|mintinline"
+    r"|DefineVerbatimEnvironment|lstnewenvironment|newminted|newtcblisting)(?![A-Za-z@])"
+)
+_VERBATIM_SCAN = re.compile(
+    r"\\(?:(verb)(?![A-Za-z@])\*?|begin\{("
+    + "|".join(re.escape(name) for name in sorted(VERBATIM_ENVIRONMENTS))
+    + r")\}|[A-Za-z@]+|.)|%",
+    re.DOTALL,
+)
+# Everything up to the first unescaped '%' on a line
+_BEFORE_COMMENT = re.compile(r"(?:[^\\%]|\\.)*")
+_SPACES = re.compile(r"[ \t]+")
+
+
+def canonical_tex(text: str) -> str:
+    """
+    Return a canonical form of TeX source for cache keys.
+    Differences TeX does not see are removed: line endings, comment text,
+    leading/trailing/repeated spaces and repeated blank lines.
+    \\verb arguments and verbatim environments are kept as typed.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\0" in text or _CATCODE_CHANGES.search(text):
+        return text
+
+    # Protect verbatim spans with placeholders
+    spans: list[str] = []
+    pieces: list[str] = []
+    last = pos = 0
+    while m := _VERBATIM_SCAN.search(text, pos):
+        pos = m.end()
+        if m.group() == "%":
+            end = text.find("\n", pos)
+            pos = len(text) if end < 0 else end
+            continue
+        if m[1]:
+            if pos >= len(text):
+                return text
+            end = text.find(text[pos], pos + 1)
+            if end < 0 or "\n" in text[pos:end]:
+                return text
+            end += 1
+        elif m[2]:
+            closing = f"\\end{{{m[2]}}}"
+            end = text.find(closing, pos)
+            if end < 0:
+                return text
+            end += len(closing)
+        else:
+            continue
+        pieces.append(text[last : m.start()])
+        pieces.append(f"\0{len(spans)}\0")
+        spans.append(text[m.start() : end])
+        last = pos = end
+    pieces.append(text[last:])
+
+    lines: list[str] = []
+    for line in "".join(pieces).split("\n"):
+        code = _BEFORE_COMMENT.match(line).group()
+        # Comment text is dropped; a bare '%' still swallows the end of line
+        comment = "%" if len(code) < len(line) else ""
+        code = _SPACES.sub(" ", code).lstrip(" ")
+        stripped = code.rstrip(" ")
+        if stripped != code:
+            # "x %" and "x" both end in a single space; keep a control space ("\\ ")
+            backslashes = len(stripped) - len(stripped.rstrip("\\"))
+            code, comment = (stripped + " " if backslashes % 2 else stripped), ""
+        line = code + comment
+        if line == "%" or (line == "" and (not lines or lines[-1] == "")):
+            continue
+        lines.append(line)
+    while lines and lines[-1] == "":
+        lines.pop()
+
+    canonical = "\n".join(lines)
+    for i, span in enumerate(spans):
+        canonical = canonical.replace(f"\0{i}\0", span, 1)
+    return canonical
+
 
 @dataclass(frozen=True)
 class TexDocument:
@@ -23,6 +110,26 @@ class TexDocument:
                     f"TeX source: {self.content}"
                 )
 
+    @property
+    def preamble(self) -> str:
+        r"""
+        Return the part of the source before \begin{document}.
+        """
+        return self.content.split(r"\begin{document}", 1)[0]
+
+    def canonical_content(self) -> str:
+        """
+        Return the source with differences TeX ignores removed (see canonical_tex).
+        """
+        return canonical_tex(self.content)
+
+    def fingerprint(self) -> str:
+        """
+        Return a SHA-256 digest of the canonical TeX source, used as a cache key.
+        Cosmetic edits (comments, whitespace, line endings) keep the same fingerprint.
+        """
+        return hashlib.sha256(self.canonical_content().encode("utf-8")).hexdigest()
+
     def write_to(self, path: Path) -> None:
         """
         Export the TeX source to a file.
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+from domain.models.embedded_file import validate_project_path
+from domain.services.file_cache_service import FileCache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# <linux/fs.h>: 同じファイルシステム上でデータブロックを共有するコピー（reflink）
+FICLONE = 0x40049409
+
+# エントリ内のファイル名
+_DATA_NAME = "data"
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    """
+    Raises:
+        OSError: ファイルシステムが reflink に対応していない場合など
+    """
+    if fcntl is None:
+        raise OSError("reflink is not available on this platform")
+    with src.open("rb") as s, dest.open("xb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+class AssetStore:
+    """
+    画像や \\input するファイルなどを SHA-256 をキーに保存する content-addressed なストア。
+    同じ内容は 1 度だけアップロードすれば，以後はダイジェストで参照できる。
+
+    コンパイルの作業ディレクトリへは reflink → ハードリンク → コピーの順に試して配置し，
+    図の多い文書を繰り返しコンパイルしても内容を書き写さない。
+    ハードリンクでストアの内容が書き換わらないよう，保存したファイルは読み取り専用にする。
+    エントリは FileCache の LRU で管理し，参照されるたびに最終利用時刻を更新するため，
+    使われなくなったものから削除される。
+    """
+
+    def __init__(self, root: Path, max_entries: int = 4096):
+        self.cache = FileCache(root, max_entries=max_entries)
+
+    def put(self, data: bytes) -> str:
+        """
+        Returns:
+            内容の SHA-256（16 進）。既に保存されていれば書き込まない
+        """
+        digest = hashlib.sha256(data).hexdigest()
+
+        def populate(directory: Path) -> None:
+            path = directory / _DATA_NAME
+            path.write_bytes(data)
+            path.chmod(0o444)
+
+        self.cache.get_or_create(digest, populate)
+        return digest
+
+    def missing(self, digests: list[str]) -> list[str]:
+        """
+        Returns:
+            digests のうちストアにないもの（クライアントはこれだけをアップロードすればよい）
+        """
+        return [digest for digest in digests if self._find(digest) is None]
+
+    def read(self, digest: str) -> bytes:
+        return self._path(digest).read_bytes()
+
+    def materialize(self, assets: dict[str, str], workdir: Path) -> None:
+        """
+        assets（プロジェクト内のパス → ダイジェスト）を workdir に配置する。
+        使い回す作業ディレクトリで既に同じファイルを指していれば何もしない。
+
+        Raises:
+            FileNotFoundError: ストアにないダイジェストがある場合
+            ValueError: パスやダイジェストが不正な場合
+        """
+        for name, digest in sorted(assets.items()):
+            validate_project_path(name)
+            src = self._path(digest)
+            dest = workdir / name
+            if dest.exists():
+                if os.path.samefile(src, dest):
+                    continue
+                dest.unlink()
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            self._link(src, dest)
+
+    @staticmethod
+    def _link(src: Path, dest: Path) -> None:
+        try:
+            _reflink(src, dest)
+            return
+        except OSError:
+            dest.unlink(missing_ok=True)
+        try:
+            # 別のファイルシステム（EXDEV）などではコピーに切り替える
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+
+    def _find(self, digest: str) -> Path | None:
+        if not _DIGEST.match(digest):
+            raise ValueError(f"Invalid asset digest: {digest!r}")
+        entry = self.cache.get(digest)
+        if entry is None or not (entry / _DATA_NAME).is_file():
+            return None
+        return entry / _DATA_NAME
+
+    def _path(self, digest: str) -> Path:
+        path = self._find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Asset {digest} is not in the store.")
+        return path
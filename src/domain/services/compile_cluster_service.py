@@ -0,0 +1,437 @@
+import base64
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import secrets
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO
+
+# 1 メッセージ = 1 行の JSON。結果のバイト列は base64 で運ぶ
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+# プリアンブルが一致するジョブを探すときに先読みする保留中ジョブの数
+AFFINITY_LOOKAHEAD = 256
+# 接続してから登録メッセージを受け取るまでの上限（秒）
+HANDSHAKE_TIMEOUT = 10.0
+# ワーカーの切断で戻ってきたジョブを配り直す回数の上限（ワーカーを落とす入力を配り続けない）
+MAX_ATTEMPTS = 3
+
+
+class ClusterJobError(RuntimeError):
+    """
+    ワーカーでのジョブ実行が失敗した，またはジョブを実行できなかったことを表す例外。
+    """
+
+
+def _auth_digest(secret: str, nonce: str) -> str:
+    return hmac.new(secret.encode("utf-8"), nonce.encode("ascii"), hashlib.sha256).hexdigest()
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def send_message(wfile: BinaryIO, lock: threading.Lock, message: dict[str, Any]) -> None:
+    data = json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+    with lock:
+        wfile.write(data)
+        wfile.flush()
+
+
+def recv_message(rfile: BinaryIO) -> dict[str, Any] | None:
+    """
+    Returns:
+        受信したメッセージ。接続が閉じられた場合は None
+    """
+    line = rfile.readline(MAX_MESSAGE_BYTES + 1)
+    if not line:
+        return None
+    if len(line) > MAX_MESSAGE_BYTES:
+        raise ValueError("Cluster message too large.")
+    return json.loads(line)
+
+
+@dataclass
+class _ClusterJob:
+    job_id: str
+    payload: dict[str, Any]
+    affinity_key: str
+    future: Future = field(default_factory=Future)
+    submitted_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+@dataclass
+class _RemoteWorker:
+    worker_id: str
+    capacity: int
+    conn: socket.socket
+    wfile: BinaryIO
+    preambles: set[str]
+    free: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    running: dict[str, _ClusterJob] = field(default_factory=dict)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    coordinator: "ClusterCoordinator"
+
+    def handle(self) -> None:
+        # 共有シークレットの HMAC で認証する（チャレンジはリプレイを防ぐため接続ごとに変える）
+        nonce = secrets.token_hex(16)
+        self.request.settimeout(HANDSHAKE_TIMEOUT)
+        try:
+            send_message(self.wfile, threading.Lock(), {"type": "challenge", "nonce": nonce})
+            hello = recv_message(self.rfile)
+        except (OSError, ValueError):
+            return
+        if hello is None or hello.get("type") != "register":
+            return
+        if not self.coordinator._authenticate(nonce, str(hello.get("auth", ""))):
+            return
+        self.request.settimeout(None)
+        worker = self.coordinator._register(hello, self.request, self.wfile)
+        try:
+            while (message := recv_message(self.rfile)) is not None:
+                if message.get("type") == "pull":
+                    self.coordinator._on_pull(worker, int(message.get("count", 1)))
+                elif message.get("type") == "result":
+                    self.coordinator._on_result(worker, message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.coordinator._unregister(worker)
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ClusterCoordinator:
+    """
+    TCP で接続してきたワーカーにジョブを配るコーディネータ。
+
+    ワーカーは登録時に同時実行数（capacity）と，キャッシュ済みのプリアンブルのキーを通知し，
+    空きスロットの数だけ pull を送る。ジョブは空きのあるワーカーのうち，
+    同じプリアンブルをコンパイルしたことのあるワーカーへ優先的に割り当てる。
+    ただし最も古いジョブが fairness_window 秒以上待っている場合は，そちらを先に割り当てる。
+    ワーカーが切断した場合，実行中だったジョブはキューの先頭に戻して再配布する。
+    ただし max_attempts 回配っても結果が返らなかったジョブは ClusterJobError で失敗させる。
+    まだ配っていないジョブは Future.cancel() で取り消せる。
+
+    ワーカーはクライアントの latexmkrc（Perl）を実行するため，接続には secret による
+    認証を必須にできる。ループバック以外で待ち受ける場合は secret を省略できない。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fairness_window: float = 10.0,
+        secret: str | None = None,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        if not secret and not _is_loopback(host):
+            raise ValueError(f"A shared secret is required to listen on a non-loopback address: {host}")
+        self.fairness_window = fairness_window
+        self.max_attempts = max_attempts
+        self._secret = secret
+        self._lock = threading.Lock()
+        self._pending: deque[_ClusterJob] = deque()
+        self._workers: dict[str, _RemoteWorker] = {}
+        handler = type("CoordinatorHandler", (_CoordinatorHandler,), {"coordinator": self})
+        self._server = _ThreadingTCPServer((host, port), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def submit(self, payload: dict[str, Any], affinity_key: str = "") -> Future:
+        """
+        ジョブを登録する。
+
+        Returns:
+            ワーカーの結果メッセージ（data, logs, timings, worker_id）を返す Future。
+            失敗した場合は ClusterJobError を送出する
+        """
+        job = _ClusterJob(uuid.uuid4().hex, payload, affinity_key)
+        with self._lock:
+            self._pending.append(job)
+            assignments = self._dispatch()
+        self._send_jobs(assignments)
+        return job.future
+
+    def workers(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "worker_id": w.worker_id,
+                    "capacity": w.capacity,
+                    "free": w.free,
+                    "running": len(w.running),
+                    "preambles": len(w.preambles),
+                }
+                for w in self._workers.values()
+            ]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(not job.future.cancelled() for job in self._pending)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            workers = list(self._workers.values())
+            jobs = list(self._pending)
+            self._pending.clear()
+            # 実行中のジョブも結果を受け取れなくなるため失敗させる
+            for worker in workers:
+                jobs.extend(worker.running.values())
+                worker.running.clear()
+        for worker in workers:
+            try:
+                worker.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for job in jobs:
+            if not job.future.done():
+                job.future.set_exception(ClusterJobError("Coordinator closed."))
+
+    # --- ワーカー接続から呼ばれる ---------------------------------------------
+
+    def _authenticate(self, nonce: str, auth: str) -> bool:
+        if not self._secret:
+            return True
+        return hmac.compare_digest(_auth_digest(self._secret, nonce), auth)
+
+    def _register(self, hello: dict, conn: socket.socket, wfile: BinaryIO) -> _RemoteWorker:
+        worker = _RemoteWorker(
+            worker_id=str(hello.get("worker_id") or uuid.uuid4().hex),
+            capacity=max(1, int(hello.get("capacity", 1))),
+            conn=conn,
+            wfile=wfile,
+            preambles=set(hello.get("preambles", [])),
+        )
+        with self._lock:
+            # 同じ ID で再接続してきた場合は別のワーカーとして扱う
+            if worker.worker_id in self._workers:
+                worker.worker_id = f"{worker.worker_id}-{uuid.uuid4().hex[:8]}"
+            self._workers[worker.worker_id] = worker
+        send_message(wfile, worker.lock, {"type": "registered", "worker_id": worker.worker_id})
+        return worker
+
+    def _unregister(self, worker: _RemoteWorker) -> None:
+        with self._lock:
+            self._workers.pop(worker.worker_id, None)
+            orphaned = list(worker.running.values())
+            worker.running.clear()
+            worker.free = 0
+            exhausted = [job for job in orphaned if job.attempts >= self.max_attempts]
+            self._pending.extendleft(
+                reversed([job for job in orphaned if job.attempts < self.max_attempts])
+            )
+            assignments = self._dispatch()
+        for job in exhausted:
+            job.future.set_exception(
+                ClusterJobError(
+                    f"Gave up after {job.attempts} attempts; "
+                    f"worker {worker.worker_id} disconnected while running the job."
+                )
+            )
+        self._send_jobs(assignments)
+
+    def _on_pull(self, worker: _RemoteWorker, count: int) -> None:
+        with self._lock:
+            worker.free = min(worker.capacity, worker.free + count)
+            assignments = self._dispatch()
+        self._send_jobs(assignments)
+
+    def _on_result(self, worker: _RemoteWorker, message: dict) -> None:
+        with self._lock:
+            job = worker.running.pop(message.get("job_id", ""), None)
+            if job is not None and message.get("ok"):
+                worker.preambles.add(job.affinity_key)
+        if job is None:
+            return
+        if message.get("ok"):
+            job.future.set_result(
+                {
+                    "data": base64.b64decode(message.get("data") or ""),
+                    "logs": message.get("logs", []),
+                    "timings": message.get("timings", {}),
+                    "worker_id": worker.worker_id,
+                }
+            )
+        else:
+            job.future.set_exception(
+                ClusterJobError(f"{worker.worker_id}: {message.get('error', 'unknown error')}")
+            )
+
+    # --- 割り当て -------------------------------------------------------------
+
+    def _dispatch(self) -> list[tuple[_RemoteWorker, _ClusterJob]]:
+        """
+        保留中のジョブを空きのあるワーカーに割り当てる（self._lock を保持して呼ぶ）。
+        送信はロックの外で行うため，割り当て結果を返す。
+        """
+        assignments = []
+        while self._pending:
+            free = [w for w in self._workers.values() if w.free > 0]
+            if not free:
+                break
+            # プリアンブルをキャッシュしているワーカーがあればそちらを優先する
+            starving = time.monotonic() - self._pending[0].submitted_at > self.fairness_window
+            match = None if starving else next(
+                (
+                    (w, job)
+                    for job in itertools.islice(self._pending, AFFINITY_LOOKAHEAD)
+                    for w in free
+                    if job.affinity_key in w.preambles
+                ),
+                None,
+            )
+            if match is None:
+                job = self._pending[0]
+                match = (max(free, key=lambda w: w.free / w.capacity), job)
+            worker, job = match
+            self._pending.remove(job)
+            # 初めて配るときに Future を実行中にする。取り消されていれば配らずに捨てる
+            if job.attempts == 0 and not job.future.set_running_or_notify_cancel():
+                continue
+            job.attempts += 1
+            worker.free -= 1
+            worker.running[job.job_id] = job
+            assignments.append(match)
+        return assignments
+
+    def _send_jobs(self, assignments: list[tuple[_RemoteWorker, _ClusterJob]]) -> None:
+        for worker, job in assignments:
+            try:
+                send_message(
+                    worker.wfile,
+                    worker.lock,
+                    {
+                        "type": "job",
+                        "job_id": job.job_id,
+                        "affinity_key": job.affinity_key,
+                        "request": job.payload,
+                    },
+                )
+            except OSError:
+                # 切断として扱う（ハンドラ側の _unregister でジョブは再配布される）
+                try:
+                    worker.conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class ClusterClient:
+    """
+    コーディネータに接続するワーカー側のクライアント。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        worker_id: str,
+        capacity: int,
+        preambles: list[str] | None = None,
+        secret: str | None = None,
+    ):
+        """
+        Raises:
+            ConnectionError: コーディネータに登録を拒否された場合（secret の不一致など）
+        """
+        self._sock = socket.create_connection((host, port), timeout=HANDSHAKE_TIMEOUT)
+        self._rfile = self._sock.makefile("rb")
+        self._wfile = self._sock.makefile("wb")
+        self._lock = threading.Lock()
+        try:
+            challenge = recv_message(self._rfile)
+            if challenge is None or challenge.get("type") != "challenge":
+                raise ConnectionError("Coordinator did not send a challenge.")
+            self._send(
+                {
+                    "type": "register",
+                    "worker_id": worker_id,
+                    "capacity": capacity,
+                    "preambles": preambles or [],
+                    "auth": _auth_digest(secret or "", str(challenge.get("nonce", ""))),
+                }
+            )
+            registered = recv_message(self._rfile)
+            if registered is None or registered.get("type") != "registered":
+                raise ConnectionError("Coordinator rejected the registration.")
+        except BaseException:
+            self.close()
+            raise
+        self._sock.settimeout(None)
+        self.worker_id = str(registered.get("worker_id", worker_id))
+
+    def _send(self, message: dict[str, Any]) -> None:
+        send_message(self._wfile, self._lock, message)
+
+    def pull(self, count: int = 1) -> None:
+        self._send({"type": "pull", "count": count})
+
+    def receive(self) -> dict[str, Any] | None:
+        """
+        Returns:
+            {"job_id", "affinity_key", "request"}。コーディネータが切断した場合は None
+        """
+        while (message := recv_message(self._rfile)) is not None:
+            if message.get("type") == "job":
+                return message
+        return None
+
+    def send_result(
+        self,
+        job_id: str,
+        ok: bool,
+        data: bytes = b"",
+        logs: list[str] | None = None,
+        timings: dict[str, float] | None = None,
+        error: str | None = None,
+    ) -> None:
+        self._send(
+            {
+                "type": "result",
+                "job_id": job_id,
+                "ok": ok,
+                "data": base64.b64encode(data).decode("ascii"),
+                "logs": logs or [],
+                "timings": timings or {},
+                "error": error,
+            }
+        )
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        for f in (self._wfile, self._rfile):
+            try:
+                f.close()
+            except OSError:
+                pass
+        self._sock.close()
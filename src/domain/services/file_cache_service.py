@@ -0,0 +1,104 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+def content_hash(*parts: bytes | str) -> str:
+    """
+    与えられた要素列から SHA-256 の 16 進ダイジェストを計算する。
+    要素の境界が曖昧にならないよう、各要素の長さも混ぜ込む。
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class FileCache:
+    """
+    キーごとにディレクトリを 1 つ持つ、ファイルシステム上の LRU キャッシュ。
+    エントリは一時ディレクトリで作成してから rename するため、
+    読み手が書きかけのエントリを目にすることはない。
+    """
+
+    def __init__(self, root: Path, max_entries: int = 256):
+        self.root = root
+        self.max_entries = max_entries
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> Path:
+        if not key or any(sep in key for sep in ("/", "\\", ".")):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return self.root / key
+
+    def get(self, key: str) -> Path | None:
+        """
+        Returns:
+            エントリのディレクトリ。存在しない場合は None
+        """
+        entry = self._entry_path(key)
+        if not entry.is_dir():
+            return None
+        # LRU 用に最終利用時刻を更新
+        try:
+            os.utime(entry)
+        except OSError:
+            return None
+        return entry
+
+    def put(self, key: str, populate: Callable[[Path], None]) -> Path:
+        """
+        populate(tmpdir) でエントリの中身を作成し、キャッシュに登録する。
+
+        Args:
+            key: キャッシュキー（content_hash の結果など）
+            populate: 渡されたディレクトリにファイルを書き出す関数
+
+        Returns:
+            登録されたエントリのディレクトリ
+        """
+        entry = self._entry_path(key)
+        tmpdir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+        try:
+            populate(tmpdir)
+            with self._lock:
+                if entry.exists():
+                    # 並行して同じキーが作成された場合は先着を採用
+                    shutil.rmtree(tmpdir, ignore_errors=True)
+                else:
+                    tmpdir.rename(entry)
+                self._evict()
+        except BaseException:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+        return entry
+
+    def get_or_create(self, key: str, populate: Callable[[Path], None]) -> tuple[Path, bool]:
+        """
+        Returns:
+            (エントリのディレクトリ, キャッシュヒットしたかどうか)
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry, True
+        return self.put(key, populate), False
+
+    def invalidate(self, key: str) -> None:
+        shutil.rmtree(self._entry_path(key), ignore_errors=True)
+
+    def _evict(self) -> None:
+        entries = [
+            p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for stale in entries[: len(entries) - self.max_entries]:
+            shutil.rmtree(stale, ignore_errors=True)
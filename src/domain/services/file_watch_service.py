@@ -0,0 +1,144 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from pathlib import Path
+
+from domain.services.file_cache_service import content_hash
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class _Inotify:
+    """
+    libc の inotify を ctypes 経由で扱う最小限のラッパー。
+    エディタは保存時にファイルを置き換えることが多いため，親ディレクトリを監視する。
+    """
+
+    def __init__(self, directories: set[Path]):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+
+    def wait(self, timeout: float | None) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        # 溜まったイベントを読み捨てる（変更の有無は内容ハッシュで判定する）
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatchService:
+    """
+    ファイル群の変更を監視するサービス。
+    inotify が使えれば利用し，使えない環境ではポーリングにフォールバックする。
+    連続した保存はまとめ，内容ハッシュが変わった場合のみ変更として通知する。
+    """
+
+    def __init__(
+        self,
+        paths: list[Path],
+        debounce: float = 0.2,
+        poll_interval: float = 0.5,
+        use_inotify: bool = True,
+    ):
+        self.paths = paths
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._inotify: _Inotify | None = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify({p.parent for p in paths})
+            except OSError:
+                self._inotify = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def snapshot(self) -> str:
+        """
+        Returns:
+            監視対象ファイル群の内容ハッシュ（存在しないファイルは空として扱う）
+        """
+        parts: list[bytes | str] = []
+        for path in self.paths:
+            parts.append(str(path))
+            try:
+                parts.append(path.read_bytes())
+            except OSError:
+                parts.append(b"")
+        return content_hash(*parts)
+
+    def wait_for_change(self, last_hash: str) -> str:
+        """
+        内容ハッシュが last_hash から変わるまでブロックする。
+
+        Returns:
+            新しい内容ハッシュ
+        """
+        while True:
+            self._wait_event(None)
+            # 保存の連打やエディタの一時ファイル操作が落ち着くまで待つ
+            while self._wait_event(self.debounce):
+                pass
+            current = self.snapshot()
+            if current != last_hash:
+                return current
+
+    def _wait_event(self, timeout: float | None) -> bool:
+        if self._inotify is not None:
+            return self._inotify.wait(timeout)
+        return self._poll(timeout)
+
+    def _poll(self, timeout: float | None) -> bool:
+        before = self._stat_signature()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(self.poll_interval if deadline is None else min(self.poll_interval, timeout))
+            if self._stat_signature() != before:
+                return True
+        return False
+
+    def _stat_signature(self) -> tuple:
+        signature = []
+        for path in self.paths:
+            try:
+                st = path.stat()
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
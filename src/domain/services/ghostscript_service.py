@@ -0,0 +1,253 @@
+import atexit
+import ctypes
+import ctypes.util
+import queue
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from domain.services.process_runner import run_captured
+
+# <ghostscript/iapi.h>
+GS_ARG_ENCODING_UTF8 = 1
+GS_ERROR_QUIT = -101
+# ライブラリの候補（Linux / macOS / Windows）
+LIBRARY_NAMES = ("gs", "gsdll64", "gsdll32")
+# ジョブの前の VM の状態を保持する userdict のキー
+_JOB_SAVE = "LatexcropJobSave"
+
+# int (*)(void *caller_handle, char *buf, int len)
+_STDIO_FN = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(ctypes.c_char), ctypes.c_int)
+
+
+def _load_library(path: str | None) -> ctypes.CDLL:
+    name = path or next(
+        (found for n in LIBRARY_NAMES if (found := ctypes.util.find_library(n))), None
+    )
+    if name is None:
+        raise OSError("libgs not found")
+    lib = ctypes.CDLL(name)
+    lib.gsapi_new_instance.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_void_p]
+    lib.gsapi_delete_instance.argtypes = [ctypes.c_void_p]
+    lib.gsapi_delete_instance.restype = None
+    lib.gsapi_set_stdio.argtypes = [ctypes.c_void_p, _STDIO_FN, _STDIO_FN, _STDIO_FN]
+    lib.gsapi_set_arg_encoding.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.gsapi_init_with_args.argtypes = [
+        ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_char_p)
+    ]
+    lib.gsapi_run_string.argtypes = [
+        ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int)
+    ]
+    lib.gsapi_exit.argtypes = [ctypes.c_void_p]
+    return lib
+
+
+def _ps_string(text: str) -> str:
+    """PostScript の文字列リテラル"""
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped})"
+
+
+class _GhostscriptInstance:
+    """
+    libgs のインスタンス 1 つ。初期化（フォントマップ・リソースの読み込み）は生成時に 1 度だけ行い，
+    ジョブは gsapi_run_string で PostScript として流し込む。
+    ファイルの読み書きは root 以下に限る（-dSAFER のまま使う）。
+    """
+
+    def __init__(self, lib: ctypes.CDLL, root: Path):
+        self._lib = lib
+        self._output: list[bytes] = []
+        self._handle = ctypes.c_void_p()
+        if lib.gsapi_new_instance(ctypes.byref(self._handle), None) < 0:
+            raise OSError("gsapi_new_instance failed")
+
+        def write(_caller, data, length):
+            self._output.append(ctypes.string_at(data, length))
+            return length
+
+        # コールバックは ctypes のオブジェクトを保持しておかないと解放される
+        self._stdin = _STDIO_FN(lambda _caller, _buf, _len: 0)
+        self._stdout = _STDIO_FN(write)
+        lib.gsapi_set_stdio(self._handle, self._stdin, self._stdout, self._stdout)
+        lib.gsapi_set_arg_encoding(self._handle, GS_ARG_ENCODING_UTF8)
+        args = [
+            "gs",
+            "-q",
+            "-dSAFER",
+            "-dNOPAUSE",
+            "-dNODISPLAY",
+            f"--permit-file-read={root}/",
+            f"--permit-file-write={root}/",
+        ]
+        argv = (ctypes.c_char_p * len(args))(*(a.encode("utf-8") for a in args))
+        if lib.gsapi_init_with_args(self._handle, len(args), argv) < 0:
+            self.close()
+            raise OSError("gsapi_init_with_args failed")
+
+    def run(self, program: str) -> list[str]:
+        """
+        Raises:
+            subprocess.CalledProcessError: PostScript のエラーで失敗した場合
+        """
+        self._output.clear()
+        exit_code = ctypes.c_int(0)
+        code = self._lib.gsapi_run_string(
+            self._handle, program.encode("utf-8"), 0, ctypes.byref(exit_code)
+        )
+        text = b"".join(self._output).decode("utf-8", errors="replace")
+        if code < 0 and code != GS_ERROR_QUIT:
+            raise subprocess.CalledProcessError(exit_code.value or code, ["libgs"], output=text)
+        return text.splitlines()
+
+    def close(self) -> None:
+        if self._handle:
+            self._lib.gsapi_exit(self._handle)
+            self._lib.gsapi_delete_instance(self._handle)
+            self._handle = ctypes.c_void_p()
+
+
+class GhostscriptService:
+    """
+    Ghostscript のジョブ（デバイス・入出力ファイル・デバイスパラメータ）を実行するサービス。
+
+    libgs が見つかればプロセス内のインスタンスを最大 pool_size 個まで使い回し，
+    gs の起動と初期化のコストを省く。libgs がない，入出力が一時ディレクトリの外にある，
+    またはプロセス内での実行に失敗した場合は gs コマンドにフォールバックする。
+    プロセス内で失敗したジョブが gs コマンドでは成功した場合は，以後 libgs を使わない。
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        library: str | None = None,
+        root: Path | None = None,
+    ):
+        self.pool_size = pool_size
+        self.library = library
+        self.root = (root or Path(tempfile.gettempdir())).resolve()
+        self._lib: ctypes.CDLL | None = None
+        self._disabled = pool_size <= 0
+        self._idle: queue.LifoQueue[_GhostscriptInstance] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._registered = False
+
+    def run(
+        self,
+        device: str,
+        input_path: Path,
+        output_path: Path | None = None,
+        params: dict[str, int | float] | None = None,
+        setup: str | None = None,
+    ) -> list[str]:
+        """
+        Args:
+            device: 出力デバイス名（'pdfwrite', 'bbox' など）
+            params: デバイスパラメータ（-d 名前=値 に相当）
+            setup: 入力を処理する前に実行する PostScript（-c ... -f に相当）
+
+        Returns:
+            Ghostscript の出力の行（bbox デバイスの結果など）
+        Raises:
+            subprocess.CalledProcessError: 処理に失敗した場合
+        """
+        params = params or {}
+        instance = self._acquire(input_path, output_path)
+        if instance is not None:
+            try:
+                lines = instance.run(self._program(device, input_path, output_path, params, setup))
+            except subprocess.CalledProcessError:
+                self._discard(instance)
+            else:
+                self._idle.put(instance)
+                return lines
+
+            lines = self._run_process(device, input_path, output_path, params, setup)
+            # gs コマンドで成功するなら，libgs 側の問題として以後は使わない
+            self._disabled = True
+            self.close()
+            return lines
+        return self._run_process(device, input_path, output_path, params, setup)
+
+    def close(self) -> None:
+        while True:
+            try:
+                instance = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(instance)
+
+    # --- 実行経路 ---------------------------------------------------------------
+
+    @staticmethod
+    def _program(device, input_path, output_path, params, setup) -> str:
+        device_params = " ".join(f"/{k} {v}" for k, v in params.items())
+        if output_path is not None:
+            device_params = f"/OutputFile {_ps_string(str(output_path))} {device_params}"
+        # ジョブ全体を save / restore で囲み，定義やページデバイスの設定を次のジョブに残さない。
+        # restore の前に nulldevice に切り替えて出力デバイスを閉じ，ファイルを書き切る
+        return "\n".join(
+            [
+                f"userdict /{_JOB_SAVE} save put",
+                f"{_ps_string(device)} selectdevice",
+                f"<< {device_params} >> setpagedevice",
+                setup or "",
+                f"{_ps_string(str(input_path))} run",
+                "nulldevice",
+                f"clear cleardictstack userdict /{_JOB_SAVE} get restore",
+            ]
+        )
+
+    @staticmethod
+    def _run_process(device, input_path, output_path, params, setup) -> list[str]:
+        cmd = ["gs", "-q", "-dSAFER", "-dNOPAUSE", "-dBATCH", f"-sDEVICE={device}"]
+        cmd += [f"-d{k}={v}" for k, v in params.items()]
+        if output_path is not None:
+            cmd.append(f"-sOutputFile={output_path}")
+        if setup:
+            cmd += ["-c", setup, "-f"]
+        cmd.append(str(input_path))
+        return run_captured(cmd, cwd=input_path.parent, tail_lines=100_000)
+
+    # --- インスタンスのプール -------------------------------------------------
+
+    def _acquire(self, input_path: Path, output_path: Path | None) -> _GhostscriptInstance | None:
+        if self._disabled:
+            return None
+        # -dSAFER で許可したディレクトリの外は扱えない
+        for path in (input_path, output_path):
+            if path is not None and not path.resolve().is_relative_to(self.root):
+                return None
+        while not self._disabled:
+            try:
+                return self._idle.get(timeout=0 if self._created < self.pool_size else 1.0)
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._created >= self.pool_size:
+                    continue
+                try:
+                    if self._lib is None:
+                        self._lib = _load_library(self.library)
+                    instance = _GhostscriptInstance(self._lib, self.root)
+                except OSError:
+                    # ライブラリがない・複数インスタンスに対応していない場合
+                    if self._created == 0:
+                        self._disabled = True
+                        return None
+                    # 既存のインスタンスが空くのを待つ
+                    self.pool_size = self._created
+                    continue
+                self._created += 1
+                if not self._registered:
+                    atexit.register(self.close)
+                    self._registered = True
+                return instance
+        return None
+
+    def _discard(self, instance: _GhostscriptInstance) -> None:
+        instance.close()
+        with self._lock:
+            self._created -= 1
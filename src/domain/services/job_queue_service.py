@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from domain.models.job import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Job
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    error TEXT,
+    preamble_key TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_by_preamble ON jobs (preamble_key, status, created_at);
+"""
+
+
+class JobQueueService:
+    """
+    SQLite に永続化するジョブキュー。
+    ワーカーはリース付きでジョブを取得し，リースが切れたジョブ（ワーカーが落ちた場合など）は
+    max_attempts に達するまで別のワーカーに再配布される。
+    ワーカーは直前に処理したプリアンブルのキーを渡すことで同じキーのジョブを優先して取得できるが，
+    最も古いジョブが fairness_window 秒以上待っている場合はそちらを先に取得する。
+    """
+
+    def __init__(self, db_path: Path, max_attempts: int = 3, fairness_window: float = 10.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.fairness_window = fairness_window
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        # 列を追加する前に作られたデータベースを移行する
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "preamble_key" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN preamble_key TEXT")
+        conn.executescript(_INDEXES)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 の接続はスレッドごとに持つ
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, payload: dict[str, Any], preamble_key: str | None = None) -> str:
+        """
+        Returns:
+            新しいジョブの ID
+        """
+        return self.submit_many([payload], [preamble_key])[0]
+
+    def submit_many(
+        self,
+        payloads: list[dict[str, Any]],
+        preamble_keys: list[str | None] | None = None,
+    ) -> list[str]:
+        """
+        複数のジョブを 1 トランザクションで登録する。
+        """
+        now = time.time()
+        keys = preamble_keys or [None] * len(payloads)
+        if len(keys) != len(payloads):
+            raise ValueError("preamble_keys must have the same length as payloads.")
+        rows = [
+            (uuid.uuid4().hex, JOB_QUEUED, json.dumps(p), self.max_attempts, now, now, k)
+            for p, k in zip(payloads, keys)
+        ]
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO jobs"
+                " (id, status, payload, max_attempts, created_at, updated_at, preamble_key)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: float = 300.0,
+        preferred_key: str | None = None,
+    ) -> Job | None:
+        """
+        待機中（またはリース切れ）のジョブを 1 件取得し，worker_id にリースする。
+        preferred_key を指定すると，同じプリアンブルのキーを持つ待機中のジョブを優先する。
+
+        Returns:
+            取得したジョブ。対象が無ければ None
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # リトライ上限に達したリース切れジョブは失敗として確定する
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?"
+                " WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (JOB_FAILED, "Lease expired too many times.", now, JOB_RUNNING, now),
+            )
+            oldest = conn.execute(
+                "SELECT id, created_at FROM jobs"
+                " WHERE status = ? OR (status = ? AND lease_expires_at < ?)"
+                " ORDER BY created_at, rowid LIMIT 1",
+                (JOB_QUEUED, JOB_RUNNING, now),
+            ).fetchone()
+            if oldest is None:
+                return None
+            target = oldest[0]
+            if preferred_key is not None and oldest[1] >= now - self.fairness_window:
+                affine = conn.execute(
+                    "SELECT id FROM jobs WHERE preamble_key = ? AND status = ?"
+                    " ORDER BY created_at, rowid LIMIT 1",
+                    (preferred_key, JOB_QUEUED),
+                ).fetchone()
+                if affine is not None:
+                    target = affine[0]
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires_at = ?,"
+                " attempts = attempts + 1, updated_at = ?"
+                " WHERE id = ? RETURNING id, payload, attempts, preamble_key",
+                (JOB_RUNNING, worker_id, now + lease_seconds, now, target),
+            ).fetchone()
+        return Job(
+            job_id=row[0],
+            status=JOB_RUNNING,
+            payload=json.loads(row[1]),
+            attempts=row[2],
+            preamble_key=row[3],
+        )
+
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float = 300.0) -> bool:
+        """
+        実行中のジョブのリースを延長する。
+
+        Returns:
+            リースを保持していれば True
+        """
+        now = time.time()
+        cur = self._connect().execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ?"
+            " WHERE id = ? AND worker_id = ? AND status = ?",
+            (now + lease_seconds, now, job_id, worker_id, JOB_RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict[str, Any]) -> bool:
+        """
+        ジョブを完了として結果を保存する。リースを失っていた場合は何もしない。
+        """
+        cur = self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_expires_at = NULL,"
+            " updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (JOB_DONE, json.dumps(result), time.time(), job_id, worker_id, JOB_RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        """
+        ジョブの失敗を記録する。retry が True で試行回数が残っていれば再度キューに戻す。
+        """
+        now = time.time()
+        cur = self._connect().execute(
+            "UPDATE jobs SET"
+            " status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END,"
+            " error = ?, worker_id = NULL, lease_expires_at = NULL, updated_at = ?"
+            " WHERE id = ? AND worker_id = ? AND status = ?",
+            (retry, JOB_QUEUED, JOB_FAILED, error, now, job_id, worker_id, JOB_RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def get(self, job_id: str) -> Job | None:
+        row = self._connect().execute(
+            "SELECT id, status, payload, attempts, result, error, preamble_key"
+            " FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            job_id=row[0],
+            status=row[1],
+            payload=json.loads(row[2]),
+            attempts=row[3],
+            result=json.loads(row[4]) if row[4] else None,
+            error=row[5],
+            preamble_key=row[6],
+        )
+
+    def counts(self) -> dict[str, int]:
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ).fetchall()
+        return {status: count for status, count in rows}
@@ -1,27 +1,111 @@
+import json
+import re
+import shlex
+import shutil
 import subprocess
 import tempfile
+import time
+from dataclasses import asdict
 from pathlib import Path
+from typing import Callable
 
 from domain.models.tex_document import TexDocument
+from domain.models.tex_diagnostic import TexDiagnostic
 from domain.models.latexmkrc_source import LatexmkrcSource
 from domain.models.pdf_document import PdfDocument
+from domain.models.svg_document import SvgDocument
+from domain.services.asset_store_service import AssetStore
+from domain.services.file_cache_service import FileCache, content_hash
+from domain.services.process_runner import run_captured
+from domain.services.tex_log_parser import TexLogParser, parse_tex_log
+
+# latexmk の DVI 系出力モードと，その出力ファイルの拡張子
+DVI_MODE_SUFFIXES = {"-dvi": ".dvi", "-xdv": ".xdv", "-dvilua": ".dvi"}
+
+# latexmkrc から拾うツールチェーンのコマンド名（更新されたら失敗キャッシュを無効にする）
+_TOOL_NAMES = re.compile(r"\b(pdflatex|xelatex|lualatex|uplatex|platex|latex|dvipdfmx|dvisvgm)\b")
+
+# 高速モード: $pdf_mode ごとにエンジンのコマンドを持つ latexmkrc の変数
+_ENGINE_VARIABLES = {"1": "pdflatex", "3": "latex", "4": "lualatex", "5": "xelatex"}
+# latexmk を経由せずに 1 回の起動で PDF まで出力できるエンジン
+_PDF_ENGINES = frozenset({"pdflatex", "xelatex", "lualatex"})
+# 高速モードで解釈できる latexmkrc の変数（それ以外があれば latexmk に任せる）
+_SIMPLE_RC_VARIABLES = frozenset(
+    {"pdf_mode", "dvi_mode", "postscript_mode", "latex", "pdflatex", "xelatex", "lualatex",
+     "dvipdf", "xdvipdfmx"}
+)
+# BibTeX・makeindex などの補助ツールが必要になる命令
+_AUXILIARY_COMMANDS = re.compile(
+    r"\\(?:bibliography|addbibresource|printbibliography|makeindex|printindex"
+    r"|makeglossaries|printglossar)"
+)
+# 目次・図表目次などの補助ファイル（直接起動の前後で変わったら latexmk で続きを処理する）
+_AUXILIARY_SUFFIXES = (".aux", ".toc", ".lof", ".lot")
+# エンジンを直接起動するときに %O に渡すオプション
+_DIRECT_OPTIONS = ["-interaction=nonstopmode", "-halt-on-error"]
+# コンパイルが書き出すファイル（アセットとして配置すると上書きされる）
+_RESERVED_ASSET_NAMES = re.compile(r"^(?:main\.[^/]*|latexmkrc)$")
+
+
+class LatexCompileError(subprocess.CalledProcessError):
+    """
+    latexmk が TeX のエラーで失敗したことを表す例外。
+    ログから解析したエラーの位置とメッセージを持つ。
+    """
+
+    def __init__(self, returncode: int, cmd, diagnostic: TexDiagnostic, cached: bool = False):
+        super().__init__(returncode, cmd)
+        self.diagnostic = diagnostic
+        self.cached = cached
+
+    def __str__(self) -> str:
+        suffix = " (cached failure)" if self.cached else ""
+        return f"LaTeX error at {self.diagnostic}{suffix}"
 
 
 class LatexCompileService:
     """
-    TeX ドキュメントと latexmkrc ソースを受け取り，PDF を生成するサービス
+    TeX ドキュメントと latexmkrc ソースを受け取り，PDF (または SVG) を生成するサービス
+    failure_cache を指定すると，TeX のエラーで失敗した入力を failure_ttl 秒の間記録し，
+    同じ入力が再送された場合は latexmk を起動せずに同じエラーを返す。
+    fast_mode を指定すると，latexmkrc が単純な代入だけで PDF を直接出力するエンジンを使い，
+    文書が補助ツールを必要としない場合に，latexmk を経由せずエンジンを 1 回だけ起動する。
+    ログが再実行を求めた場合に限り latexmk で続きを処理する。
+    asset_store を指定すると，assets（プロジェクト内のパス → ダイジェスト）で渡した
+    画像や補助ファイルを作業ディレクトリに配置してからコンパイルする。
     """
 
+    def __init__(
+        self,
+        svg_cache: FileCache | None = None,
+        failure_cache: FileCache | None = None,
+        failure_ttl: float = 300.0,
+        fast_mode: bool = False,
+        asset_store: AssetStore | None = None,
+    ):
+        self.svg_cache = svg_cache
+        self.failure_cache = failure_cache
+        self.failure_ttl = failure_ttl
+        self.fast_mode = fast_mode
+        self.asset_store = asset_store
+
     def compile(
         self,
         tex_doc: TexDocument,
         rc_source: LatexmkrcSource,
         pdf_name: str = "main.pdf",
+        workdir: Path | None = None,
+        on_diagnostic: Callable[[TexDiagnostic], None] | None = None,
+        assets: dict[str, str] | None = None,
     ) -> PdfDocument | None:
         """
         tex_doc.content を main.tex に書き出し，
         rc_source.content を latexmkrc に書き出して
         latexmk で PDF を生成し，PdfDocument を返す。
+        workdir を指定すると，そのディレクトリを使い回して
+        latexmk の差分コンパイル（aux ファイル等の再利用）を効かせる。
+        on_diagnostic には，エンジンの出力から解析した診断が届いた順に渡される。
+        assets はアセットストアから作業ディレクトリに配置するファイル。
 
         returns:
             PdfDocument: 生成された PDF ドキュメントモデル
@@ -31,8 +115,200 @@ class LatexCompileService:
         tex_doc.validate()
         rc_source.validate()
 
-        # 作業用ディレクトリを作成
-        workdir = Path(tempfile.mkdtemp())
+        # 作業用ディレクトリを作成（指定があれば再利用）
+        if workdir is None:
+            workdir = Path(tempfile.mkdtemp())
+        else:
+            workdir.mkdir(parents=True, exist_ok=True)
+        self._materialize(assets, workdir)
+
+        direct = self.direct_command(tex_doc, rc_source) if self.fast_mode else None
+        if direct is None:
+            self._run_latexmk(
+                tex_doc, rc_source, workdir, on_diagnostic=on_diagnostic, assets=assets
+            )
+        else:
+            before = self._auxiliary_state(workdir)
+            parser = self._run_latexmk(
+                tex_doc, rc_source, workdir, on_diagnostic=on_diagnostic, cmd=direct, assets=assets
+            )
+            if parser.needs_rerun or self._auxiliary_changed(before, self._auxiliary_state(workdir)):
+                # 参照や目次の解決などが残っている場合は，aux を引き継いで latexmk に任せる
+                self._run_latexmk(
+                    tex_doc, rc_source, workdir, on_diagnostic=on_diagnostic, assets=assets
+                )
+
+        # 出力 PDF のパスを返却
+        pdf_path = workdir / pdf_name
+        return PdfDocument(path=pdf_path)
+
+    def compile_svg(
+        self,
+        tex_doc: TexDocument,
+        rc_source: LatexmkrcSource,
+        svg_name: str = "main.svg",
+        on_diagnostic: Callable[[TexDiagnostic], None] | None = None,
+        assets: dict[str, str] | None = None,
+        workdir: Path | None = None,
+    ) -> SvgDocument:
+        """
+        latexmk で DVI (XeTeX の場合は XDV) を生成し，dvisvgm で
+        タイトなバウンディングボックスの SVG に直接変換する。
+        pdfcrop や Ghostscript を経由しないため，PDF 経由より高速。
+        svg_cache が設定されている場合は入力のハッシュで結果をキャッシュする。
+        workdir を指定すると，結果をそのディレクトリに置く。
+
+        returns:
+            SvgDocument: workdir（省略時は新しい作業ディレクトリ）に置かれた SVG ドキュメントモデル
+        """
+        # バリデーション
+        tex_doc.validate()
+        rc_source.validate()
+
+        def populate(directory: Path) -> None:
+            # DVI や aux は SVG を書き出したら要らないので，ディレクトリごと消す
+            with tempfile.TemporaryDirectory() as tmp:
+                build_dir = Path(tmp)
+                self._materialize(assets, build_dir)
+                mode = self._dvi_mode_flag(rc_source)
+                self._run_latexmk(
+                    tex_doc, rc_source, build_dir, [mode], on_diagnostic, assets=assets
+                )
+                dvi_name = "main" + DVI_MODE_SUFFIXES[mode]
+                run_captured(
+                    [
+                        "dvisvgm",
+                        "--no-fonts",
+                        "--exact-bbox",
+                        "--bbox=min",
+                        f"--output={directory / svg_name}",
+                        dvi_name,
+                    ],
+                    cwd=build_dir,
+                )
+
+        # 後段の処理が書き込めるよう，結果はキャッシュの外の作業ディレクトリに置く
+        if workdir is None:
+            workdir = Path(tempfile.mkdtemp())
+        else:
+            workdir.mkdir(parents=True, exist_ok=True)
+        if self.svg_cache is None:
+            populate(workdir)
+        else:
+            # TeX Live の更新で古い SVG を返さないよう，ツールチェーンもキーに含める
+            key = content_hash(
+                tex_doc.fingerprint(),
+                rc_source.fingerprint(),
+                "svg",
+                *self.toolchain(rc_source),
+                *self.asset_key(assets),
+            )
+            entry, _ = self.svg_cache.get_or_create(key, populate)
+            shutil.copy2(entry / svg_name, workdir / svg_name)
+
+        return SvgDocument(path=workdir / svg_name)
+
+    @staticmethod
+    def direct_command(tex_doc: TexDocument, rc_source: LatexmkrcSource) -> list[str] | None:
+        """
+        latexmkrc の $pdf_mode とエンジンの変数から，main.tex を直接処理するコマンドを組み立てる。
+
+        Returns:
+            エンジンのコマンド。latexmk を経由すべき場合（複雑な latexmkrc，
+            DVI を出力するエンジン，BibTeX や索引を使う文書など）は None
+        """
+        variables = rc_source.variables()
+        if variables is None or set(variables) - _SIMPLE_RC_VARIABLES:
+            return None
+        if variables.get("dvi_mode", "0") != "0" or variables.get("postscript_mode", "0") != "0":
+            return None
+        if _AUXILIARY_COMMANDS.search(tex_doc.content):
+            return None
+        name = _ENGINE_VARIABLES.get(variables.get("pdf_mode", "0"))
+        if name is None:
+            return None
+        try:
+            template = shlex.split(variables.get(name, f"{name} %O %S"))
+        except ValueError:
+            return None
+        if not template or Path(template[0]).name not in _PDF_ENGINES or "%S" not in template:
+            return None
+
+        cmd: list[str] = []
+        for token in template:
+            if token == "%O":
+                cmd.extend(_DIRECT_OPTIONS)
+            elif token == "%S":
+                cmd.append("main.tex")
+            elif "%" in token or token == "-no-pdf" or "output-format" in token:
+                # 他のプレースホルダや DVI 出力の指定は latexmk に任せる
+                return None
+            else:
+                cmd.append(token)
+        return cmd
+
+    @staticmethod
+    def _auxiliary_state(workdir: Path) -> dict[str, str | None]:
+        """
+        Returns:
+            補助ファイルの拡張子 → 内容のハッシュ（ファイルがなければ None）
+        """
+        state = {}
+        for suffix in _AUXILIARY_SUFFIXES:
+            path = workdir / f"main{suffix}"
+            state[suffix] = content_hash(path.read_bytes()) if path.is_file() else None
+        return state
+
+    @staticmethod
+    def _auxiliary_changed(before: dict[str, str | None], after: dict[str, str | None]) -> bool:
+        """
+        \\tableofcontents などは LaTeX が再実行を求めないため，補助ファイルの変化で判断する。
+        .aux は初回に必ず作られるので，前回から引き継いだものが変わった場合に限る
+        （初回の未定義参照は再実行のメッセージで分かる）。
+        .toc などは空のままなら，なかったものと同じに扱う。
+        """
+        empty = content_hash(b"")
+        for suffix in _AUXILIARY_SUFFIXES:
+            if suffix == ".aux":
+                if before[suffix] is not None and before[suffix] != after[suffix]:
+                    return True
+            elif (before[suffix] or empty) != (after[suffix] or empty):
+                return True
+        return False
+
+    @staticmethod
+    def _dvi_mode_flag(rc_source: LatexmkrcSource) -> str:
+        """
+        latexmkrc で指定されたエンジンから，latexmk の DVI 系出力モードを決める。
+        """
+        if re.search(r"xelatex", rc_source.content):
+            return "-xdv"
+        if re.search(r"lualatex", rc_source.content):
+            return "-dvilua"
+        return "-dvi"
+
+    def _run_latexmk(
+        self,
+        tex_doc: TexDocument,
+        rc_source: LatexmkrcSource,
+        workdir: Path,
+        extra_args: list[str] | None = None,
+        on_diagnostic: Callable[[TexDiagnostic], None] | None = None,
+        cmd: list[str] | None = None,
+        assets: dict[str, str] | None = None,
+    ) -> TexLogParser:
+        """
+        workdir に main.tex と latexmkrc を書き出して latexmk を実行する。
+        出力は 1 行ずつ解析し，エラーが現れた時点で latexmk を中断する。
+        cmd を指定した場合は latexmk の代わりにそのコマンド（エンジンの直接起動）を実行する。
+
+        Returns:
+            出力を解析したパーサ（警告や再実行の要求を持つ）
+        Raises:
+            LatexCompileError: TeX のエラーで失敗した場合（失敗キャッシュのヒットを含む）
+        """
+        failure_key = self._failure_key(tex_doc, rc_source, extra_args, assets)
+        self._raise_cached_failure(failure_key)
 
         # TeX ファイルを書き出し
         tex_path = workdir / "main.tex"
@@ -42,26 +318,107 @@ class LatexCompileService:
         rc_path = rc_source.write_to(workdir)
 
         # latexmk 実行（-r: rc 指定）
+        if cmd is None:
+            cmd = ["latexmk", "--halt-on-error", "-r", str(rc_path), *(extra_args or []), tex_path.name]
+        parser = TexLogParser()
+
+        def on_line(line: str) -> bool:
+            found = parser.feed(line)
+            if on_diagnostic is not None:
+                for diagnostic in found:
+                    on_diagnostic(diagnostic)
+            return any(d.level == "error" for d in found)
+
         try:
-            subprocess.run(
-                ["latexmk", "--halt-on-error", "-r", str(rc_path), tex_path.name],
-                cwd=workdir,
-                check=True,
-            )
+            run_captured(cmd, cwd=workdir, on_line=on_line)
         except subprocess.CalledProcessError as e:
-            subprocess.run(
-                ["latexmk", "-c", tex_path.name],
-                cwd=workdir,
-                check=True,
-            )
-            subprocess.run(
-                ["rm", "-f", str(rc_path)],
-            )
-            subprocess.run(
-                ["rm", "-f", str(tex_path)],
-            )
-            raise e
+            parser.close()
+            log_path = workdir / "main.log"
+            log = log_path.read_text(encoding="utf-8", errors="replace") if log_path.exists() else ""
+            # ログの方が詳しいが，中断した場合は書き出されていないことがある
+            errors = [d for d in parse_tex_log(log) if d.level == "error"] or [
+                d for d in parser.diagnostics if d.level == "error"
+            ]
+            # 生成物を消して，次回の差分コンパイルが壊れた aux を拾わないようにする
+            for path in [rc_path, *workdir.glob("main.*")]:
+                path.unlink(missing_ok=True)
+            if not errors:
+                raise e
+            self._store_failure(failure_key, errors[0])
+            raise LatexCompileError(e.returncode, cmd, errors[0]) from e
+        return parser
 
-        # 出力 PDF のパスを返却
-        pdf_path = workdir / pdf_name
-        return PdfDocument(path=pdf_path)
+    def _failure_key(
+        self,
+        tex_doc: TexDocument,
+        rc_source: LatexmkrcSource,
+        extra_args: list[str] | None,
+        assets: dict[str, str] | None = None,
+    ) -> str | None:
+        if self.failure_cache is None:
+            return None
+        # エラーの行番号はソースの字面に依存するため，成功時のキャッシュと違い正規化しない
+        return content_hash(
+            tex_doc.content,
+            rc_source.content,
+            " ".join(extra_args or []),
+            *self.toolchain(rc_source),
+            *self.asset_key(assets),
+        )
+
+    @staticmethod
+    def asset_key(assets: dict[str, str] | None) -> list[str]:
+        """
+        キャッシュキーに含めるアセットの一覧（パスの順に 'パス=ダイジェスト'）。
+        """
+        return [f"{name}={digest}" for name, digest in sorted((assets or {}).items())]
+
+    def _materialize(self, assets: dict[str, str] | None, workdir: Path) -> None:
+        if not assets:
+            return
+        if self.asset_store is None:
+            raise ValueError("Assets were given but no asset store is configured.")
+        reserved = [name for name in assets if _RESERVED_ASSET_NAMES.match(name)]
+        if reserved:
+            raise ValueError(f"Asset names are reserved for compile outputs: {reserved}")
+        self.asset_store.materialize(assets, workdir)
+
+    @staticmethod
+    def toolchain(rc_source: LatexmkrcSource) -> list[str]:
+        """
+        latexmk と latexmkrc が使うコマンドの実体（パス・サイズ・更新時刻）。
+        キャッシュキーに含め，TeX Live の更新で古い結果を返さないようにする。
+        """
+        tools = ["latexmk", *sorted(set(_TOOL_NAMES.findall(rc_source.content)))]
+        toolchain = []
+        for name in tools:
+            path = shutil.which(name)
+            stat = Path(path).stat() if path else None
+            toolchain.append(f"{name}={path}:{stat.st_size}:{stat.st_mtime_ns}" if stat else name)
+        return toolchain
+
+    def _raise_cached_failure(self, key: str | None) -> None:
+        if key is None:
+            return
+        entry = self.failure_cache.get(key)
+        if entry is None:
+            return
+        error_path = entry / "error.json"
+        try:
+            if time.time() - error_path.stat().st_mtime > self.failure_ttl:
+                self.failure_cache.invalidate(key)
+                return
+            diagnostic = TexDiagnostic(**json.loads(error_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            self.failure_cache.invalidate(key)
+            return
+        raise LatexCompileError(1, ["latexmk"], diagnostic, cached=True)
+
+    def _store_failure(self, key: str | None, diagnostic: TexDiagnostic) -> None:
+        if key is None:
+            return
+        self.failure_cache.invalidate(key)
+        self.failure_cache.put(
+            key,
+            lambda d: (d / "error.json").write_text(json.dumps(asdict(diagnostic)), encoding="utf-8"),
+        )
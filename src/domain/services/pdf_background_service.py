@@ -0,0 +1,188 @@
+import pikepdf
+
+from domain.models.pdf_document import PdfDocument
+
+# ページ面積に対してこの割合以上を覆う塗りを「背景」とみなす
+DEFAULT_COVERAGE = 0.9
+# 色の一致判定の許容誤差（8 bit で 1 階調）
+COLOR_TOLERANCE = 1.0 / 255
+# Form XObject の入れ子をたどる深さの上限
+MAX_FORM_DEPTH = 16
+
+Matrix = tuple[float, float, float, float, float, float]
+_IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+_FILL_OPERATORS = frozenset({"f", "F", "f*", "B", "B*", "b", "b*"})
+_PATH_OPERATORS = frozenset({"m", "l", "c", "v", "y", "re"})
+_PAINT_OPERATORS = _FILL_OPERATORS | {"S", "s", "n"}
+_DEVICE_SPACES = frozenset({"/DeviceGray", "/DeviceRGB", "/DeviceCMYK"})
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """m を適用してから n を適用する行列（PDF の cm と同じ順序）"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + b * c2,
+        a * b2 + b * d2,
+        c * a2 + d * c2,
+        c * b2 + d * d2,
+        e * a2 + f * c2 + e2,
+        e * b2 + f * d2 + f2,
+    )
+
+
+def _transform(m: Matrix, x: float, y: float) -> tuple[float, float]:
+    a, b, c, d, e, f = m
+    return a * x + c * y + e, b * x + d * y + f
+
+
+class _GraphicsState:
+    __slots__ = ("ctm", "fill")
+
+    def __init__(self, ctm: Matrix = _IDENTITY, fill: tuple[float, ...] | None = (0.0, 0.0, 0.0)):
+        self.ctm = ctm
+        # 解釈できない色（パターンなど）は None として，どの色とも一致しうるものとして扱う
+        self.fill = fill
+
+    def copy(self) -> "_GraphicsState":
+        return _GraphicsState(self.ctm, self.fill)
+
+
+class PdfBackgroundService:
+    """
+    ページの内容ストリームを Ghostscript を使わずに走査し，
+    指定色でページのほぼ全面を塗りつぶす描画（背景）があるかを判定するサービス。
+
+    判定は安全側に倒す: ページを覆う画像・シェーディング・インライン画像や，
+    解釈できない色での全面の塗りは「背景あり」とみなす。
+    """
+
+    def __init__(self, coverage: float = DEFAULT_COVERAGE):
+        if not 0.0 < coverage <= 1.0:
+            raise ValueError(f"Coverage must be in (0, 1]: {coverage}")
+        self.coverage = coverage
+
+    def has_background(
+        self,
+        pdf_doc: PdfDocument,
+        mask_color: tuple[float, float, float] = (1.0, 1.0, 1.0),
+    ) -> bool:
+        pdf_doc.validate()
+        with pikepdf.open(pdf_doc.path) as pdf:
+            for page in pdf.pages:
+                x0, y0, x1, y1 = (float(v) for v in page.mediabox)
+                box = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+                resources = page.obj.get("/Resources", pikepdf.Dictionary())
+                if self._scan(page, resources, _GraphicsState(), box, mask_color, 0, set()):
+                    return True
+        return False
+
+    def _scan(self, content, resources, state, box, mask_color, depth, visited) -> bool:
+        """
+        content の内容ストリームを走査し，背景とみなす描画があれば True を返す。
+        """
+        xobjects = resources.get("/XObject", pikepdf.Dictionary())
+        stack: list[_GraphicsState] = []
+        points: list[tuple[float, float]] = []
+
+        for instruction in pikepdf.parse_content_stream(content):
+            if isinstance(instruction, pikepdf.ContentStreamInlineImage):
+                if self._covers(state.ctm, [(0, 0), (1, 0), (0, 1), (1, 1)], box):
+                    return True
+                continue
+            op = str(instruction.operator)
+            operands = instruction.operands
+
+            if op == "q":
+                stack.append(state.copy())
+            elif op == "Q":
+                if stack:
+                    state = stack.pop()
+            elif op == "cm":
+                state.ctm = _multiply(tuple(float(v) for v in operands), state.ctm)
+            elif op in ("g", "rg", "k", "sc", "scn"):
+                state.fill = self._fill_color(operands)
+            elif op == "cs":
+                # デバイス色空間に切り替えると初期色の黒に戻る。それ以外は色を判定しない
+                state.fill = (0.0, 0.0, 0.0) if str(operands[0]) in _DEVICE_SPACES else None
+            elif op in _PATH_OPERATORS:
+                points.extend(self._path_points(op, operands))
+            elif op in _PAINT_OPERATORS:
+                if (
+                    op in _FILL_OPERATORS
+                    and self._matches(state.fill, mask_color)
+                    and self._covers(state.ctm, points, box)
+                ):
+                    return True
+                points = []
+            elif op == "sh":
+                # シェーディングはクリップ領域全体を塗るため，色によらず背景の可能性がある
+                return True
+            elif op == "Do":
+                xobject = xobjects.get(operands[0])
+                if xobject is None:
+                    continue
+                subtype = xobject.get("/Subtype")
+                if subtype == "/Image":
+                    if self._covers(state.ctm, [(0, 0), (1, 0), (0, 1), (1, 1)], box):
+                        return True
+                elif subtype == "/Form":
+                    key = xobject.objgen
+                    if depth >= MAX_FORM_DEPTH or (key != (0, 0) and key in visited):
+                        continue
+                    matrix = tuple(float(v) for v in xobject.get("/Matrix", _IDENTITY))
+                    inner = _GraphicsState(_multiply(matrix, state.ctm), state.fill)
+                    # /Resources を持たない古い形式の Form は親のリソースを使う
+                    inner_resources = xobject.get("/Resources", resources)
+                    if self._scan(
+                        xobject, inner_resources, inner, box, mask_color, depth + 1, visited | {key}
+                    ):
+                        return True
+        return False
+
+    @staticmethod
+    def _fill_color(operands) -> tuple[float, ...] | None:
+        try:
+            values = [float(v) for v in operands]
+        except (TypeError, ValueError):
+            return None
+        if len(values) == 1:
+            return (values[0],) * 3
+        if len(values) == 3:
+            return tuple(values)
+        if len(values) == 4:
+            c, m, y, k = values
+            return ((1 - c) * (1 - k), (1 - m) * (1 - k), (1 - y) * (1 - k))
+        return None
+
+    @staticmethod
+    def _matches(fill: tuple[float, ...] | None, mask_color: tuple[float, float, float]) -> bool:
+        if fill is None:
+            return True
+        return all(abs(a - b) <= COLOR_TOLERANCE for a, b in zip(fill, mask_color))
+
+    @staticmethod
+    def _path_points(op: str, operands) -> list[tuple[float, float]]:
+        values = [float(v) for v in operands]
+        if op == "re":
+            x, y, w, h = values
+            return [(x, y), (x + w, y), (x, y + h), (x + w, y + h)]
+        # 曲線の制御点も含めれば，パスの外接矩形を内側に見積もることはない
+        return list(zip(values[0::2], values[1::2]))
+
+    def _covers(self, ctm: Matrix, points, box) -> bool:
+        if not points:
+            return False
+        device = [_transform(ctm, x, y) for x, y in points]
+        xs = [p[0] for p in device]
+        ys = [p[1] for p in device]
+        bx0, by0, bx1, by1 = box
+        page_area = (bx1 - bx0) * (by1 - by0)
+        if page_area <= 0:
+            return False
+        width = min(max(xs), bx1) - max(min(xs), bx0)
+        height = min(max(ys), by1) - max(min(ys), by0)
+        if width <= 0 or height <= 0:
+            return False
+        return width * height >= self.coverage * page_area
@@ -0,0 +1,86 @@
+import json
+import math
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from domain.models.pdf_document import PdfDocument
+from domain.services.file_cache_service import FileCache, content_hash
+from domain.services.ghostscript_service import GhostscriptService
+from domain.services.pdf_page_service import PdfPageService
+
+# pdfcrop の既定と同じく整数の %%BoundingBox を使う
+_BOUNDING_BOX = re.compile(r"^%%BoundingBox:\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s*$")
+
+BBox = tuple[int, int, int, int]
+
+
+class PdfBboxService:
+    """
+    Ghostscript の bbox デバイスで，ページごとに描画されている範囲を求めるサービス。
+    結果は PDF の内容のハッシュをキーにキャッシュするため，
+    同じ PDF を余白だけ変えてトリミングし直す場合は gs を起動しない。
+    max_workers が 2 以上で複数ページの場合は，ページ範囲ごとに分割して並列に計測する。
+    """
+
+    def __init__(
+        self,
+        cache: FileCache | None = None,
+        ghostscript: GhostscriptService | None = None,
+        page_service: PdfPageService | None = None,
+        max_workers: int = 1,
+    ):
+        self.cache = cache
+        self.ghostscript = ghostscript or GhostscriptService()
+        self.page_service = page_service or PdfPageService()
+        self.max_workers = max_workers
+
+    def bbox(self, pdf_doc: PdfDocument) -> tuple[list[BBox | None], bool]:
+        """
+        Returns:
+            (ページ順の (x0, y0, x1, y1)。何も描画されていないページは None,
+             キャッシュヒットしたかどうか)
+            座標は MediaBox の左下を原点とする pt 単位
+        """
+        pdf_doc.validate()
+
+        def populate(directory: Path) -> None:
+            boxes = self._measure(pdf_doc)
+            (directory / "bbox.json").write_text(json.dumps(boxes), encoding="utf-8")
+
+        if self.cache is None:
+            return self._measure(pdf_doc), False
+
+        key = content_hash(pdf_doc.path.read_bytes(), "bbox")
+        entry, hit = self.cache.get_or_create(key, populate)
+        boxes = json.loads((entry / "bbox.json").read_text(encoding="utf-8"))
+        return [tuple(box) if box is not None else None for box in boxes], hit
+
+    def _measure(self, pdf_doc: PdfDocument) -> list[BBox | None]:
+        page_count = self.page_service.page_count(pdf_doc) if self.max_workers > 1 else 1
+        if page_count <= 1:
+            return self._measure_file(pdf_doc)
+
+        workdir = pdf_doc.path.with_name(f"{pdf_doc.path.stem}-bbox-pages")
+        try:
+            parts = self.page_service.split(
+                pdf_doc,
+                pages_per_file=math.ceil(page_count / self.max_workers),
+                output_dir=workdir,
+            )
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                return [box for boxes in pool.map(self._measure_file, parts) for box in boxes]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _measure_file(self, pdf_doc: PdfDocument) -> list[BBox | None]:
+        lines = self.ghostscript.run("bbox", pdf_doc.path)
+        boxes: list[BBox | None] = []
+        for line in lines:
+            m = _BOUNDING_BOX.match(line)
+            if m is None:
+                continue
+            x0, y0, x1, y1 = (int(v) for v in m.groups())
+            boxes.append((x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None)
+        return boxes
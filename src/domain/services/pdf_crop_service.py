@@ -1,6 +1,7 @@
-import subprocess
+import pikepdf
 
 from domain.models.pdf_document import PdfDocument
+from domain.services.process_runner import run_captured
 
 
 class PdfCropService:
@@ -36,11 +37,62 @@ class PdfCropService:
             output_path = pdf_doc.path.with_name(f"{pdf_doc.path.stem}-crop.pdf")
 
         # pdfcrop コマンド実行
-        subprocess.run(
+        run_captured(
             ["pdfcrop", "--margins", margin_str, str(pdf_doc.path), str(output_path)],
             cwd=pdf_doc.path.parent,
-            check=True,
         )
 
         # 結果を PdfDocument として返却
         return PdfDocument(path=output_path)
+
+    def crop_to_bbox(
+        self,
+        pdf_doc: PdfDocument,
+        bboxes: list[tuple[int, int, int, int] | None],
+        margins: tuple[int, int, int, int] = (0, 0, 0, 0),
+        output_name: str | None = None,
+    ) -> PdfDocument:
+        """
+        求め済みのバウンディングボックスに余白を足した範囲を MediaBox / CropBox に設定する。
+        pdfcrop と異なり描画範囲の計算を行わないため，余白だけを変える再実行に向く。
+        回転したページを含む場合は pdfcrop にフォールバックする。
+
+        Args:
+            bboxes: PdfBboxService.bbox が返すページ順のバウンディングボックス
+                （None のページはそのまま残す）
+        """
+        pdf_doc.validate()
+
+        if output_name:
+            output_path = pdf_doc.path.parent / output_name
+        else:
+            output_path = pdf_doc.path.with_name(f"{pdf_doc.path.stem}-crop.pdf")
+
+        left, top, right, bottom = margins
+        with pikepdf.open(pdf_doc.path) as pdf:
+            if len(pdf.pages) != len(bboxes) or any(
+                int(page.obj.get("/Rotate", 0)) % 360 for page in pdf.pages
+            ):
+                return self.crop(pdf_doc, margins, output_name)
+            for page, box in zip(pdf.pages, bboxes):
+                if box is None:
+                    continue
+                # bbox は MediaBox の左下からの相対座標
+                origin_x, origin_y = float(page.mediabox[0]), float(page.mediabox[1])
+                x0, y0, x1, y1 = box
+                rect = pikepdf.Array(
+                    [
+                        origin_x + x0 - left,
+                        origin_y + y0 - bottom,
+                        origin_x + x1 + right,
+                        origin_y + y1 + top,
+                    ]
+                )
+                page.obj.MediaBox = rect
+                page.obj.CropBox = rect
+                for name in ("/TrimBox", "/BleedBox", "/ArtBox"):
+                    if name in page.obj:
+                        del page.obj[name]
+            pdf.save(output_path)
+
+        return PdfDocument(path=output_path)
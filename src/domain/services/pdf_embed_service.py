@@ -3,11 +3,13 @@ import pikepdf
 
 from domain.models.pdf_document import PdfDocument
 from domain.models.embedded_file import EmbeddedFile
+from domain.models.project_bundle import BUNDLE_NAME, ProjectBundle
 
 
 class PdfEmbedService:
     """
     PdfDocument に .tex ファイルなどの添付を行い、新たな PdfDocument を返すサービス
+    bundle を指定すると，複数ファイルのプロジェクトを 1 つの圧縮バンドル（project.zip）として添付する
     """
 
     def embed(
@@ -15,12 +17,18 @@ class PdfEmbedService:
         pdf_doc: PdfDocument,
         embedded_files: List[EmbeddedFile],
         output_name: Optional[str] = None,
+        linearize: bool = False,
+        bundle: bool = False,
+        compresslevel: int = 9,
     ) -> PdfDocument:
         """
         Args:
             pdf_doc: 添付対象の PdfDocument
             embedded_files: EmbeddedFile オブジェクトのリスト
             output_name: 出力ファイル名（省略時は '<stem>-embed.pdf'）
+            linearize: True の場合、Fast Web View 用に線形化して保存する
+            bundle: True の場合、ファイルを個別の添付ではなく 1 つのバンドルにまとめる
+            compresslevel: バンドルの圧縮レベル (0-9)
 
         Returns:
             PdfDocument: 添付後の PDF ドキュメントモデル
@@ -36,12 +44,18 @@ class PdfEmbedService:
 
         # PDF を開いて添付を追加
         with pikepdf.Pdf.open(str(pdf_doc.path)) as pdf:
-            for file in embedded_files:
-                # EmbeddedFile の検証
-                file.validate()
-                # 添付処理
-                pdf.attachments[file.name] = file.data
-            # ファイルとして保存
-            pdf.save(str(output_path))
+            if bundle:
+                # 先頭のファイル（main.tex）から順に格納し，マニフェストを付ける
+                pdf.attachments[BUNDLE_NAME] = ProjectBundle.from_files(
+                    embedded_files, compresslevel=compresslevel
+                ).data
+            else:
+                for file in embedded_files:
+                    # EmbeddedFile の検証
+                    file.validate()
+                    # 添付処理
+                    pdf.attachments[file.name] = file.data
+            # ファイルとして保存（linearize 指定時は 1 ページ目から順に読めるよう線形化）
+            pdf.save(str(output_path), linearize=linearize)
 
         return PdfDocument(path=output_path)
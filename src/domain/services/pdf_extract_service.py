@@ -1,10 +1,14 @@
+import hashlib
+
 import pikepdf
 from domain.models.pdf_document import PdfDocument
 from domain.models.embedded_file import EmbeddedFile
+from domain.models.project_bundle import BUNDLE_NAME, BundleEntry, ProjectBundle
 
 class PdfExtractService:
     """
     Service to extract all embedded .tex files from a PDF.
+    個別の添付に加えて，プロジェクトのバンドル（project.zip）の中身も扱う。
     """
 
     def extract(self, pdf_doc: PdfDocument) -> list[EmbeddedFile]:
@@ -13,14 +17,54 @@ class PdfExtractService:
             pdf_doc: 検証済みの PdfDocument
         Returns:
             埋め込まれた .tex ファイルを EmbeddedFile リストで返却
+            （バンドル内の .tex はマニフェストの順で後ろに続く）
         """
         pdf_doc.validate()
-        pdf = pikepdf.Pdf.open(pdf_doc.path)
         extracted: list[EmbeddedFile] = []
-        for name, filespec in pdf.attachments.items():
-            if name.lower().endswith(".tex"):
-                attached = filespec.get_file()
-                data = attached.read_bytes()
-                extracted.append(EmbeddedFile(name=name, data=data))
-        pdf.close()
+        with pikepdf.Pdf.open(pdf_doc.path) as pdf:
+            for name, filespec in pdf.attachments.items():
+                if name == BUNDLE_NAME:
+                    bundle = ProjectBundle(data=filespec.get_file().read_bytes())
+                    extracted.extend(
+                        f for f in bundle.files() if f.name.lower().endswith(".tex")
+                    )
+                elif name.lower().endswith(".tex"):
+                    attached = filespec.get_file()
+                    data = attached.read_bytes()
+                    extracted.append(EmbeddedFile(name=name, data=data))
         return extracted
+
+    def list_files(self, pdf_doc: PdfDocument) -> list[BundleEntry]:
+        """
+        Returns:
+            添付とバンドル内のファイルの一覧。バンドルはマニフェストだけを読む
+            （個別の添付の offset は 0）
+        """
+        pdf_doc.validate()
+        entries: list[BundleEntry] = []
+        with pikepdf.Pdf.open(pdf_doc.path) as pdf:
+            for name, filespec in pdf.attachments.items():
+                data = filespec.get_file().read_bytes()
+                if name == BUNDLE_NAME:
+                    entries.extend(ProjectBundle(data=data).entries())
+                else:
+                    entries.append(
+                        BundleEntry(name, len(data), 0, hashlib.sha256(data).hexdigest())
+                    )
+        return entries
+
+    def extract_file(self, pdf_doc: PdfDocument, name: str) -> EmbeddedFile:
+        """
+        ファイルを 1 つだけ取り出す。バンドル内のファイルは他のファイルを展開せずに読む。
+        Raises:
+            FileNotFoundError: 該当するファイルが埋め込まれていない場合
+        """
+        pdf_doc.validate()
+        with pikepdf.Pdf.open(pdf_doc.path) as pdf:
+            if name != BUNDLE_NAME and name in pdf.attachments:
+                data = pdf.attachments[name].get_file().read_bytes()
+                return EmbeddedFile(name=name, data=data)
+            if BUNDLE_NAME in pdf.attachments:
+                bundle = ProjectBundle(data=pdf.attachments[BUNDLE_NAME].get_file().read_bytes())
+                return bundle.read(name)
+        raise FileNotFoundError(f"'{name}' is not embedded in {pdf_doc.path}")
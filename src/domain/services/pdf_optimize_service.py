@@ -0,0 +1,170 @@
+import hashlib
+import threading
+
+import pikepdf
+
+from domain.models.pdf_document import PdfDocument
+
+# 重複をまとめる処理を繰り返す上限（重複した画像を参照する Form が重複になる場合など）
+MAX_DEDUP_PASSES = 4
+# 内容が同じならまとめてよいストリーム（フォント本体と XObject）
+_FONT_FILE_KEYS = ("/FontFile", "/FontFile2", "/FontFile3")
+
+# pikepdf の Flate の圧縮レベルはプロセス全体の設定のため，保存の間は排他にする。
+# 現在値を読む API はないので，保存が終わったら既定値（zlib の既定）に戻す。
+# ロックを取らずに並行して保存する他の処理には，その間だけ compression_level が効く
+_flate_lock = threading.Lock()
+_DEFAULT_FLATE_LEVEL = -1
+
+
+class PdfOptimizeService:
+    """
+    PDF の出力サイズを小さくするサービス。
+    - 未使用のリソースをページから取り除く
+    - 内容が同じフォント本体・XObject のストリームを 1 つにまとめる
+    - ストリームを compression_level で再圧縮し，オブジェクトストリームと
+      クロスリファレンスストリームで保存する
+    """
+
+    def __init__(self, compression_level: int = 9):
+        if not 0 <= compression_level <= 9:
+            raise ValueError(f"compression_level must be in 0-9: {compression_level}")
+        self.compression_level = compression_level
+
+    def optimize(
+        self,
+        pdf_doc: PdfDocument,
+        output_name: str | None = None,
+        linearize: bool = False,
+    ) -> tuple[PdfDocument, int]:
+        """
+        Args:
+            output_name: 出力ファイル名（省略時は '<stem>-opt.pdf'）
+            linearize: True の場合、Fast Web View 用に線形化して保存する
+
+        Returns:
+            (最適化した PdfDocument, まとめたストリームの数)
+        """
+        pdf_doc.validate()
+        output_path = pdf_doc.path.parent / (output_name or f"{pdf_doc.path.stem}-opt.pdf")
+
+        with pikepdf.open(pdf_doc.path) as pdf:
+            pdf.remove_unreferenced_resources()
+            merged = 0
+            for _ in range(MAX_DEDUP_PASSES):
+                replaced = self._dedup_streams(pdf)
+                if not replaced:
+                    break
+                merged += len(replaced)
+            with _flate_lock:
+                pikepdf.settings.set_flate_compression_level(self.compression_level)
+                try:
+                    pdf.save(
+                        output_path,
+                        compress_streams=True,
+                        recompress_flate=True,
+                        # 画像（DCT など）は劣化させないよう，汎用フィルタだけを解いて圧縮し直す
+                        stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                        object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                        linearize=linearize,
+                    )
+                finally:
+                    pikepdf.settings.set_flate_compression_level(_DEFAULT_FLATE_LEVEL)
+        return PdfDocument(path=output_path), merged
+
+    @classmethod
+    def _dedup_streams(cls, pdf: pikepdf.Pdf) -> set[tuple[int, int]]:
+        """
+        内容と辞書が同じストリームへの参照を，最初に見つけたものに付け替える。
+        ページなどから参照されているものだけを対象にする（前の回で付け替えたものは除かれる）。
+
+        Returns:
+            付け替えたストリームの番号（参照されなくなったものは保存時に落ちる）
+        """
+        reachable = cls._reachable(pdf)
+        candidates = [obj for obj in cls._candidates(pdf) if obj.objgen in reachable]
+        canonical: dict[str, pikepdf.Object] = {}
+        replace: dict[tuple[int, int], pikepdf.Object] = {}
+        for stream in candidates:
+            key = cls._stream_key(stream)
+            if key in canonical:
+                replace[stream.objgen] = canonical[key]
+            else:
+                canonical[key] = stream
+        if not replace:
+            return set()
+        for obj in pdf.objects:
+            cls._rewrite(obj, replace)
+        return set(replace)
+
+    @classmethod
+    def _reachable(cls, pdf: pikepdf.Pdf) -> set[tuple[int, int]]:
+        """
+        トレーラからたどれる間接オブジェクトの番号（保存時に書き出されるもの）。
+        """
+        seen: set[tuple[int, int]] = set()
+        stack = [pdf.trailer]
+        while stack:
+            for value in cls._children(stack.pop()):
+                if value.is_indirect:
+                    if value.objgen in seen:
+                        continue
+                    seen.add(value.objgen)
+                stack.append(value)
+        return seen
+
+    @staticmethod
+    def _children(obj) -> list:
+        if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+            values = [obj[k] for k in obj.keys()]
+        elif isinstance(obj, pikepdf.Array):
+            values = list(obj)
+        else:
+            return []
+        return [v for v in values if isinstance(v, (pikepdf.Dictionary, pikepdf.Stream, pikepdf.Array))]
+
+    @staticmethod
+    def _candidates(pdf: pikepdf.Pdf) -> list[pikepdf.Object]:
+        found: dict[tuple[int, int], pikepdf.Object] = {}
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Stream) and obj.get("/Subtype") in ("/Image", "/Form"):
+                found[obj.objgen] = obj
+            elif isinstance(obj, pikepdf.Dictionary) and obj.get("/Type") == "/FontDescriptor":
+                for key in _FONT_FILE_KEYS:
+                    font_file = obj.get(key)
+                    if isinstance(font_file, pikepdf.Stream) and font_file.is_indirect:
+                        found[font_file.objgen] = font_file
+        return [obj for obj in found.values() if obj.is_indirect]
+
+    @staticmethod
+    def _stream_key(stream: pikepdf.Stream) -> str:
+        h = hashlib.sha256(stream.read_raw_bytes())
+        for name in sorted(k for k in stream.keys() if k != "/Length"):
+            value = stream[name]
+            # 間接参照は参照先の番号で比べる（付け替えの後は同じ番号になる）
+            if isinstance(value, pikepdf.Object):
+                value = value.objgen if value.is_indirect else value.unparse()
+            h.update(name.encode())
+            h.update(repr(value).encode())
+        return h.hexdigest()
+
+    @classmethod
+    def _rewrite(cls, obj, replace) -> None:
+        """
+        obj の中（直接オブジェクトの入れ子を含む）の参照を付け替える。
+        """
+        if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+            items = [(k, obj[k]) for k in obj.keys()]
+        elif isinstance(obj, pikepdf.Array):
+            items = list(enumerate(obj))
+        else:
+            return
+        for key, value in items:
+            if not isinstance(value, (pikepdf.Dictionary, pikepdf.Stream, pikepdf.Array)):
+                continue
+            if value.is_indirect:
+                target = replace.get(value.objgen)
+                if target is not None:
+                    obj[key] = target
+            else:
+                cls._rewrite(value, replace)
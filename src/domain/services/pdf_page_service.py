@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pikepdf
+
+from domain.models.pdf_document import PdfDocument
+
+# ページの描画内容を構成するキー（/Annots や /Parent などページの構造は置き換えない）
+_CONTENT_KEYS = ("/Contents", "/Resources", "/Group", "/MediaBox", "/CropBox", "/Rotate")
+
+
+class PdfPageService:
+    """
+    pikepdf で PDF をページ範囲ごとのファイルに分割し，処理後のページを元の文書に書き戻すサービス。
+    ページごとの並列処理や，1 ページ 1 ファイルの出力に使う。
+    """
+
+    def page_count(self, pdf_doc: PdfDocument) -> int:
+        pdf_doc.validate()
+        with pikepdf.open(pdf_doc.path) as pdf:
+            return len(pdf.pages)
+
+    def split(
+        self,
+        pdf_doc: PdfDocument,
+        pages_per_file: int = 1,
+        keep_attachments: bool = False,
+        output_dir: Path | None = None,
+    ) -> list[PdfDocument]:
+        """
+        Args:
+            pages_per_file: 1 ファイルあたりのページ数
+            keep_attachments: 添付ファイル（埋め込んだ main.tex など）を各ファイルにも付けるか
+            output_dir: 出力先（省略時は入力と同じディレクトリ）
+
+        Returns:
+            ページ順の PdfDocument のリスト。ファイル名は '<stem>-page-<先頭ページ番号>.pdf'
+        """
+        pdf_doc.validate()
+        if pages_per_file < 1:
+            raise ValueError(f"pages_per_file must be positive: {pages_per_file}")
+        directory = output_dir or pdf_doc.path.parent
+        directory.mkdir(parents=True, exist_ok=True)
+
+        parts: list[PdfDocument] = []
+        with pikepdf.open(pdf_doc.path) as pdf:
+            attachments = (
+                {name: spec.get_file().read_bytes() for name, spec in pdf.attachments.items()}
+                if keep_attachments
+                else {}
+            )
+            for start in range(0, len(pdf.pages), pages_per_file):
+                with pikepdf.new() as part:
+                    part.pages.extend(pdf.pages[start : start + pages_per_file])
+                    for name, data in attachments.items():
+                        part.attachments[name] = data
+                    path = directory / f"{pdf_doc.path.stem}-page-{start + 1:03d}.pdf"
+                    part.save(path)
+                parts.append(PdfDocument(path=path))
+        return parts
+
+    def replace_pages(
+        self, original: PdfDocument, parts: list[PdfDocument], output_path: Path
+    ) -> PdfDocument:
+        """
+        original のページの描画内容を，parts のページ（original と同じ順・同じ枚数）で置き換えて
+        output_path に保存する。ページオブジェクトは original のものを残すため，
+        しおり (/Outlines)・ページラベル・リンクの移動先などページへの参照はそのまま使える。
+        """
+        original.validate()
+        sources = []
+        try:
+            with pikepdf.open(original.path) as pdf:
+                pages = []
+                for part in parts:
+                    part.validate()
+                    src = pikepdf.open(part.path)
+                    sources.append(src)
+                    pages.extend((src, page) for page in src.pages)
+                if len(pages) != len(pdf.pages):
+                    raise ValueError(
+                        f"Page count mismatch: {len(pages)} processed, {len(pdf.pages)} original."
+                    )
+                for page, (src, processed) in zip(pdf.pages, pages):
+                    for key in _CONTENT_KEYS:
+                        if key not in processed.obj:
+                            continue
+                        value = processed.obj[key]
+                        if isinstance(value, pikepdf.Object):
+                            # copy_foreign は間接オブジェクトしか受け付けない
+                            if not value.is_indirect:
+                                value = src.make_indirect(value)
+                            value = pdf.copy_foreign(value)
+                        page.obj[key] = value
+                pdf.save(output_path)
+        finally:
+            for src in sources:
+                src.close()
+        return PdfDocument(path=output_path)
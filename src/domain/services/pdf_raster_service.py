@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pikepdf
+
+from domain.models.pdf_document import PdfDocument
+from domain.services.file_cache_service import FileCache, content_hash
+from domain.services.process_runner import run_captured
+
+SUPPORTED_IMAGE_FORMATS = ("png", "webp")
+
+
+class PdfRasterService:
+    """
+    PdfDocument を Ghostscript の png16malpha デバイスでアルファ付き画像に変換するサービス。
+    ページごとに gs を並列実行し、結果は PDF のハッシュと DPI をキーにキャッシュする。
+    """
+
+    def __init__(self, cache: FileCache | None = None, max_workers: int = 4):
+        self.cache = cache
+        self.max_workers = max_workers
+
+    def render(
+        self,
+        pdf_doc: PdfDocument,
+        dpi: int = 144,
+        image_format: str = "png",
+    ) -> tuple[list[Path], bool]:
+        """
+        Args:
+            pdf_doc: 変換対象の PdfDocument
+            dpi: 解像度
+            image_format: 'png' または 'webp'
+
+        Returns:
+            (ページ順の画像ファイルパスのリスト, キャッシュヒットしたかどうか)
+        """
+        pdf_doc.validate()
+        if image_format not in SUPPORTED_IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        if dpi <= 0:
+            raise ValueError(f"DPI must be positive: {dpi}")
+
+        def populate(directory: Path) -> None:
+            self._render_pages(pdf_doc, directory, dpi, image_format)
+
+        if self.cache is None:
+            directory = pdf_doc.path.with_name(f"{pdf_doc.path.stem}-{dpi}dpi")
+            directory.mkdir(parents=True, exist_ok=True)
+            populate(directory)
+            hit = False
+        else:
+            key = content_hash(pdf_doc.path.read_bytes(), str(dpi), image_format)
+            directory, hit = self.cache.get_or_create(key, populate)
+
+        return sorted(directory.glob(f"page-*.{image_format}")), hit
+
+    def _render_pages(
+        self, pdf_doc: PdfDocument, directory: Path, dpi: int, image_format: str
+    ) -> None:
+        with pikepdf.Pdf.open(pdf_doc.path) as pdf:
+            page_count = len(pdf.pages)
+
+        def render_page(page_no: int) -> None:
+            png_path = directory / f"page-{page_no:03d}.png"
+            run_captured(
+                [
+                    "gs",
+                    "-q",
+                    "-dNOPAUSE",
+                    "-dBATCH",
+                    "-dSAFER",
+                    "-sDEVICE=png16malpha",
+                    f"-r{dpi}",
+                    "-dTextAlphaBits=4",
+                    "-dGraphicsAlphaBits=4",
+                    f"-dFirstPage={page_no}",
+                    f"-dLastPage={page_no}",
+                    f"-sOutputFile={png_path}",
+                    str(pdf_doc.path),
+                ]
+            )
+            if image_format == "webp":
+                # Pillow は pikepdf の依存として導入済み
+                from PIL import Image
+
+                with Image.open(png_path) as img:
+                    img.save(png_path.with_suffix(".webp"), "WEBP", lossless=True)
+                png_path.unlink()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # list() で例外を呼び出し元に伝播させる
+            list(pool.map(render_page, range(1, page_count + 1)))
@@ -1,13 +1,30 @@
-import subprocess
+import math
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
 from domain.models.pdf_document import PdfDocument
+from domain.services.ghostscript_service import GhostscriptService
+from domain.services.pdf_page_service import PdfPageService
 
 class PdfTransparencyService:
     """
     PDF の白背景を透明化するサービス。
     Ghostscript の pdfwrite デバイスでマスクカラーを設定し、
     ベクターベースの透過 PDF を生成する。
+    max_workers が 2 以上で複数ページの場合は，ページ範囲ごとに分割して並列に処理し，
+    元の文書のページに書き戻す（フォントの重複を抑えるため，分割数はワーカー数までに留める）。
     """
 
+    def __init__(
+        self,
+        ghostscript: GhostscriptService | None = None,
+        page_service: PdfPageService | None = None,
+        max_workers: int = 1,
+    ):
+        self.ghostscript = ghostscript or GhostscriptService()
+        self.page_service = page_service or PdfPageService()
+        self.max_workers = max_workers
+
     def make_transparent(
         self,
         pdf_doc: PdfDocument,
@@ -34,21 +51,35 @@ class PdfTransparencyService:
         name = output_name or f"{stem}-transp.pdf"
         output_path = parent / name
 
-        # Ghostscript コマンド構築
-        # 順序: -sDEVICE, -dCompatibilityLevel, -sOutputFile, -c, -f
-        cmd = [
-            "gs",
-            "-q",
-            "-dNOPAUSE",
-            "-dBATCH",
-            "-sDEVICE=pdfwrite",
-            f"-dCompatibilityLevel={compatibility_level}",
-            f"-sOutputFile={output_path}",
-            "-c",
-            f"<< /MaskColor [{mask_color[0]} {mask_color[1]} {mask_color[2]}] /ProcessColorModel /DeviceRGB >> setpagedevice",
-            "-f",
-            str(pdf_doc.path)
-        ]
-        subprocess.run(cmd, check=True)
-
-        return PdfDocument(path=output_path)
+        def run(source: PdfDocument, target) -> None:
+            # pdfwrite でマスクカラーを設定して再出力（libgs があればプロセス内で実行）
+            self.ghostscript.run(
+                "pdfwrite",
+                source.path,
+                target,
+                params={"CompatibilityLevel": compatibility_level},
+                setup=f"<< /MaskColor [{mask_color[0]} {mask_color[1]} {mask_color[2]}] /ProcessColorModel /DeviceRGB >> setpagedevice",
+            )
+
+        page_count = self.page_service.page_count(pdf_doc) if self.max_workers > 1 else 1
+        if page_count <= 1:
+            run(pdf_doc, output_path)
+            return PdfDocument(path=output_path)
+
+        # ページ範囲ごとに分割して並列に処理し，元の文書のページに書き戻す
+        # （しおりやリンクなど文書全体の構造は元の文書のものを残す）
+        workdir = parent / f"{stem}-transp-pages"
+        try:
+            parts = self.page_service.split(
+                pdf_doc,
+                pages_per_file=math.ceil(page_count / self.max_workers),
+                output_dir=workdir,
+            )
+            outputs = [part.path.with_name(f"{part.path.stem}-transp.pdf") for part in parts]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(run, parts, outputs))
+            return self.page_service.replace_pages(
+                pdf_doc, [PdfDocument(path=p) for p in outputs], output_path
+            )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Callable, Sequence, TypeVar
+
+from domain.models.latexmkrc_source import LatexmkrcSource
+from domain.models.tex_document import TexDocument, canonical_tex
+from domain.services.file_cache_service import content_hash
+
+T = TypeVar("T")
+
+
+def preamble_key(tex_content: str, latexmkrc_content: str) -> str:
+    """
+    プリアンブルと latexmkrc を正規化したハッシュ。
+    このキーが同じジョブはフォーマットファイルや作業ディレクトリを共有できる。
+    コメントや空白など TeX が読み飛ばす違いは同じプリアンブルとみなす。
+    """
+    return content_hash(
+        canonical_tex(TexDocument(content=tex_content).preamble),
+        LatexmkrcSource(content=latexmkrc_content).canonical_content(),
+    )
+
+
+class PreambleGroupingService:
+    """
+    待機中のジョブを，同じプリアンブルのもの同士でまとめて並べ替えるサービス。
+
+    先頭のジョブを起点に，後続 window 件以内にある同じキーのジョブだけを前に寄せる。
+    そのため単独のジョブが後回しにされるのは高々 window 件分に抑えられる。
+    """
+
+    def __init__(self, window: int = 16, max_group: int = 32):
+        if window < 0 or max_group < 1:
+            raise ValueError(f"Invalid grouping parameters: window={window}, max_group={max_group}")
+        self.window = window
+        self.max_group = max_group
+
+    def group(
+        self,
+        items: Sequence[T],
+        key: Callable[[T], str],
+        max_group: int | None = None,
+    ) -> list[list[T]]:
+        """
+        Args:
+            max_group: グループの最大サイズ（省略時はコンストラクタの値）
+        Returns:
+            グループのリスト。グループの順序は各グループの先頭要素の元の順序に従う
+        """
+        limit = min(self.max_group, max_group or self.max_group)
+        remaining = deque((key(item), item) for item in items)
+        groups: list[list[T]] = []
+        while remaining:
+            head_key, head = remaining.popleft()
+            group = [head]
+            # 先読みするのは window 件まで（それより後ろの順序は変えない）
+            lookahead = [remaining.popleft() for _ in range(min(self.window, len(remaining)))]
+            rest = []
+            for k, item in lookahead:
+                if k == head_key and len(group) < limit:
+                    group.append(item)
+                else:
+                    rest.append((k, item))
+            remaining.extendleft(reversed(rest))
+            groups.append(group)
+        return groups
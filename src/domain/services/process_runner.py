@@ -0,0 +1,61 @@
+import os
+import signal
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+# 失敗時の例外に添える出力の行数
+DEFAULT_TAIL_LINES = 200
+
+
+def run_captured(
+    cmd: list[str],
+    cwd: Path | None = None,
+    on_line: Callable[[str], bool] | None = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+) -> list[str]:
+    """
+    外部コマンドを実行し，標準出力と標準エラーを 1 行ずつ読み取る。
+    出力はサーバのコンソールには流さず，末尾 tail_lines 行だけをリングバッファに残す。
+    on_line が True を返した時点でプロセスグループごと停止する（致命的なエラーでの早期中断）。
+
+    Returns:
+        出力の末尾の行
+    Raises:
+        subprocess.CalledProcessError: 終了コードが 0 以外，または中断した場合。
+            output に出力の末尾を持つ
+    """
+    tail: deque[str] = deque(maxlen=tail_lines)
+    aborted = False
+    # TeX が入力待ちで止まらないよう stdin は閉じておく
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        start_new_session=True,
+    ) as proc:
+        for line in proc.stdout:
+            line = line.rstrip("\r\n")
+            tail.append(line)
+            if on_line is not None and on_line(line):
+                aborted = True
+                # latexmk が起動したエンジンも含めて止める
+                try:
+                    if hasattr(os, "killpg"):
+                        os.killpg(proc.pid, signal.SIGTERM)
+                    else:
+                        proc.terminate()
+                except ProcessLookupError:
+                    pass
+                break
+        proc.stdout.close()
+        returncode = proc.wait()
+
+    if aborted or returncode != 0:
+        raise subprocess.CalledProcessError(returncode or -signal.SIGTERM, cmd, output="\n".join(tail))
+    return list(tail)
@@ -0,0 +1,64 @@
+import base64
+import re
+from typing import List, Optional
+from xml.sax.saxutils import quoteattr
+
+from domain.models.svg_document import SvgDocument
+from domain.models.embedded_file import EmbeddedFile
+
+# 埋め込みメタデータの XML 名前空間
+SVG_METADATA_NAMESPACE = "https://github.com/mory22k/latexcrop"
+
+_SVG_START_TAG = re.compile(rb"<svg\b[^>]*>")
+
+
+class SvgEmbedService:
+    """
+    SvgDocument の <metadata> に .tex ファイルなどを埋め込み、新たな SvgDocument を返すサービス
+    """
+
+    def embed(
+        self,
+        svg_doc: SvgDocument,
+        embedded_files: List[EmbeddedFile],
+        output_name: Optional[str] = None,
+    ) -> SvgDocument:
+        """
+        Args:
+            svg_doc: 埋め込み対象の SvgDocument
+            embedded_files: EmbeddedFile オブジェクトのリスト
+            output_name: 出力ファイル名（省略時は '<stem>-embed.svg'）
+
+        Returns:
+            SvgDocument: 埋め込み後の SVG ドキュメントモデル
+        """
+        # 入力 SVG の検証
+        svg_doc.validate()
+
+        # 出力パスの決定
+        output_filename = output_name or f"{svg_doc.path.stem}-embed.svg"
+        output_path = svg_doc.path.parent / output_filename
+
+        # メタデータ要素を構築（内容は base64 で格納し XML エスケープの問題を避ける）
+        entries = []
+        for file in embedded_files:
+            file.validate()
+            payload = base64.b64encode(file.data).decode("ascii")
+            entries.append(
+                f"<latexcrop:file name={quoteattr(file.name)} encoding=\"base64\">"
+                f"{payload}</latexcrop:file>"
+            )
+        metadata = (
+            f"<metadata><latexcrop:files xmlns:latexcrop=\"{SVG_METADATA_NAMESPACE}\">"
+            + "".join(entries)
+            + "</latexcrop:files></metadata>"
+        ).encode("utf-8")
+
+        # ルート要素の開始タグ直後に挿入
+        data = svg_doc.path.read_bytes()
+        match = _SVG_START_TAG.search(data)
+        if match is None or match.group(0).endswith(b"/>"):
+            raise ValueError(f"Cannot find the <svg> start tag: {svg_doc.path}")
+        output_path.write_bytes(data[: match.end()] + metadata + data[match.end() :])
+
+        return SvgDocument(path=output_path)
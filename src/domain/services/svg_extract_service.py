@@ -0,0 +1,29 @@
+import base64
+import xml.etree.ElementTree as ET
+
+from domain.models.svg_document import SvgDocument
+from domain.models.embedded_file import EmbeddedFile
+from domain.services.svg_embed_service import SVG_METADATA_NAMESPACE
+
+
+class SvgExtractService:
+    """
+    Service to extract all embedded .tex files from the metadata of an SVG.
+    """
+
+    def extract(self, svg_doc: SvgDocument) -> list[EmbeddedFile]:
+        """
+        Args:
+            svg_doc: 検証済みの SvgDocument
+        Returns:
+            埋め込まれた .tex ファイルを EmbeddedFile リストで返却
+        """
+        svg_doc.validate()
+        root = ET.parse(svg_doc.path).getroot()
+        extracted: list[EmbeddedFile] = []
+        for node in root.iter(f"{{{SVG_METADATA_NAMESPACE}}}file"):
+            name = node.get("name", "")
+            if name.lower().endswith(".tex"):
+                data = base64.b64decode(node.text or "")
+                extracted.append(EmbeddedFile(name=name, data=data))
+        return extracted
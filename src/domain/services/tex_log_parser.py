@@ -0,0 +1,106 @@
+import re
+from dataclasses import replace
+
+from domain.models.tex_diagnostic import TexDiagnostic
+
+# -file-line-error 形式: "./main.tex:12: Undefined control sequence."
+_FILE_LINE_ERROR = re.compile(r"^(\.{0,2}/?[^:\s()]+\.\w+):(\d+): (.*)$")
+# "! ..." に続く "l.12 \foo" の行
+_LINE_NUMBER = re.compile(r"^l\.(\d+)")
+# "LaTeX Warning: ...", "Package hyperref Warning: ...", "LaTeX Font Warning: ..."
+_WARNING = re.compile(r"^(?:LaTeX|Package \S+|Class \S+)(?: Font)? Warning: (.*)$")
+_INPUT_LINE = re.compile(r"on input line (\d+)")
+# "Overfull \hbox (12.3pt too wide) in paragraph at lines 5--6"
+_BADBOX = re.compile(r"^((?:Over|Under)full \\[hv]box .*?)(?: at lines? (\d+)(?:--\d+)?)?$")
+# 参照の解決などのために再実行が必要であることを示すメッセージ
+_RERUN = re.compile(
+    r"Rerun to get|Label\(s\) may have changed|Please \(re\)run|There were undefined references"
+)
+# 開き括弧の直後のファイル名，または閉じ括弧
+_FILE_TOKEN = re.compile(r"\(([^\s()]*)|\)")
+
+
+class TexLogParser:
+    """
+    TeX のログ（またはエンジンの端末出力）を 1 行ずつ受け取り，
+    エラー・警告・overfull/underfull box・再実行の要求を抽出するパーサ。
+    ファイルの入れ子は括弧の対応から近似的に追跡する。
+    """
+
+    def __init__(self):
+        self.diagnostics: list[TexDiagnostic] = []
+        self._files: list[str] = []
+        self._pending: TexDiagnostic | None = None
+
+    @property
+    def current_file(self) -> str | None:
+        return next((f for f in reversed(self._files) if f), None)
+
+    def feed(self, line: str) -> list[TexDiagnostic]:
+        """
+        Returns:
+            この行で確定した診断
+        """
+        line = line.rstrip("\r\n")
+        found: list[TexDiagnostic] = []
+        if m := _FILE_LINE_ERROR.match(line):
+            self._pending = None
+            found.append(TexDiagnostic("error", m[3].strip(), m[1], int(m[2])))
+        elif line.startswith("! "):
+            found.extend(self._flush())
+            self._pending = TexDiagnostic("error", line[2:].strip(), self.current_file)
+        elif self._pending is not None and (m := _LINE_NUMBER.match(line)):
+            found.append(replace(self._pending, line=int(m[1])))
+            self._pending = None
+        elif m := _WARNING.match(line):
+            n = _INPUT_LINE.search(line)
+            level = "rerun" if _RERUN.search(line) else "warning"
+            found.append(TexDiagnostic(level, m[1].strip(), self.current_file, int(n[1]) if n else None))
+        elif m := _BADBOX.match(line):
+            found.append(
+                TexDiagnostic("badbox", m[1].strip(), self.current_file, int(m[2]) if m[2] else None)
+            )
+        elif _RERUN.search(line):
+            found.append(TexDiagnostic("rerun", line.strip(), self.current_file))
+        else:
+            self._track_files(line)
+        self.diagnostics.extend(found)
+        return found
+
+    def close(self) -> list[TexDiagnostic]:
+        """
+        行番号が見つからないまま残っているエラーを確定させる。
+        """
+        found = self._flush()
+        self.diagnostics.extend(found)
+        return found
+
+    def _flush(self) -> list[TexDiagnostic]:
+        pending, self._pending = self._pending, None
+        return [pending] if pending is not None else []
+
+    def _track_files(self, line: str) -> None:
+        for m in _FILE_TOKEN.finditer(line):
+            if m[0] == ")":
+                if self._files:
+                    self._files.pop()
+            else:
+                name = m[1]
+                # "(see the transcript file)" のような括弧も対応を取るため空文字を積む
+                self._files.append(name if "." in name or "/" in name else "")
+
+    @property
+    def first_error(self) -> TexDiagnostic | None:
+        return next((d for d in self.diagnostics if d.level == "error"), None)
+
+    @property
+    def needs_rerun(self) -> bool:
+        return any(d.level == "rerun" for d in self.diagnostics)
+
+
+def parse_tex_log(text: str) -> list[TexDiagnostic]:
+    parser = TexLogParser()
+    for line in text.splitlines():
+        parser.feed(line)
+    parser.close()
+    return parser.diagnostics
@@ -0,0 +1,295 @@
+import bisect
+import re
+
+from domain.models.tex_diagnostic import TexDiagnostic
+from domain.models.tex_document import VERBATIM_ENVIRONMENTS, TexDocument
+
+# 制御綴・波括弧・数式の区切り・コメント・改行だけを拾い，地の文は読み飛ばす
+_TOKEN = re.compile(r"\\(?:[A-Za-z@]+|.)|[{}$%\n]", re.DOTALL)
+
+# シェルを起動できる命令
+FORBIDDEN_COMMANDS = frozenset({"ShellEscape", "directlua", "luaexec"})
+# ファイル名を引数に取る命令（絶対パスや親ディレクトリの参照を禁止する）
+PATH_COMMANDS = frozenset(
+    {"input", "include", "InputIfFileExists", "includegraphics", "lstinputlisting", "verbatiminput"}
+)
+_ABSOLUTE_PATH = re.compile(r"^(?:[/\\~|]|[A-Za-z]:[/\\])")
+_BARE_ARGUMENT = re.compile(r"[^\s{}%]+")
+_WRITE18 = re.compile(r"\s*18")
+# 引数を verbatim として読む命令と，その前に置かれる通常の {...} 引数の数（\\href は最初の引数だけ）
+VERBATIM_ARGUMENT_COMMANDS = {
+    "url": 0,
+    "nolinkurl": 0,
+    "path": 0,
+    "href": 0,
+    "lstinline": 0,
+    "Verb": 0,
+    "spverb": 0,
+    "mintinline": 1,
+}
+_MATH_CLOSERS = {"\\(": "\\)", "\\[": "\\]", "$": "$", "$$": "$$"}
+MAX_DIAGNOSTICS = 20
+
+
+class TexPreflightError(ValueError):
+    """
+    TeX を起動する前の検査で見つかった問題を表す例外。
+    """
+
+    def __init__(self, diagnostics: list[TexDiagnostic]):
+        super().__init__("; ".join(str(d) for d in diagnostics))
+        self.diagnostics = diagnostics
+
+
+class TexPreflightService:
+    """
+    latexmk を起動する前に TeX ソースを 1 パスで検査するサービス。
+    - 波括弧の対応
+    - 環境の対応（\\begin{document} 以降）
+    - 数式の区切り（$, $$, \\( \\), \\[ \\]）の対応と，数式中の空行
+    - シェルを起動する命令（\\write18 など）と，絶対パスや .. を含むファイル参照
+    コメント・verbatim 系の環境・\\verb や \\url などの verbatim 引数の中身は検査しない。
+    verbatim 引数の終わりが決められない場合は warning を 1 件報告し，それ以降は検査しない。
+    """
+
+    def __init__(self, file_name: str = "main.tex"):
+        self.file_name = file_name
+
+    def validate(self, tex_doc: TexDocument) -> list[TexDiagnostic]:
+        """
+        Returns:
+            list[TexDiagnostic]: エラーにはしない warning
+
+        Raises:
+            TexPreflightError: error が見つかった場合
+        """
+        diagnostics = self.check(tex_doc)
+        errors = [d for d in diagnostics if d.level == "error"]
+        if errors:
+            raise TexPreflightError(errors)
+        return diagnostics
+
+    def check(self, tex_doc: TexDocument) -> list[TexDiagnostic]:
+        text = tex_doc.content
+        # 行番号は報告するときにだけ改行位置の二分探索で求める
+        newlines = [m.start() for m in re.finditer("\n", text)]
+        found: list[TexDiagnostic] = []
+        braces: list[int] = []
+        environments: list[tuple[str, int]] = []
+        math: tuple[str, int] | None = None
+        # 数式中の空行を報告した後は，本来の閉じ記号まで数式の区切りを読み飛ばす
+        stale_closer: str | None = None
+        in_body = False
+        last_newline = -1
+
+        def line_of(at: int) -> int:
+            return bisect.bisect_left(newlines, at) + 1
+
+        def report(message: str, at: int, level: str = "error") -> None:
+            found.append(TexDiagnostic(level, message, self.file_name, line_of(at)))
+
+        pos = 0
+        while len(found) < MAX_DIAGNOSTICS and (m := _TOKEN.search(text, pos)):
+            token, start, pos = m.group(), m.start(), m.end()
+
+            if token == "\n":
+                # 数式の中の空行（\par）は TeX ではエラーになる
+                if in_body and math is not None and not text[last_newline + 1 : start].strip():
+                    report(f"Blank line inside math mode opened with {math[0]}", math[1])
+                    stale_closer = _MATH_CLOSERS[math[0]]
+                    math = None
+                last_newline = start
+            elif token == "%":
+                end = text.find("\n", pos)
+                pos = len(text) if end < 0 else end
+            elif token == "{":
+                braces.append(start)
+            elif token == "}":
+                if braces:
+                    braces.pop()
+                else:
+                    report("Unmatched '}'", start)
+            elif token == "$":
+                # インライン数式の中の $$ は，閉じる $ と次を開く $ が続いたもの（$a$$b$）
+                in_inline = (math is not None and math[0] == "$") or stale_closer == "$"
+                if text.startswith("$", pos) and not in_inline:
+                    token, pos = "$$", pos + 1
+                if in_body and stale_closer is not None:
+                    stale_closer = None if token == stale_closer else stale_closer
+                elif in_body:
+                    math = self._toggle_math(token, math, start, report, line_of)
+            elif token in ("\\(", "\\)", "\\[", "\\]"):
+                if in_body and stale_closer is not None:
+                    stale_closer = None if token == stale_closer else stale_closer
+                elif in_body:
+                    math = self._toggle_math(token, math, start, report, line_of)
+            elif token == "\\verb":
+                pos = self._skip_verb(text, pos, start, report)
+            elif token[1:] in VERBATIM_ARGUMENT_COMMANDS:
+                leading = VERBATIM_ARGUMENT_COMMANDS[token[1:]]
+                end = self._skip_verbatim_argument(text, pos, leading)
+                if end is None:
+                    # 中身の区切りが分からないと以降の字句解析を信用できない
+                    report(
+                        f"Could not find the end of the {token} argument; skipped the rest",
+                        start,
+                        "warning",
+                    )
+                    return found
+                pos = end
+            elif token in ("\\begin", "\\end"):
+                name, pos = self._read_argument(text, pos)
+                if name is None:
+                    continue
+                if token == "\\begin":
+                    if name in VERBATIM_ENVIRONMENTS:
+                        end = text.find(f"\\end{{{name}}}", pos)
+                        if end < 0:
+                            report(f"Unclosed verbatim environment '{name}'", start)
+                            break
+                        pos = end + len(name) + 6
+                    elif name == "document" or in_body:
+                        in_body = True
+                        environments.append((name, start))
+                elif in_body:
+                    names = [env for env, _ in environments]
+                    if name not in names:
+                        report(f"\\end{{{name}}} without matching \\begin", start)
+                        continue
+                    if names[-1] != name:
+                        open_name, open_at = environments[-1]
+                        report(
+                            f"\\end{{{name}}} does not match \\begin{{{open_name}}}"
+                            f" on line {line_of(open_at)}",
+                            start,
+                        )
+                    # 対応する \begin まで閉じたものとして続ける
+                    while environments.pop()[0] != name:
+                        pass
+                    if name == "document":
+                        # \end{document} より後ろは TeX も読まない
+                        break
+            elif token == "\\write":
+                if _WRITE18.match(text, pos):
+                    report("\\write18 (shell escape) is not allowed", start)
+            elif token[1:] in FORBIDDEN_COMMANDS:
+                report(f"{token} is not allowed", start)
+            elif token[1:] in PATH_COMMANDS:
+                path, _ = self._read_argument(text, pos, space_delimited=token == "\\input")
+                if path is not None and (
+                    _ABSOLUTE_PATH.match(path.strip())
+                    or ".." in re.split(r"[/\\]", path.strip())
+                ):
+                    report(f"{token} of an absolute or parent path is not allowed: {path}", start)
+
+        if len(found) < MAX_DIAGNOSTICS:
+            if braces:
+                report("Unclosed '{'", braces[0])
+            if math is not None:
+                report(f"Unclosed math mode opened with {math[0]}", math[1])
+            for name, open_at in environments:
+                report(f"Unclosed environment '{name}'", open_at)
+        return found[:MAX_DIAGNOSTICS]
+
+    @staticmethod
+    def _toggle_math(token, math, at, report, line_of):
+        if math is None:
+            if token in ("\\)", "\\]"):
+                report(f"{token} without matching opener", at)
+                return None
+            return token, at
+        if _MATH_CLOSERS[math[0]] == token:
+            return None
+        report(f"{token} inside math mode opened with {math[0]} on line {line_of(math[1])}", at)
+        return math
+
+    @staticmethod
+    def _skip_verb(text: str, pos: int, at: int, report) -> int:
+        if text.startswith("*", pos):
+            pos += 1
+        if pos >= len(text):
+            report("\\verb without delimiter", at)
+            return pos
+        delimiter = text[pos]
+        end = text.find(delimiter, pos + 1)
+        newline = text.find("\n", pos + 1)
+        if end < 0 or (0 <= newline < end):
+            report(f"\\verb not closed with {delimiter!r} on the same line", at)
+            return pos + 1 if newline < 0 else newline
+        return end + 1
+
+    @classmethod
+    def _skip_verbatim_argument(cls, text: str, pos: int, leading: int) -> int | None:
+        """
+        任意引数 [...] と leading 個の通常の引数を読み飛ばし，続く verbatim 引数の直後の位置を返す。
+        verbatim 引数は {...}（中の波括弧は対応させる）か，\\verb と同じく同じ文字で囲んだもの。
+        終わりが決められない場合は None を返す。
+        """
+        n = len(text)
+        for _ in range(leading):
+            argument, pos = cls._read_argument(text, pos)
+            if argument is None:
+                return None
+        while pos < n and text[pos] in " \t":
+            pos += 1
+        if pos < n and text[pos] == "[":
+            end = text.find("]", pos)
+            if end < 0:
+                return None
+            pos = end + 1
+        if pos >= n or text[pos].isspace():
+            return None
+        if text[pos] == "{":
+            depth = 0
+            i = pos
+            while i < n:
+                if text[i] == "\\":
+                    i += 2
+                    continue
+                if text[i] == "{":
+                    depth += 1
+                elif text[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return i + 1
+                i += 1
+            return None
+        end = text.find(text[pos], pos + 1)
+        newline = text.find("\n", pos + 1)
+        if end < 0 or (0 <= newline < end):
+            return None
+        return end + 1
+
+    @staticmethod
+    def _read_argument(
+        text: str, pos: int, space_delimited: bool = False
+    ) -> tuple[str | None, int]:
+        """
+        任意引数 [...] を読み飛ばし，続く {...} の中身を返す。
+        space_delimited が True の場合は \\input foo のような空白区切りの引数も受け付ける。
+        """
+        n = len(text)
+        while pos < n and text[pos] in " \t":
+            pos += 1
+        if pos < n and text[pos] == "[":
+            end = text.find("]", pos)
+            if end < 0:
+                return None, pos
+            pos = end + 1
+            while pos < n and text[pos] in " \t":
+                pos += 1
+        if pos < n and text[pos] == "{":
+            depth = 0
+            for i in range(pos, n):
+                if text[i] == "{":
+                    depth += 1
+                elif text[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return text[pos + 1 : i], i + 1
+            return None, pos
+        if space_delimited:
+            m = _BARE_ARGUMENT.match(text, pos)
+            if m:
+                return m.group(), m.end()
+        return None, pos
@@ -0,0 +1,5 @@
+import sys
+
+from latexcrop.cli import main
+
+sys.exit(main())
@@ -0,0 +1,604 @@
+"""
+`latexcrop` コマンドのエントリポイント。
+
+起動時間を抑えるため，このモジュールのトップレベルでは標準ライブラリの
+軽量なモジュールのみを import し，ユースケースや pikepdf は
+各サブコマンドの実行時に初めて import する。
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# クラスタのコーディネータとワーカーが認証に使う共有シークレット
+CLUSTER_SECRET_ENV = "LATEXCROP_CLUSTER_SECRET"
+
+
+def _read_tex_inputs(tex_dir: Path) -> tuple[str, str]:
+    latexmkrc_content = (tex_dir / "latexmkrc").read_text(encoding="utf-8")
+    preamble = (tex_dir / "preamble").read_text(encoding="utf-8")
+    return preamble, latexmkrc_content
+
+
+def _add_format_argument(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "-f",
+        "--format",
+        choices=("pdf", "svg"),
+        default="pdf",
+        help="出力形式（svg は DVI から直接変換する高速経路）",
+    )
+
+
+def _add_batch_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="バッチ処理の並列数",
+    )
+    p.add_argument(
+        "--out-dir",
+        type=Path,
+        default=Path("result/batch"),
+        help="バッチ出力と manifest.json の出力先",
+    )
+    p.add_argument(
+        "--force",
+        action="store_true",
+        help="出力が最新でもバッチの全項目を再処理する",
+    )
+
+
+def _add_queue_arguments(p: argparse.ArgumentParser, workers: int) -> None:
+    p.add_argument(
+        "--queue",
+        type=Path,
+        default=Path("result/jobs.db") if workers else None,
+        help="ジョブキューの SQLite ファイル（serve では指定時のみ /jobs を有効にする）",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=workers or 1,
+        help="プロセス内で起動するジョブワーカーの数",
+    )
+
+
+# --- compile ---------------------------------------------------------------
+
+
+def cmd_compile(args: argparse.Namespace) -> int:
+    if args.batch:
+        args.source = args.batch
+        return cmd_batch(args)
+
+    from application.dto.pipeline_request import PipelineRequest
+    from application.pipeline_factory import build_pipeline_usecase
+    from application.tex_source import build_tex_content
+
+    tex_dir = args.workspace / "tex"
+    pipeline_uc = build_pipeline_usecase()
+    if args.watch:
+        return _watch(args, pipeline_uc, tex_dir)
+
+    preamble, latexmkrc_content = _read_tex_inputs(tex_dir)
+    body = (tex_dir / "texbody").read_text(encoding="utf-8")
+
+    # 実行
+    result = pipeline_uc.execute(
+        PipelineRequest(
+            tex_content=build_tex_content(preamble, body),
+            latexmkrc_content=latexmkrc_content,
+            margins=(0, 0, 0, 0),
+            output_format=args.format,
+            split_pages=args.split_pages,
+        )
+    )
+
+    # 成功時のみ出力ファイルを移動
+    if not result.is_success:
+        print("Error:")
+        for ln in result.logs:
+            print("  ", ln)
+        return 1
+    output = args.output.with_suffix(f".{args.format}")
+    (args.workspace / output).parent.mkdir(parents=True, exist_ok=True)
+    Path(result.pdf_path).rename(args.workspace / output)
+    print(f"Generated: {output}")
+    if result.size_metrics:
+        print(
+            f"Optimized: {result.size_metrics['input_bytes']} -> "
+            f"{result.size_metrics['output_bytes']} bytes "
+            f"({result.timings.get('optimize', 0.0):.3f}s)"
+        )
+    for i, page_path in enumerate(result.page_paths, start=1):
+        page_output = output.with_name(f"{output.stem}-page-{i:03d}{output.suffix}")
+        Path(page_path).replace(args.workspace / page_output)
+        print(f"Generated: {page_output}")
+    return 0
+
+
+def _watch(args: argparse.Namespace, pipeline_uc, tex_dir: Path) -> int:
+    import tempfile
+    import time
+
+    from application.dto.pipeline_request import PipelineRequest
+    from application.tex_source import build_tex_content
+    from domain.services.file_cache_service import content_hash
+    from domain.services.file_watch_service import FileWatchService
+
+    inputs = [tex_dir / "preamble", tex_dir / "texbody", tex_dir / "latexmkrc"]
+    watcher = FileWatchService(inputs)
+    # 反復ごとに同じ作業ディレクトリを使い，latexmk の差分コンパイルを効かせる
+    workdir = (
+        Path(tempfile.gettempdir())
+        / "latexcrop"
+        / "watch"
+        / content_hash(str(args.workspace.resolve()))[:16]
+    )
+    output = args.output.with_suffix(f".{args.format}")
+    (args.workspace / output).parent.mkdir(parents=True, exist_ok=True)
+    print(f"Watching {tex_dir} ({watcher.backend}). Press Ctrl-C to stop.")
+
+    current = watcher.snapshot()
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                result = pipeline_uc.execute(
+                    PipelineRequest(
+                        tex_content=build_tex_content(
+                            inputs[0].read_text(encoding="utf-8"),
+                            inputs[1].read_text(encoding="utf-8"),
+                        ),
+                        latexmkrc_content=inputs[2].read_text(encoding="utf-8"),
+                        margins=(0, 0, 0, 0),
+                        output_format=args.format,
+                        workdir=workdir,
+                    )
+                )
+                Path(result.pdf_path).replace(args.workspace / output)
+                stages = " | ".join(f"{k} {v:.3f}s" for k, v in result.timings.items())
+                print(
+                    f"[{time.strftime('%H:%M:%S')}] Generated: {output} "
+                    f"({time.perf_counter() - start:.3f}s: {stages})"
+                )
+            except Exception as e:
+                print(f"[{time.strftime('%H:%M:%S')}] Error: {e}")
+            current = watcher.wait_for_change(current)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+# --- batch -----------------------------------------------------------------
+
+
+def load_batch_items(source: str, default_preamble: str, default_rc: str) -> list:
+    """
+    バッチ入力を読み込む。
+    - ディレクトリ: 直下の *.tex を本文として読み込む（id はファイル名の stem）
+    - グロブ: マッチしたファイルを本文として読み込む
+    - .jsonl: 1 行ごとに {"id", "body", "preamble"?, "latexmkrc"?} を読み込む
+    """
+    import glob
+    import json
+
+    from application.dto.batch_request import BatchItem
+    from application.tex_source import build_tex_content
+
+    path = Path(source)
+    if path.suffix == ".jsonl" and path.is_file():
+        items = []
+        for ln, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "id" not in entry or "body" not in entry:
+                raise ValueError(f"{path}:{ln}: 'id' and 'body' are required.")
+            items.append(
+                BatchItem(
+                    item_id=str(entry["id"]),
+                    tex_content=build_tex_content(
+                        entry.get("preamble", default_preamble), entry["body"]
+                    ),
+                    latexmkrc_content=entry.get("latexmkrc", default_rc),
+                )
+            )
+        return items
+
+    if path.is_dir():
+        files = sorted(path.glob("*.tex"))
+    else:
+        files = sorted(Path(p) for p in glob.glob(source))
+    if not files:
+        raise ValueError(f"No batch inputs found for {source!r}")
+    return [
+        BatchItem(
+            item_id=f.stem,
+            tex_content=build_tex_content(
+                default_preamble, f.read_text(encoding="utf-8")
+            ),
+            latexmkrc_content=default_rc,
+        )
+        for f in files
+    ]
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    from application.dto.batch_request import BatchRequest
+    from application.pipeline_factory import build_pipeline_usecase
+    from application.usecases.process_batch_usecase import ProcessBatchUseCase
+
+    preamble, latexmkrc_content = _read_tex_inputs(args.workspace / "tex")
+    items = load_batch_items(args.source, preamble, latexmkrc_content)
+    coordinator = None
+    if getattr(args, "listen", None):
+        from application.usecases.remote_compile_usecase import RemoteCompileUseCase
+        from domain.services.compile_cluster_service import ClusterCoordinator
+
+        # 各項目はこのプロセスではなく，接続してきたワーカーで実行する
+        try:
+            coordinator = ClusterCoordinator(*_parse_address(args.listen), secret=_cluster_secret())
+        except ValueError as e:
+            print(f"{e} (set {CLUSTER_SECRET_ENV})", file=sys.stderr)
+            return 2
+        print("Waiting for workers on {}:{}".format(*coordinator.address))
+        batch_uc = ProcessBatchUseCase(RemoteCompileUseCase(coordinator))
+    else:
+        batch_uc = ProcessBatchUseCase(build_pipeline_usecase())
+    try:
+        result = batch_uc.execute(
+            BatchRequest(
+                items=items,
+                output_dir=args.workspace / args.out_dir,
+                jobs=args.jobs,
+                output_format=args.format,
+                resume=not args.force,
+            )
+        )
+    finally:
+        if coordinator is not None:
+            coordinator.close()
+
+    for item in result.items:
+        detail = item.error or (item.output_path.name if item.output_path else "")
+        print(f"[{item.status:>7}] {item.item_id} ({item.elapsed:.2f}s) {detail}")
+    print(f"Manifest: {result.manifest_path}")
+    return 0 if result.is_success else 1
+
+
+# --- extract ---------------------------------------------------------------
+
+
+def cmd_extract(args: argparse.Namespace) -> int:
+    from application.dto.extract_request import ExtractRequest
+    from application.usecases.extract_tex_usecase import ExtractTexUseCase
+    from domain.services.pdf_extract_service import PdfExtractService
+    from domain.services.svg_extract_service import SvgExtractService
+
+    # ユースケース初期化
+    extract_uc = ExtractTexUseCase(PdfExtractService(), SvgExtractService())
+
+    # PDF パスを決定
+    pdf_path: Path = args.workspace / args.pdf
+    pdf_path_lookup: Path = pdf_path.resolve().parent
+    if not pdf_path.exists():
+        pdf_candidates = list(pdf_path_lookup.glob("*.pdf"))
+        if not pdf_candidates:
+            print(f"No PDF files found in {pdf_path_lookup}")
+            return 1
+        pdf_path = pdf_candidates[0]
+
+    print(f"Using PDF: {pdf_path.name!r}")
+    if args.list or args.files:
+        return _extract_files(args, pdf_path)
+    res = extract_uc.execute(ExtractRequest(pdf_path=pdf_path))
+
+    # 出力ファイル作成
+    tex_dir = args.workspace / "tex"
+    tex_dir.mkdir(exist_ok=True)
+    body_out = tex_dir / "texbody"
+    body_out.write_text(res.body, encoding="utf-8")
+
+    print("Extracted to:")
+    print("  ", body_out)
+    return 0
+
+
+def _extract_files(args: argparse.Namespace, pdf_path: Path) -> int:
+    from application.dto.extract_request import ExtractRequest
+    from application.usecases.extract_files_usecase import ExtractFilesUseCase
+    from domain.services.pdf_extract_service import PdfExtractService
+
+    res = ExtractFilesUseCase(PdfExtractService()).execute(
+        ExtractRequest(pdf_path=pdf_path, file_names=tuple(args.files))
+    )
+    if args.list:
+        for entry in res.entries:
+            print(f"{entry.size:>10}  {entry.sha256[:12]}  {entry.name}")
+    if res.files:
+        # バンドル内の相対パスのまま tex/ 以下に書き出す
+        tex_dir = args.workspace / "tex"
+        print("Extracted to:")
+        for file in res.files:
+            print("  ", file.write_to(tex_dir))
+    return 0
+
+
+def _cluster_worker(args: argparse.Namespace, pipeline_uc) -> int:
+    import time
+
+    from application.usecases.cluster_worker_usecase import ClusterWorkerUseCase
+
+    worker_uc = ClusterWorkerUseCase(pipeline_uc, capacity=args.workers, secret=_cluster_secret())
+    host, port = _parse_address(args.connect)
+    print(f"Worker {worker_uc.worker_id} ({worker_uc.capacity} slots) -> {host}:{port}")
+    try:
+        while True:
+            try:
+                processed = worker_uc.run(host, port)
+                print(f"Coordinator disconnected after {processed} job(s).")
+            except OSError as e:
+                print(f"Cannot connect to the coordinator: {e}")
+            # コーディネータの再起動を待って再接続する
+            time.sleep(args.retry_interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# --- serve -----------------------------------------------------------------
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from application.pipeline_factory import build_pipeline_usecase
+    from application.usecases.extract_tex_usecase import ExtractTexUseCase
+    from domain.services.pdf_extract_service import PdfExtractService
+    from domain.services.svg_extract_service import SvgExtractService
+    from presentation.api_server import DEFAULT_MAX_OUTPUTS, CompileApi, create_server
+
+    tex_dir = args.workspace / "tex"
+    pipeline_uc = build_pipeline_usecase()
+    queue = _open_queue(args) if args.queue else None
+
+    # preamble と latexmkrc の既定値（リクエストで省略された場合に使う）
+    def read_default(name: str) -> str:
+        path = tex_dir / name
+        return path.read_text(encoding="utf-8") if path.exists() else ""
+
+    api = CompileApi(
+        pipeline_uc=pipeline_uc,
+        extract_uc=ExtractTexUseCase(PdfExtractService(), SvgExtractService()),
+        output_dir=args.workspace / args.out_dir,
+        workspace=args.workspace,
+        default_preamble=read_default("preamble"),
+        default_latexmkrc=read_default("latexmkrc"),
+        max_workers=args.jobs,
+        max_outputs=DEFAULT_MAX_OUTPUTS if args.max_outputs is None else args.max_outputs,
+        queue=queue,
+        asset_store=pipeline_uc.asset_store,
+    )
+    server = create_server(api, args.host, args.port, args.unix_socket)
+    stop = _start_workers(args, queue, pipeline_uc) if queue is not None else None
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"Serving on {where}. Press Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if stop is not None:
+            stop.set()
+        server.server_close()
+    return 0
+
+
+# --- worker ----------------------------------------------------------------
+
+
+def _open_queue(args: argparse.Namespace):
+    from domain.services.job_queue_service import JobQueueService
+
+    return JobQueueService(args.workspace / args.queue)
+
+
+def _start_workers(args: argparse.Namespace, queue, pipeline_uc):
+    import tempfile
+    import threading
+    import uuid
+
+    from application.usecases.job_worker_usecase import JobWorkerUseCase
+
+    stop = threading.Event()
+    for _ in range(args.workers):
+        worker_id = uuid.uuid4().hex
+        worker = JobWorkerUseCase(
+            queue,
+            pipeline_uc,
+            args.workspace / args.out_dir / "jobs",
+            worker_id=worker_id,
+            # ワーカーごとの作業ディレクトリ（同じプリアンブルが続くと差分コンパイルになる）
+            workdir=Path(tempfile.gettempdir()) / "latexcrop" / "worker" / worker_id,
+        )
+        threading.Thread(target=worker.run_forever, args=(stop,), daemon=True).start()
+    return stop
+
+
+def _parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _cluster_secret() -> str | None:
+    """
+    コーディネータとワーカーの共有シークレット（プロセス一覧に出ないよう環境変数で渡す）。
+    """
+    return os.environ.get(CLUSTER_SECRET_ENV) or None
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    from application.pipeline_factory import build_pipeline_usecase
+
+    if args.connect:
+        return _cluster_worker(args, build_pipeline_usecase())
+
+    queue = _open_queue(args)
+    stop = _start_workers(args, queue, build_pipeline_usecase())
+    print(f"Processing jobs from {args.workspace / args.queue}. Press Ctrl-C to stop.")
+    try:
+        while not stop.wait(60):
+            print(" ".join(f"{k}={v}" for k, v in sorted(queue.counts().items())))
+    except KeyboardInterrupt:
+        stop.set()
+    return 0
+
+
+# --- parser ----------------------------------------------------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="latexcrop",
+        description="Compile LaTeX snippets into cropped, transparent PDFs with embedded sources.",
+    )
+    p.add_argument(
+        "-C",
+        "--workspace",
+        type=Path,
+        default=Path("."),
+        help="tex/ の入力と相対パスの出力を解決するディレクトリ（既定: カレント）",
+    )
+    sub = p.add_subparsers(dest="command", required=True)
+
+    compile_p = sub.add_parser("compile", help="tex/ の入力をコンパイルする")
+    compile_p.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("result/output.pdf"),
+        help="出力PDFのパス",
+    )
+    _add_format_argument(compile_p)
+    compile_p.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="tex/ の入力を監視し，変更されるたびに差分コンパイルする",
+    )
+    compile_p.add_argument(
+        "--split-pages",
+        action="store_true",
+        help="結合した PDF に加えて，1 ページ 1 ファイルの PDF も出力する",
+    )
+    compile_p.add_argument(
+        "--batch",
+        metavar="SRC",
+        help="batch サブコマンドと同じ（後方互換用）",
+    )
+    _add_batch_arguments(compile_p)
+    compile_p.set_defaults(handler=cmd_compile)
+
+    batch_p = sub.add_parser("batch", help="複数の本文を並列にコンパイルする")
+    batch_p.add_argument(
+        "source",
+        help="本文ファイルのディレクトリ・グロブ，または {id, body, preamble?} の JSONL",
+    )
+    _add_format_argument(batch_p)
+    _add_batch_arguments(batch_p)
+    batch_p.add_argument(
+        "--listen",
+        metavar="[HOST:]PORT",
+        help="コーディネータとして待ち受け，`latexcrop worker --connect` のワーカーで実行する"
+        f"（HOST の既定は 127.0.0.1。それ以外で待ち受けるには {CLUSTER_SECRET_ENV} が必要）",
+    )
+    batch_p.set_defaults(handler=cmd_batch)
+
+    extract_p = sub.add_parser("extract", help="PDF に埋め込まれた TeX を tex/texbody に書き出す")
+    extract_p.add_argument(
+        "pdf",
+        type=Path,
+        nargs="?",
+        default=Path("result/output.pdf"),
+        help="Path to the PDF file to extract TeX from (default: result/output.pdf)",
+    )
+    extract_p.add_argument(
+        "--list",
+        action="store_true",
+        help="埋め込まれたファイル（バンドル内を含む）の一覧を表示する",
+    )
+    extract_p.add_argument(
+        "--file",
+        dest="files",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="指定したファイルだけを tex/ 以下に取り出す（複数指定可）",
+    )
+    extract_p.set_defaults(handler=cmd_extract)
+
+    serve_p = sub.add_parser("serve", help="パイプラインをローカルの JSON API として公開する")
+    serve_p.add_argument("--host", default="127.0.0.1", help="待ち受けるホスト")
+    serve_p.add_argument("--port", type=int, default=8765, help="待ち受けるポート")
+    serve_p.add_argument(
+        "--unix-socket",
+        type=Path,
+        help="TCP の代わりに待ち受ける Unix ドメインソケットのパス",
+    )
+    serve_p.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help="同時に実行するパイプラインの上限",
+    )
+    serve_p.add_argument(
+        "--out-dir",
+        type=Path,
+        default=Path("result/server"),
+        help="コンパイル結果の出力先",
+    )
+    serve_p.add_argument(
+        "--max-outputs",
+        type=int,
+        help="出力先に残す /compile の結果の数（超えたら古いものから消す。既定は 1000）",
+    )
+    _add_queue_arguments(serve_p, workers=0)
+    serve_p.set_defaults(handler=cmd_serve)
+
+    worker_p = sub.add_parser("worker", help="ジョブキューのジョブを処理し続ける")
+    _add_queue_arguments(worker_p, workers=1)
+    worker_p.add_argument(
+        "--out-dir",
+        type=Path,
+        default=Path("result/server"),
+        help="ジョブ結果の出力先（<out-dir>/jobs/<job_id>.<format>）",
+    )
+    worker_p.add_argument(
+        "--connect",
+        metavar="HOST:PORT",
+        help=f"ジョブキューの代わりにコーディネータ（batch --listen）に接続する（{CLUSTER_SECRET_ENV} で認証）",
+    )
+    worker_p.add_argument(
+        "--retry-interval",
+        type=float,
+        default=2.0,
+        help="コーディネータに再接続するまでの秒数",
+    )
+    worker_p.set_defaults(handler=cmd_worker)
+
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+import base64
+import json
+import os
+import re
+import shutil
+import socketserver
+import tempfile
+import threading
+import uuid
+from http import HTTPStatus
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+from application.dto.batch_request import BatchItem, BatchRequest
+from application.dto.extract_request import ExtractRequest
+from application.dto.pipeline_request import PipelineRequest
+from application.dto.process_result import ProcessResult
+from application.tex_source import build_tex_content
+from application.usecases.extract_tex_usecase import ExtractTexUseCase
+from application.usecases.get_job_status_usecase import GetJobStatusUseCase
+from application.usecases.process_batch_usecase import ProcessBatchUseCase
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.usecases.submit_job_usecase import SubmitJobUseCase
+from domain.models.tex_document import TexDocument
+from domain.services.asset_store_service import AssetStore
+from domain.services.job_queue_service import JobQueueService
+from domain.services.tex_preflight_service import TexPreflightService
+
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# output_dir の直下に残す /compile の出力ファイル数の既定値（古いものから消す）
+DEFAULT_MAX_OUTPUTS = 1000
+_OUTPUT_NAME = re.compile(r"[0-9a-f]{32}(?:-page-\d{3})?\.\w+")
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _SlotLimitedPipeline:
+    """
+    パイプラインの実行ごとに slots を取る薄いラッパー。
+    /batch の項目も /compile と同じ同時実行数の上限に数える。
+    """
+
+    def __init__(self, pipeline_uc: ProcessPdfPipelineUseCase, slots: threading.Semaphore):
+        self.pipeline_uc = pipeline_uc
+        self.slots = slots
+
+    def execute(self, request: PipelineRequest) -> ProcessResult:
+        with self.slots:
+            return self.pipeline_uc.execute(request)
+
+
+class CompileApi:
+    """
+    コンパイル・抽出・バッチのユースケースを JSON で呼び出すためのアプリケーション。
+    ユースケース（とその中のキャッシュ）はプロセス内で使い回し，
+    同時に走るパイプラインの数は max_workers で制限する。
+    queue を渡すと /jobs で非同期ジョブの投入と状態の問い合わせも受け付ける。
+    asset_store を渡すと /assets で画像などを 1 度だけ受け取り，compile の "assets" でダイジェストで参照できる。
+    /batch の出力先と /extract の入力は output_dir（と workspace）の下に限る。
+    /compile は 1 件ごとに一時ディレクトリで実行して後始末し，
+    output_dir の直下に移した出力は max_outputs 個を超えたら更新の古いものから消す。
+    """
+
+    def __init__(
+        self,
+        pipeline_uc: ProcessPdfPipelineUseCase,
+        extract_uc: ExtractTexUseCase,
+        output_dir: Path,
+        default_preamble: str = "",
+        default_latexmkrc: str = "",
+        max_workers: int = 4,
+        queue: JobQueueService | None = None,
+        asset_store: AssetStore | None = None,
+        workspace: Path | None = None,
+        max_outputs: int = DEFAULT_MAX_OUTPUTS,
+    ):
+        self.pipeline_uc = pipeline_uc
+        self.extract_uc = extract_uc
+        self.output_dir = output_dir
+        self.default_preamble = default_preamble
+        self.default_latexmkrc = default_latexmkrc
+        self.max_workers = max_workers
+        self.max_outputs = max_outputs
+        self.asset_store = asset_store
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self.batch_uc = ProcessBatchUseCase(_SlotLimitedPipeline(pipeline_uc, self._slots))
+        self._allowed_roots = [
+            root.resolve() for root in (output_dir, workspace) if root is not None
+        ]
+        self.preflight = TexPreflightService()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.routes: dict[tuple[str, str], Callable[[dict], dict]] = {
+            ("GET", "/health"): self.health,
+            ("POST", "/compile"): self.compile,
+            ("POST", "/extract"): self.extract,
+            ("POST", "/batch"): self.batch,
+        }
+        self.submit_uc = SubmitJobUseCase(queue) if queue is not None else None
+        self.status_uc = GetJobStatusUseCase(queue) if queue is not None else None
+        if queue is not None:
+            self.routes[("POST", "/jobs")] = self.submit_jobs
+        if asset_store is not None:
+            self.routes[("POST", "/assets")] = self.put_asset
+            self.routes[("POST", "/assets/missing")] = self.missing_assets
+
+    def handle(self, method: str, path: str, payload: dict) -> dict:
+        route = self.routes.get((method, path))
+        if route is None and method == "GET" and path.startswith("/jobs/") and self.status_uc:
+            return self.job_status(path.removeprefix("/jobs/"))
+        if route is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+        return route(payload)
+
+    def health(self, payload: dict) -> dict:
+        return {"status": "ok"}
+
+    def _pipeline_request(self, payload: dict) -> PipelineRequest:
+        tex_content, rc_content = self._tex_content(payload)
+        return PipelineRequest(
+            tex_content=tex_content,
+            latexmkrc_content=rc_content,
+            margins=tuple(payload.get("margins", (0, 0, 0, 0))),
+            linearize=bool(payload.get("linearize", False)),
+            output_format=payload.get("format", "pdf"),
+            mask_color=tuple(payload.get("mask_color", (1.0, 1.0, 1.0))),
+            skip_stages=tuple(payload.get("skip_stages", ())),
+            split_pages=bool(payload.get("split_pages", False)),
+            assets=dict(payload.get("assets", {})),
+        )
+
+    def _tex_content(self, payload: dict) -> tuple[str, str]:
+        if "tex_content" in payload:
+            tex_content = payload["tex_content"]
+        elif "body" in payload:
+            tex_content = build_tex_content(
+                payload.get("preamble", self.default_preamble), payload["body"]
+            )
+        else:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'tex_content' or 'body' is required.")
+        return tex_content, payload.get("latexmkrc", self.default_latexmkrc)
+
+    def compile(self, payload: dict) -> dict:
+        """
+        Request: {"tex_content" | "body" [, "preamble"], "latexmkrc"?, "margins"?,
+                  "mask_color"?, "skip_stages"?, "split_pages"?, "format"?,
+                  "assets"?: {path: sha256}, "return"?: "path" | "bytes"}
+        """
+        request = self._pipeline_request(payload)
+        output_format = request.output_format
+        # 壊れた入力はスロットを取る前に 400 で返す
+        self.preflight.validate(TexDocument(content=request.tex_content))
+        self._check_assets(request.assets)
+        # 中間ファイルも含めて作業ディレクトリごと消せるよう，1 件ごとの一時ディレクトリで実行する
+        with tempfile.TemporaryDirectory(prefix="latexcrop-api-") as workdir:
+            with self._slots:
+                result = self.pipeline_uc.execute(replace(request, workdir=Path(workdir)))
+
+            response: dict[str, Any] = {
+                "ok": result.is_success,
+                "logs": result.logs,
+                "timings": result.timings,
+                "cache_hits": result.cache_hits,
+                "sizes": result.size_metrics,
+            }
+            if payload.get("return", "path") == "bytes":
+                response["data"] = base64.b64encode(result.pdf_path.read_bytes()).decode("ascii")
+                return response
+            dest = self.output_dir / f"{uuid.uuid4().hex}.{output_format}"
+            shutil.move(str(result.pdf_path), dest)
+            response["path"] = str(dest)
+            if result.page_paths:
+                pages = []
+                for i, page_path in enumerate(result.page_paths, start=1):
+                    page_dest = dest.with_name(f"{dest.stem}-page-{i:03d}.pdf")
+                    shutil.move(str(page_path), page_dest)
+                    pages.append(str(page_dest))
+                response["pages"] = pages
+        self._prune_outputs()
+        return response
+
+    def _prune_outputs(self) -> None:
+        """
+        output_dir の直下にある /compile の出力が max_outputs 個を超えたら，更新の古いものから消す。
+        名前の形式が違うファイルや /batch の出力先などのサブディレクトリには触れない。
+        """
+        entries = []
+        for path in self.output_dir.iterdir():
+            if not _OUTPUT_NAME.fullmatch(path.name):
+                continue
+            try:
+                if path.is_file():
+                    entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # 並行するリクエストが先に消した
+        excess = len(entries) - self.max_outputs
+        if excess <= 0:
+            return
+        for _, path in sorted(entries)[:excess]:
+            path.unlink(missing_ok=True)
+
+    def put_asset(self, payload: dict) -> dict:
+        """
+        Request: {"data": base64}
+        Response: {"sha256": str}（compile の "assets" でこのダイジェストを参照する）
+        """
+        if "data" not in payload:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'data' is required.")
+        return {"ok": True, "sha256": self.asset_store.put(base64.b64decode(payload["data"]))}
+
+    def missing_assets(self, payload: dict) -> dict:
+        """
+        Request: {"sha256": [str, ...]}
+        Response: {"missing": [...]}（ストアにないものだけをアップロードすればよい）
+        """
+        return {"ok": True, "missing": self.asset_store.missing(list(payload.get("sha256", [])))}
+
+    def _check_assets(self, assets: dict[str, str]) -> None:
+        if not assets:
+            return
+        if self.asset_store is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "This server does not accept assets.")
+        missing = self.asset_store.missing(list(assets.values()))
+        if missing:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Assets not uploaded: {missing}")
+
+    def _local_path(self, value: str) -> Path:
+        """
+        クライアントが指定したパス（相対パスは output_dir から）を，許可したディレクトリの下に限って返す。
+        """
+        path = (self.output_dir / value).resolve()
+        if not any(path.is_relative_to(root) for root in self._allowed_roots):
+            raise ApiError(HTTPStatus.FORBIDDEN, f"Path is outside the server directories: {value}")
+        return path
+
+    def extract(self, payload: dict) -> dict:
+        """
+        Request: {"path": str} または {"data": base64}
+        """
+        if "data" in payload:
+            request = ExtractRequest(pdf_bytes=base64.b64decode(payload["data"]))
+        elif "path" in payload:
+            request = ExtractRequest(pdf_path=self._local_path(payload["path"]))
+        else:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'path' or 'data' is required.")
+        result = self.extract_uc.execute(request)
+        return {"preamble": result.preamble, "body": result.body}
+
+    def submit_jobs(self, payload: dict) -> dict:
+        """
+        Request: compile と同じ 1 件分の形式，または {"items": [...]}
+        Response: {"job_ids": [...]}（結果は GET /jobs/<id> で取得する）
+        """
+        entries = payload["items"] if "items" in payload else [payload]
+        requests = [self._pipeline_request(e) for e in entries]
+        for request in requests:
+            self._check_assets(request.assets)
+        job_ids = self.submit_uc.execute_many(requests)
+        return {"ok": True, "job_ids": job_ids}
+
+    def job_status(self, job_id: str) -> dict:
+        try:
+            status = self.status_uc.execute(job_id)
+        except KeyError as e:
+            raise ApiError(HTTPStatus.NOT_FOUND, str(e)) from e
+        return {
+            "ok": status.status != "failed",
+            "id": status.job_id,
+            "status": status.status,
+            "attempts": status.attempts,
+            "path": str(status.pdf_path) if status.pdf_path else None,
+            "logs": status.logs,
+            "timings": status.timings,
+            "error": status.error,
+        }
+
+    def batch(self, payload: dict) -> dict:
+        """
+        Request: {"items": [{"id", "body" | "tex_content", "preamble"?, "latexmkrc"?}],
+                  "output_dir", "jobs"?, "format"?, "resume"?}
+        """
+        if "output_dir" not in payload:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'output_dir' is required.")
+        items = []
+        for entry in payload.get("items", []):
+            tex_content, rc_content = self._tex_content(entry)
+            items.append(
+                BatchItem(
+                    item_id=str(entry.get("id", "")),
+                    tex_content=tex_content,
+                    latexmkrc_content=rc_content,
+                    margins=tuple(entry.get("margins", (0, 0, 0, 0))),
+                )
+            )
+        result = self.batch_uc.execute(
+            BatchRequest(
+                items=items,
+                output_dir=self._local_path(payload["output_dir"]),
+                jobs=min(int(payload.get("jobs", self.max_workers)), self.max_workers),
+                output_format=payload.get("format", "pdf"),
+                resume=bool(payload.get("resume", True)),
+            )
+        )
+        return {
+            "ok": result.is_success,
+            "manifest": str(result.manifest_path),
+            "items": [
+                {
+                    "id": item.item_id,
+                    "status": item.status,
+                    "output": str(item.output_path) if item.output_path else None,
+                    "elapsed": item.elapsed,
+                    "error": item.error,
+                }
+                for item in result.items
+            ],
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "latexcrop"
+    api: CompileApi
+
+    def address_string(self) -> str:
+        # Unix ソケットでは client_address が空になる
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        try:
+            payload = self._read_json() if method == "POST" else {}
+            response = self.api.handle(method, self.path.split("?", 1)[0], payload)
+            self._send(HTTPStatus.OK, response)
+        except ApiError as e:
+            self._send(e.status, {"ok": False, "error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"ok": False, "error": str(e)})
+        except Exception as e:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"ok": False, "error": str(e)})
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+        data = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "JSON object expected.")
+        return data
+
+    def _send(self, status: HTTPStatus, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # 前回の残骸のソケットファイルを取り除いてから bind する
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def create_server(
+    api: CompileApi,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Path | None = None,
+) -> socketserver.BaseServer:
+    """
+    CompileApi を HTTP で公開するサーバを生成する（serve_forever() で起動する）。
+    unix_socket を指定した場合は TCP ではなく Unix ドメインソケットで待ち受ける。
+    """
+    handler = type("CompileApiHandler", (_Handler,), {"api": api})
+    if unix_socket is not None:
+        return ThreadingUnixHTTPServer(str(unix_socket), handler)
+    return ThreadingHTTPServer((host, port), handler)
@@ -1,4 +1,8 @@
+import asyncio
+from collections import Counter
+from dataclasses import replace
 from pathlib import Path
+import tempfile
 import reflex as rx
 
 from application.dto.extract_result import ExtractResult
@@ -7,19 +11,23 @@ from domain.models.latexmkrc_source import LatexmkrcSource
 from application.dto.process_result import ProcessResult
 from application.dto.pipeline_request import PipelineRequest
 from application.dto.extract_request import ExtractRequest
+from application.dto.preview_request import PreviewRequest
 
-from application.usecases.generate_pdf_usecase import GeneratePdfUseCase
-from application.usecases.trim_pdf_usecase import TrimPdfUseCase
-from application.usecases.embed_tex_usecase import EmbedTexUseCase
-from application.usecases.make_transparent_usecase import MakeTransparentUseCase
-from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.pipeline_factory import build_pipeline_usecase
+from application.tex_source import build_tex_content
 from application.usecases.extract_tex_usecase import ExtractTexUseCase
+from application.usecases.render_preview_usecase import RenderPreviewUseCase
 
-from domain.services.latex_compile_service import LatexCompileService
-from domain.services.pdf_crop_service import PdfCropService
-from domain.services.pdf_embed_service import PdfEmbedService
-from domain.services.pdf_transparency_service import PdfTransparencyService
 from domain.services.pdf_extract_service import PdfExtractService
+from domain.services.svg_extract_service import SvgExtractService
+from domain.services.pdf_raster_service import PdfRasterService
+from domain.services.file_cache_service import FileCache, content_hash
+
+from presentation.result_api import (
+    PREVIEW_URL_PREFIX,
+    RESULT_URL_PREFIX,
+    create_result_api,
+)
 
 # Default settings
 DEFAULT_TEX_BODY = r"""Hello, world!
@@ -38,6 +46,36 @@ MONOSPACE_FONT_FAMILY = (
 )
 OUTPUT_FOLDER = Path("assets")
 OUTPUT_PDF_NAME = "output.pdf"
+RESULT_DIR = Path(__file__).parent / OUTPUT_FOLDER
+# 結果 PDF はバックエンドから Range 対応で配信する
+OUTPUT_PDF_URL = f"{rx.config.get_config().api_url}{RESULT_URL_PREFIX}/{OUTPUT_PDF_NAME}"
+
+# ラスタプレビュー（1x / 2x）の設定とキャッシュ
+PREVIEW_DPIS = (144, 288)
+PREVIEW_IMAGE_FORMAT = "png"
+PREVIEW_CACHE = FileCache(
+    Path(tempfile.gettempdir()) / "latexcrop" / "previews", max_entries=64
+)
+
+# パイプラインはプロセスで 1 つだけ作り，Ghostscript のインスタンスやキャッシュを使い回す
+PIPELINE_UC = build_pipeline_usecase()
+
+# ログパネルに同期する行数と，バックエンドに保持する行数の上限
+LOG_TAIL_LINES = 50
+LOG_HISTORY_LINES = 1000
+# コンパイル中に届いた診断をログパネルへ反映する間隔（秒）
+LOG_STREAM_INTERVAL = 0.25
+# エディタの内容をサーバに同期するまでの待ち時間 (ms)。フォーカスが外れた時点でも同期する
+EDITOR_SYNC_DEBOUNCE_MS = 1000
+
+# ライブプレビュー: 入力が止まってからコンパイルするまでの待ち時間 (ms) と
+# セッションごとに使い回す作業ディレクトリ。切断を検知できないため，
+# 最近使われていないセッションのものから LRU で削除する
+DEFAULT_LIVE_DEBOUNCE_MS = 800
+MIN_LIVE_DEBOUNCE_MS = 200
+LIVE_WORKDIRS = FileCache(
+    Path(tempfile.gettempdir()) / "latexcrop" / "live", max_entries=32
+)
 
 CONFIG_DIR = Path(__file__).parents[2] / "config"
 CONFIG_DIR.mkdir(exist_ok=True)
@@ -56,6 +94,44 @@ INITIAL_LATEXMKRC_CONTENT = (
 )
 
 
+def _start_pipeline(request: PipelineRequest) -> tuple[asyncio.Future, asyncio.Queue]:
+    """
+    パイプラインを別スレッドで開始する。コンパイル中の診断は返り値のキューに届く。
+    """
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue[str] = asyncio.Queue()
+    request = replace(
+        request, log_sink=lambda line: loop.call_soon_threadsafe(lines.put_nowait, line)
+    )
+    task = asyncio.ensure_future(asyncio.to_thread(PIPELINE_UC.execute, request))
+    return task, lines
+
+
+async def _next_log_batch(task: asyncio.Future, lines: asyncio.Queue) -> list[str]:
+    """
+    診断が溜まるかパイプラインが終わるまで（最大 LOG_STREAM_INTERVAL 秒）待ち，届いた行を返す。
+    """
+    if not task.done():
+        await asyncio.wait({task}, timeout=LOG_STREAM_INTERVAL)
+    batch = []
+    while not lines.empty():
+        batch.append(lines.get_nowait())
+    return batch
+
+
+def _unstreamed(logs: list[str], streamed: Counter) -> list[str]:
+    """
+    logs のうち，まだログパネルに流していない行（同じ行は流した回数だけ除く）。
+    """
+    rest = []
+    for log in logs:
+        if streamed[log] > 0:
+            streamed[log] -= 1
+        else:
+            rest.append(log)
+    return rest
+
+
 class AppState(rx.State):
     tex_body: str = DEFAULT_TEX_BODY
     tex_preamble: str = INITIAL_TEX_PREAMBLE
@@ -63,9 +139,47 @@ class AppState(rx.State):
     is_loading: bool = False
     output_pdf_path: str = ""
     is_result_available: bool = False
+    # クライアントに同期するのは末尾 LOG_TAIL_LINES 行のみ（全履歴はバックエンドに保持）。
+    # show_full_log を有効にした場合だけ，保持している全履歴を同期する
     logs: list[str] = []
+    _log_history: list[str] = []
+    show_full_log: bool = False
+    hidden_log_lines: int = 0
     do_extract_body: bool = True
     do_extract_preamble: bool = False
+    preview_images: list[dict[str, str]] = []
+    show_pdf: bool = False
+    live_preview: bool = False
+    live_debounce_ms: int = DEFAULT_LIVE_DEBOUNCE_MS
+    is_live_compiling: bool = False
+    # ライブプレビューの世代管理（バックエンド専用）
+    _live_generation: int = 0
+    _live_running: bool = False
+
+    def _log(self, *lines: str):
+        """
+        ログを追記する。logs への代入はイベントごとに 1 回の差分送信にまとまり，
+        送信量は末尾 LOG_TAIL_LINES 行に抑えられる（show_full_log の場合は保持している全履歴）。
+        """
+        self._log_history = [*self._log_history, *lines][-LOG_HISTORY_LINES:]
+        self._sync_logs()
+
+    def _clear_logs(self):
+        self._log_history = []
+        self._sync_logs()
+
+    def _sync_logs(self):
+        self.logs = self._log_history if self.show_full_log else self._log_history[-LOG_TAIL_LINES:]
+        self.hidden_log_lines = len(self._log_history) - len(self.logs)
+
+    @rx.event
+    def set_show_full_log(self, value: bool):
+        self.show_full_log = value
+        self._sync_logs()
+
+    @rx.event
+    def toggle_show_pdf(self):
+        self.show_pdf = not self.show_pdf
 
     @rx.event
     def set_loading_true(self):
@@ -82,10 +196,10 @@ class AppState(rx.State):
         """
         self.set_loading_false()
         if self.is_result_available:
-            self.output_pdf_path = str(OUTPUT_PDF_NAME)
-            self.logs.append("[Page loaded] Result PDF is available.")
+            self.output_pdf_path = OUTPUT_PDF_URL
+            self._log("[Page loaded] Result PDF is available.")
         else:
-            self.logs.append("[Page loaded] No result PDF available.")
+            self._log("[Page loaded] No result PDF available.")
 
     @rx.event
     async def load_config(self):
@@ -93,21 +207,21 @@ class AppState(rx.State):
         assets/preamble と latexmkrc をロード
         """
         self.set_loading_true()
-        self.logs = []
+        self._clear_logs()
         preamble_path = CONFIG_DIR / "preamble"
         rc_path = CONFIG_DIR / "latexmkrc"
 
         if preamble_path.exists():
             self.tex_preamble = preamble_path.read_text(encoding="utf-8")
-            self.logs.append(f"Loaded preamble from {preamble_path}.")
+            self._log(f"Loaded preamble from {preamble_path}.")
         else:
-            self.logs.append(f"[Warning] {preamble_path} does not exist.")
+            self._log(f"[Warning] {preamble_path} does not exist.")
 
         if rc_path.exists():
             self.rc_content = rc_path.read_text(encoding="utf-8")
-            self.logs.append(f"Loaded latexmkrc from {rc_path}.")
+            self._log(f"Loaded latexmkrc from {rc_path}.")
         else:
-            self.logs.append(f"[Warning] {rc_path} does not exist.")
+            self._log(f"[Warning] {rc_path} does not exist.")
 
         self.set_loading_false()
 
@@ -117,79 +231,196 @@ class AppState(rx.State):
         assets/preamble に現在の tex_preamble を書き込む
         """
         self.set_loading_true()
-        self.logs = []
+        self._clear_logs()
         preamble_path = CONFIG_DIR / "preamble"
         rc_path = CONFIG_DIR / "latexmkrc"
 
         try:
             LatexmkrcSource(content=self.rc_content)
-            self.logs.append("Validated LatexmkrcSource.")
+            self._log("Validated LatexmkrcSource.")
         except ValueError as e:
-            self.logs.append(f"[Error] {e}")
+            self._log(f"[Error] {e}")
             self.set_loading_false()
             return
 
         preamble_path.write_text(self.tex_preamble, encoding="utf-8")
-        self.logs.append(f"Saved preamble to {preamble_path}.")
+        self._log(f"Saved preamble to {preamble_path}.")
 
         rc_path.write_text(self.rc_content, encoding="utf-8")
-        self.logs.append(f"Saved latexmkrc to {rc_path}.")
+        self._log(f"Saved latexmkrc to {rc_path}.")
 
         self.set_loading_false()
 
     @rx.event
     async def reset_config(self):
         self.set_loading_true()
-        self.logs = []
+        self._clear_logs()
         self.tex_preamble = DEFAULT_TEX_PREAMBLE
         self.rc_content = DEFAULT_LATEXMKRC_CONTENT
-        self.logs.append("Reset preamble and latexmkrc to default values.")
+        self._log("Reset preamble and latexmkrc to default values.")
         self.set_loading_false()
 
+    def _pipeline_request(self, workdir: Path | None = None) -> PipelineRequest:
+        return PipelineRequest(
+            tex_content=build_tex_content(self.tex_preamble, self.tex_body),
+            latexmkrc_content=self.rc_content,
+            margins=DEFAULT_PDF_MARGINS,
+            linearize=True,
+            workdir=workdir,
+        )
+
+    def _publish_result(self, result: ProcessResult):
+        dest = RESULT_DIR / OUTPUT_PDF_NAME
+        Path(result.pdf_path).rename(dest)
+        self.output_pdf_path = OUTPUT_PDF_URL
+        self._render_preview(dest)
+        self.is_result_available = True
+
     @rx.event
     async def execute(self):
         self.set_loading_true()
         self.output_pdf_path = ""
-        self.logs = []
+        self._clear_logs()
         self.is_result_available = False
+        self.preview_images = []
         yield
 
-        tex_content = (
-            self.tex_preamble
-            + "\n\\begin{document}\n"
-            + self.tex_body
-            + "\n\\end{document}\n"
-        )
-        rc_content = self.rc_content
+        # コンパイル中の診断を届いた順にログパネルへ流す
+        task, lines = _start_pipeline(self._pipeline_request())
+        # 同じ行が何度も出ることがあるため，流した回数で数える
+        streamed: Counter[str] = Counter()
+        while True:
+            done = task.done()
+            batch = await _next_log_batch(task, lines)
+            if batch:
+                streamed.update(batch)
+                self._log(*batch)
+                yield
+            if done:
+                break
+
+        try:
+            result: ProcessResult = task.result()
+        except Exception as e:
+            self._log(f"[Error] {e}")
+            self.set_loading_false()
+            return
 
-        pipeline_uc = ProcessPdfPipelineUseCase(
-            generate_uc=GeneratePdfUseCase(LatexCompileService()),
-            trim_uc=TrimPdfUseCase(PdfCropService()),
-            embed_uc=EmbedTexUseCase(PdfEmbedService()),
-            transparency_uc=MakeTransparentUseCase(PdfTransparencyService()),
+        self._log(*_unstreamed(result.logs, streamed))
+        self._publish_result(result)
+        self._log(f"Saved to {OUTPUT_FOLDER}/{OUTPUT_PDF_NAME}")
+        self._log(
+            "Please wait. If the page does not update automatically, please reload."
         )
 
+    @rx.event
+    def set_live_preview(self, value: bool):
+        self.live_preview = value
+        if value:
+            return AppState.live_compile
+
+    @rx.event
+    def set_live_debounce(self, value: str):
         try:
-            result: ProcessResult = pipeline_uc.execute(
-                PipelineRequest(
-                    tex_content=tex_content,
-                    latexmkrc_content=rc_content,
-                    margins=DEFAULT_PDF_MARGINS,
+            self.live_debounce_ms = max(MIN_LIVE_DEBOUNCE_MS, int(value))
+        except ValueError:
+            pass
+
+    @rx.event
+    def set_tex_body_live(self, value: str):
+        """
+        本文の変更を受け取り，ライブプレビュー中であれば再コンパイルを予約する。
+        入力側でデバウンス済みのため，ここに来るのは入力が止まった後のみ。
+        """
+        self.tex_body = value
+        if self.live_preview:
+            return AppState.live_compile
+
+    @rx.event(background=True)
+    async def live_compile(self):
+        """
+        ライブプレビュー用のコンパイル。セッションごとに同時に走るのは 1 つだけで，
+        実行中に届いた変更はまとめて 1 回の再コンパイルにする。
+        コンパイル中に入力が更新された場合，その結果は古いものとして破棄する。
+        """
+        async with self:
+            self._live_generation += 1
+            if self._live_running:
+                return
+            self._live_running = True
+            self.is_live_compiling = True
+            session_key = content_hash(self.router.session.client_token)
+
+        while True:
+            # 取得のたびに最終利用時刻を更新し，使用中のセッションのものを削除の対象から外す
+            workdir, _ = LIVE_WORKDIRS.get_or_create(session_key, lambda directory: None)
+            async with self:
+                generation = self._live_generation
+                request = self._pipeline_request(workdir=workdir)
+
+            task, lines = _start_pipeline(request)
+            while True:
+                done = task.done()
+                batch = await _next_log_batch(task, lines)
+                if batch:
+                    async with self:
+                        if generation == self._live_generation:
+                            self._log(*(f"[Live] {line}" for line in batch))
+                if done:
+                    break
+
+            try:
+                result = task.result()
+                error = None
+            except Exception as e:
+                result, error = None, e
+
+            async with self:
+                if generation == self._live_generation:
+                    # 最新の入力に対する結果のみ反映する
+                    if error is not None:
+                        self._clear_logs()
+                        self._log(f"[Live] [Error] {error}")
+                    else:
+                        self._clear_logs()
+                        self._log(*(f"[Live] {log}" for log in result.logs))
+                        self._publish_result(result)
+                if generation == self._live_generation or not self.live_preview:
+                    self._live_running = False
+                    self.is_live_compiling = False
+                    return
+
+    def _render_preview(self, pdf_path: Path):
+        """
+        結果 PDF をラスタ画像化し、プレビュー用の URL を設定する。
+        失敗した場合は PDF 表示にフォールバックする。
+        """
+        preview_uc = RenderPreviewUseCase(PdfRasterService(cache=PREVIEW_CACHE))
+        try:
+            preview = preview_uc.execute(
+                PreviewRequest(
+                    pdf_path=pdf_path,
+                    dpis=PREVIEW_DPIS,
+                    image_format=PREVIEW_IMAGE_FORMAT,
                 )
             )
         except Exception as e:
-            self.logs.append(f"[Error] {e}")
-            self.set_loading_false()
+            self._log(f"[Warning] Preview rendering failed: {e}")
+            self.preview_images = []
+            self.show_pdf = True
             return
 
-        self.logs.extend(result.logs)
-        dest = Path(__file__).parent / OUTPUT_FOLDER / OUTPUT_PDF_NAME
-        Path(result.pdf_path).rename(dest)
-        self.is_result_available = True
-        self.logs.append(f"Saved to {OUTPUT_FOLDER}/{OUTPUT_PDF_NAME}")
-        self.logs.append(
-            "Please wait. If the page does not update automatically, please reload."
-        )
+        self._log(*preview.logs)
+        api_url = rx.config.get_config().api_url
+
+        def url(page: Path) -> str:
+            return f"{api_url}{PREVIEW_URL_PREFIX}/{page.parent.name}/{page.name}"
+
+        low, high = (preview.images[dpi] for dpi in PREVIEW_DPIS)
+        self.preview_images = [
+            {"src": url(lo), "srcset": f"{url(lo)} 1x, {url(hi)} 2x"}
+            for lo, hi in zip(low, high)
+        ]
 
     @rx.event
     async def load_pdf(self, files: list[rx.UploadFile]):
@@ -200,24 +431,26 @@ class AppState(rx.State):
         file = files[0]
         upload_data = await file.read()
         extract_svc = PdfExtractService()
-        extract_uc = ExtractTexUseCase(extract_service=extract_svc)
+        extract_uc = ExtractTexUseCase(
+            extract_service=extract_svc, svg_extract_service=SvgExtractService()
+        )
         try:
             result: ExtractResult = extract_uc.execute(
                 ExtractRequest(pdf_bytes=upload_data)
             )
         except Exception as e:
-            self.logs.append(f"[Error] {e}")
+            self._log(f"[Error] {e}")
             self.set_loading_false()
             return
 
-        self.logs.append("Extracted preamble from PDF.")
+        self._log("Extracted preamble from PDF.")
         if self.do_extract_body:
             self.tex_preamble = result.preamble
-            self.logs.append("Extracted TeX body from PDF.")
+            self._log("Extracted TeX body from PDF.")
 
         if self.do_extract_preamble:
             self.tex_body = result.body
-            self.logs.append("Extracted TeX preamble from PDF.")
+            self._log("Extracted TeX preamble from PDF.")
 
         self.set_loading_false()
 
@@ -345,10 +578,28 @@ def index() -> rx.Component:
             rx.box(
                 rx.cond(
                     AppState.is_result_available,
-                    rx.el.iframe(
-                        src=AppState.output_pdf_path,
-                        width="100%",
-                        height="300pt",
+                    rx.cond(
+                        AppState.show_pdf | (AppState.preview_images.length() == 0),
+                        rx.el.iframe(
+                            src=AppState.output_pdf_path,
+                            width="100%",
+                            height="300pt",
+                        ),
+                        rx.flex(
+                            rx.foreach(
+                                AppState.preview_images,
+                                lambda image: rx.el.img(
+                                    src=image["src"],
+                                    src_set=image["srcset"],
+                                    max_width="100%",
+                                ),
+                            ),
+                            direction="column",
+                            align="center",
+                            spacing="2",
+                            height="300pt",
+                            overflow="auto",
+                        ),
                     ),
                     rx.flex(
                         rx.text("No result PDF available."),
@@ -367,6 +618,12 @@ def index() -> rx.Component:
                         disabled=rx.cond(AppState.output_pdf_path, False, True),
                         color_scheme="blue",
                     ),
+                    rx.button(
+                        rx.cond(AppState.show_pdf, "Show image", "Show PDF"),
+                        on_click=AppState.toggle_show_pdf,
+                        disabled=~AppState.is_result_available,
+                        variant="soft",
+                    ),
                     spacing="3",
                     margin_top="4px",
                     justify="start",
@@ -377,13 +634,21 @@ def index() -> rx.Component:
         rx.card(
             rx.hstack(
                 rx.box(
-                    rx.text_area(
-                        placeholder="Type your LaTeX code here...",
-                        value=AppState.tex_body,
-                        on_change=AppState.set_tex_body,
-                        resize="vertical",
-                        min_height="200px",
-                        font_family=MONOSPACE_FONT_FAMILY,
+                    rx.debounce_input(
+                        rx.text_area(
+                            placeholder="Type your LaTeX code here...",
+                            value=AppState.tex_body,
+                            on_change=AppState.set_tex_body_live,
+                            resize="vertical",
+                            min_height="200px",
+                            font_family=MONOSPACE_FONT_FAMILY,
+                        ),
+                        debounce_timeout=rx.cond(
+                            AppState.live_preview,
+                            AppState.live_debounce_ms,
+                            EDITOR_SYNC_DEBOUNCE_MS,
+                        ),
+                        force_notify_on_blur=True,
                     ),
                     rx.flex(
                         rx.button(
@@ -392,6 +657,26 @@ def index() -> rx.Component:
                             color_scheme="blue",
                             loading=AppState.is_loading,
                         ),
+                        rx.checkbox(
+                            "Live preview",
+                            is_checked=AppState.live_preview,
+                            on_change=AppState.set_live_preview,
+                        ),
+                        rx.input(
+                            type="number",
+                            value=AppState.live_debounce_ms.to_string(),
+                            on_change=AppState.set_live_debounce,
+                            min=MIN_LIVE_DEBOUNCE_MS,
+                            step=100,
+                            width="6em",
+                            disabled=~AppState.live_preview,
+                        ),
+                        rx.text("ms", color="gray"),
+                        rx.cond(
+                            AppState.is_live_compiling,
+                            rx.spinner(size="2"),
+                        ),
+                        align="center",
                         spacing="3",
                         margin_top="4px",
                         justify="start",
@@ -437,23 +722,31 @@ def index() -> rx.Component:
                 margin_bottom="6px",
             ),
             rx.hstack(
-                rx.text_area(
-                    placeholder="Type your LaTeX preamble here...",
-                    value=AppState.tex_preamble,
-                    on_change=AppState.set_tex_preamble,
-                    resize="vertical",
-                    font_family=MONOSPACE_FONT_FAMILY,
-                    width="100%",
-                    min_height="100px",
+                rx.debounce_input(
+                    rx.text_area(
+                        placeholder="Type your LaTeX preamble here...",
+                        value=AppState.tex_preamble,
+                        on_change=AppState.set_tex_preamble,
+                        resize="vertical",
+                        font_family=MONOSPACE_FONT_FAMILY,
+                        width="100%",
+                        min_height="100px",
+                    ),
+                    debounce_timeout=EDITOR_SYNC_DEBOUNCE_MS,
+                    force_notify_on_blur=True,
                 ),
-                rx.text_area(
-                    placeholder="Type your latexmkrc code here...",
-                    value=AppState.rc_content,
-                    on_change=AppState.set_rc_content,
-                    resize="vertical",
-                    font_family=MONOSPACE_FONT_FAMILY,
-                    width="100%",
-                    min_height="100px",
+                rx.debounce_input(
+                    rx.text_area(
+                        placeholder="Type your latexmkrc code here...",
+                        value=AppState.rc_content,
+                        on_change=AppState.set_rc_content,
+                        resize="vertical",
+                        font_family=MONOSPACE_FONT_FAMILY,
+                        width="100%",
+                        min_height="100px",
+                    ),
+                    debounce_timeout=EDITOR_SYNC_DEBOUNCE_MS,
+                    force_notify_on_blur=True,
                 ),
             ),
             rx.flex(
@@ -467,6 +760,18 @@ def index() -> rx.Component:
         ),
         # ログ表示
         rx.card(
+            rx.cond(
+                AppState.show_full_log | (AppState.hidden_log_lines > 0),
+                rx.checkbox(
+                    rx.cond(
+                        AppState.show_full_log,
+                        "Show full log",
+                        f"Show full log ({AppState.hidden_log_lines} earlier lines)",
+                    ),
+                    is_checked=AppState.show_full_log,
+                    on_change=AppState.set_show_full_log,
+                ),
+            ),
             rx.list.ordered(
                 rx.foreach(AppState.logs, lambda log: rx.list_item(log)),
                 font_family="monospace",
@@ -477,5 +782,5 @@ def index() -> rx.Component:
     )
 
 
-app = rx.App()
+app = rx.App(api_transformer=create_result_api(RESULT_DIR, PREVIEW_CACHE.root))
 app.add_page(index)
@@ -0,0 +1,150 @@
+import re
+from pathlib import Path
+from typing import Iterator
+
+from fastapi import FastAPI, Request
+from starlette.responses import Response, StreamingResponse
+
+# 結果 PDF とプレビュー画像を配信するエンドポイントのプレフィックス
+RESULT_URL_PREFIX = "/results"
+PREVIEW_URL_PREFIX = "/previews"
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    HTTP Range ヘッダ (単一範囲のみ) を解析する。
+
+    Args:
+        header: Range ヘッダの値（例: 'bytes=0-1023', 'bytes=-500'）
+        size: 対象ファイルのサイズ（バイト）
+
+    Returns:
+        (start, end) の閉区間。ヘッダが無い・解釈できない場合は None
+
+    Raises:
+        ValueError: 範囲がファイルサイズに対して満たせない場合
+    """
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        # 複数範囲などは未対応のため全体を返す
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # 'bytes=-N' は末尾 N バイト
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range.")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range.")
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(
+    path: Path,
+    range_header: str | None,
+    cache_control: str = "no-cache",
+) -> Response:
+    """
+    Range リクエストに対応したファイルレスポンスを返す。
+    線形化された PDF であれば、ブラウザのビューアは先頭部分だけで 1 ページ目を描画できる。
+    """
+    size = path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+    }
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _iter_file(path, start, end),
+        status_code=status,
+        media_type=MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream"),
+        headers=headers,
+    )
+
+
+def _serve(path: Path, request: Request, cache_control: str = "no-cache") -> Response:
+    if not path.is_file():
+        return Response(status_code=404)
+    response = ranged_file_response(path, request.headers.get("range"), cache_control)
+    if request.method == "HEAD":
+        return Response(status_code=response.status_code, headers=dict(response.headers))
+    return response
+
+
+def _is_safe_name(name: str, suffixes: tuple[str, ...]) -> bool:
+    # パス区切りを含む名前や想定外の拡張子は配信しない
+    return Path(name).name == name and name.lower().endswith(suffixes)
+
+
+def create_result_api(result_dir: Path, preview_dir: Path | None = None) -> FastAPI:
+    """
+    result_dir 以下の PDF と preview_dir 以下のプレビュー画像を Range 対応で配信する
+    FastAPI アプリを生成する。rx.App(api_transformer=...) に渡して
+    Reflex のバックエンドにマウントする。
+    """
+    api = FastAPI()
+
+    @api.api_route(f"{RESULT_URL_PREFIX}/{{name}}", methods=["GET", "HEAD"])
+    async def get_result(name: str, request: Request) -> Response:
+        if not _is_safe_name(name, (".pdf",)):
+            return Response(status_code=404)
+        return _serve(result_dir / name, request)
+
+    if preview_dir is not None:
+
+        @api.api_route(f"{PREVIEW_URL_PREFIX}/{{key}}/{{name}}", methods=["GET", "HEAD"])
+        async def get_preview(key: str, name: str, request: Request) -> Response:
+            # キーは FileCache の 16 進ダイジェストのみ受け付ける
+            if not key.isalnum() or not _is_safe_name(name, (".png", ".webp")):
+                return Response(status_code=404)
+            # キャッシュエントリは内容ハッシュで決まるため長期キャッシュ可能
+            return _serve(
+                preview_dir / key / name,
+                request,
+                cache_control="public, max-age=31536000, immutable",
+            )
+
+    return api
@@ -0,0 +1,70 @@
+import itertools
+from unittest.mock import MagicMock
+
+import pytest
+
+from application.dto.process_result import ProcessResult
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from domain.services import latex_compile_service
+
+
+@pytest.fixture
+def fake_pipeline(tmp_path):
+    """
+    ProcessPdfPipelineUseCase の代わりを作る関数。
+    execute のたびに req.workdir（省略時は tmp_path）に新しい出力ファイル（内容は data）を書き出して返す。
+    tex_content に fail_on を含むリクエストは RuntimeError("latexmk failed") で失敗させる。
+    """
+
+    def make(
+        name: str = "work",
+        data: bytes = b"%PDF-1.4",
+        logs: tuple[str, ...] = ("ok",),
+        timings: dict[str, float] | None = None,
+        fail_on: str | None = None,
+    ) -> MagicMock:
+        pipeline = MagicMock(spec=ProcessPdfPipelineUseCase)
+        counter = itertools.count()
+
+        def execute(req):
+            if fail_on is not None and fail_on in req.tex_content:
+                raise RuntimeError("latexmk failed")
+            directory = req.workdir or tmp_path
+            directory.mkdir(parents=True, exist_ok=True)
+            out = directory / f"{name}-{next(counter)}.pdf"
+            out.write_bytes(data)
+            return ProcessResult(pdf_path=out, logs=list(logs), timings=dict(timings or {}))
+
+        pipeline.execute.side_effect = execute
+        return pipeline
+
+    return make
+
+
+class FakeRunCaptured:
+    """
+    latex_compile_service.run_captured の代わり。コマンドを記録し，作業ディレクトリに main.pdf を書き出す。
+    on_run(cmd, cwd, on_line) を設定すると，書き出す前に呼ぶ（エンジンの出力を流す・例外で失敗させるなど）。
+    """
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+        self.on_run = None
+
+    @property
+    def commands(self) -> list[str]:
+        return [cmd[0] for cmd in self.calls]
+
+    def __call__(self, cmd, cwd=None, on_line=None, tail_lines=200):
+        self.calls.append(cmd)
+        if self.on_run is not None:
+            self.on_run(cmd, cwd, on_line)
+        (cwd / "main.pdf").write_bytes(b"%PDF-1.4")
+        return []
+
+
+@pytest.fixture
+def fake_run_captured(monkeypatch) -> FakeRunCaptured:
+    fake = FakeRunCaptured()
+    monkeypatch.setattr(latex_compile_service, "run_captured", fake)
+    return fake
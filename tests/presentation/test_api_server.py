@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import urllib.request
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from application.usecases.extract_tex_usecase import ExtractTexUseCase
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from presentation.api_server import CompileApi, create_server
+
+
+def post(url, payload):
+    req = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req) as res:
+        return json.loads(res.read())
+
+
+def test_compile_endpoint_reuses_pipeline(tmp_path, fake_pipeline):
+    # Arrange
+    pipeline = fake_pipeline(timings={"compile": 0.1})
+    api = CompileApi(
+        pipeline_uc=pipeline,
+        extract_uc=MagicMock(spec=ExtractTexUseCase),
+        output_dir=tmp_path / "out",
+        default_preamble="\\documentclass{article}",
+        default_latexmkrc="$latex='xelatex %O %S';",
+    )
+    server = create_server(api, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        # Act
+        first = post(f"{base}/compile", {"body": "Hello"})
+        second = post(f"{base}/compile", {"body": "Hello", "return": "bytes"})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Assert
+    assert first["ok"] and first["timings"] == {"compile": 0.1}
+    assert first["path"].endswith(".pdf") and any((tmp_path / "out").glob("*.pdf"))
+    assert second["data"] == "JVBERi0xLjQ="
+    assert pipeline.execute.call_count == 2
+    req = pipeline.execute.call_args.args[0]
+    assert req.tex_content.startswith("\\documentclass{article}\n\\begin{document}\nHello")
+
+
+def test_jobs_endpoint_submits_and_reports_status(tmp_path):
+    # Arrange
+    from domain.services.job_queue_service import JobQueueService
+
+    api = CompileApi(
+        pipeline_uc=MagicMock(spec=ProcessPdfPipelineUseCase),
+        extract_uc=MagicMock(spec=ExtractTexUseCase),
+        output_dir=tmp_path / "out",
+        default_preamble="\\documentclass{article}",
+        default_latexmkrc="$latex='xelatex %O %S';",
+        queue=JobQueueService(tmp_path / "jobs.db"),
+    )
+
+    # Act
+    submitted = api.handle("POST", "/jobs", {"items": [{"body": "a"}, {"body": "b"}]})
+    status = api.handle("GET", f"/jobs/{submitted['job_ids'][0]}", {})
+
+    # Assert
+    assert len(submitted["job_ids"]) == 2
+    assert status["status"] == "queued" and status["path"] is None
+
+
+def test_batch_shares_slots_and_paths_stay_inside_server_directories(tmp_path, fake_pipeline):
+    # Arrange
+    import pytest
+
+    from presentation.api_server import ApiError
+
+    pipeline = fake_pipeline()
+    api = CompileApi(
+        pipeline_uc=pipeline,
+        extract_uc=MagicMock(spec=ExtractTexUseCase),
+        output_dir=tmp_path / "out",
+        default_preamble="\\documentclass{article}",
+        default_latexmkrc="$latex='xelatex %O %S';",
+        max_workers=1,
+    )
+    items = [{"id": f"item{i}", "body": "x" * i} for i in range(3)]
+    results = []
+
+    # Act
+    with api._slots:  # /compile が実行中の状態
+        worker = threading.Thread(
+            target=lambda: results.append(
+                api.handle("POST", "/batch", {"items": items, "output_dir": "batch"})
+            )
+        )
+        worker.start()
+        worker.join(0.2)
+        calls_while_busy = pipeline.execute.call_count
+    worker.join(5)
+
+    # Assert
+    assert calls_while_busy == 0
+    assert results[0]["ok"] and pipeline.execute.call_count == 3
+    assert results[0]["manifest"].startswith(str((tmp_path / "out" / "batch").resolve()))
+    for route, payload in (
+        ("/batch", {"items": items, "output_dir": str(tmp_path / "elsewhere")}),
+        ("/batch", {"items": items, "output_dir": "../escape"}),
+        ("/extract", {"path": "/etc/passwd"}),
+    ):
+        with pytest.raises(ApiError, match="outside"):
+            api.handle("POST", route, payload)
+
+
+def test_compile_cleans_up_its_workdir_and_prunes_old_outputs(tmp_path, fake_pipeline, monkeypatch):
+    # Arrange
+    import tempfile
+
+    temp_root = tmp_path / "tmp"
+    temp_root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_root))
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "keep.txt").write_text("not a compile output")
+    api = CompileApi(
+        pipeline_uc=fake_pipeline(),
+        extract_uc=MagicMock(spec=ExtractTexUseCase),
+        output_dir=out,
+        default_preamble="\\documentclass{article}",
+        default_latexmkrc="$latex='xelatex %O %S';",
+        max_outputs=2,
+    )
+
+    # Act
+    data = api.handle("POST", "/compile", {"body": "a", "return": "bytes"})
+    paths = []
+    for i in range(3):
+        paths.append(api.handle("POST", "/compile", {"body": "a"})["path"])
+        os.utime(paths[-1], (i, i))  # 更新時刻の順を確定させる
+
+    # Assert
+    assert data["data"] == "JVBERi0xLjQ="
+    assert list(temp_root.iterdir()) == []
+    assert sorted(p.name for p in out.iterdir()) == sorted(
+        ["keep.txt", *(Path(p).name for p in paths[1:])]
+    )
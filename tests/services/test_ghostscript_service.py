@@ -0,0 +1,151 @@
+import ctypes
+
+import pytest
+
+from domain.services import ghostscript_service
+from domain.services.ghostscript_service import GS_ERROR_QUIT, GhostscriptService
+
+
+class FakeLibgs:
+    """
+    gsapi_* を Python で真似る CDLL の代わり。
+    run_string に渡された PostScript を記録し，outputs / codes の順に出力と戻り値を返す。
+    """
+
+    def __init__(self, outputs=(), codes=()):
+        self.programs: list[str] = []
+        self.outputs = list(outputs)
+        self.codes = list(codes)
+        self.instances = 0
+        self.deleted = 0
+        self._stdout = None
+
+    def gsapi_new_instance(self, handle, _caller):
+        self.instances += 1
+        handle._obj.value = self.instances
+        return 0
+
+    def gsapi_set_stdio(self, _handle, _stdin, stdout, _stderr):
+        self._stdout = stdout
+        return 0
+
+    def gsapi_set_arg_encoding(self, _handle, _encoding):
+        return 0
+
+    def gsapi_init_with_args(self, _handle, _argc, _argv):
+        return 0
+
+    def gsapi_run_string(self, _handle, program, _flags, _exit_code):
+        self.programs.append(program.decode("utf-8"))
+        output = self.outputs.pop(0) if self.outputs else b""
+        if output:
+            self._stdout(None, ctypes.create_string_buffer(output), len(output))
+        return self.codes.pop(0) if self.codes else 0
+
+    def gsapi_exit(self, _handle):
+        return 0
+
+    def gsapi_delete_instance(self, _handle):
+        self.deleted += 1
+
+
+@pytest.fixture
+def fake_lib(monkeypatch):
+    lib = FakeLibgs()
+    monkeypatch.setattr(ghostscript_service, "_load_library", lambda _path: lib)
+    return lib
+
+
+def test_pooled_job_is_isolated_with_save_and_restore(tmp_path, fake_lib):
+    # Arrange
+    fake_lib.outputs = [b"%%BoundingBox: 1 2 3 4\n", b""]
+    service = GhostscriptService(pool_size=1, root=tmp_path)
+    src = tmp_path / "in.pdf"
+
+    # Act
+    lines = service.run("bbox", src, params={"Resolution": 72})
+    service.run("pdfwrite", src, tmp_path / "out.pdf", setup="<< >> setdistillerparams")
+
+    # Assert
+    assert lines == ["%%BoundingBox: 1 2 3 4"]
+    assert fake_lib.instances == 1  # 2 つ目のジョブは同じインスタンスで実行する
+    first, second = fake_lib.programs
+    assert first.splitlines()[0].endswith("save put")
+    assert first.splitlines()[-1].endswith("get restore")
+    assert "(bbox) selectdevice" in first and "/Resolution 72" in first
+    assert f"/OutputFile ({tmp_path / 'out.pdf'})" in second
+    assert second.index("setdistillerparams") < second.index(f"({src}) run")
+    service.close()
+    assert fake_lib.deleted == 1
+
+
+def test_failed_pooled_job_falls_back_to_gs_and_disables_the_pool(tmp_path, fake_lib, monkeypatch):
+    # Arrange
+    fake_lib.codes = [-100]
+    commands = []
+
+    def fake_run_captured(cmd, cwd=None, on_line=None, tail_lines=200):
+        commands.append(cmd)
+        return ["from gs"]
+
+    monkeypatch.setattr(ghostscript_service, "run_captured", fake_run_captured)
+    service = GhostscriptService(pool_size=2, root=tmp_path)
+
+    # Act
+    first = service.run("bbox", tmp_path / "in.pdf")
+    second = service.run("bbox", tmp_path / "in.pdf")
+
+    # Assert
+    assert first == second == ["from gs"]
+    assert len(commands) == 2 and commands[0][0] == "gs"
+    assert len(fake_lib.programs) == 1  # 以後は libgs を使わない
+    assert fake_lib.deleted == 1
+
+
+def test_quit_is_not_treated_as_failure(tmp_path, fake_lib):
+    # Arrange
+    fake_lib.codes = [GS_ERROR_QUIT]
+    service = GhostscriptService(pool_size=1, root=tmp_path)
+
+    # Act
+    service.run("bbox", tmp_path / "in.pdf")
+
+    # Assert
+    assert fake_lib.deleted == 0
+    service.close()
+
+
+def test_pool_is_skipped_when_disabled_or_outside_root(tmp_path, fake_lib, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(
+        ghostscript_service, "run_captured", lambda cmd, **kwargs: ["from gs"]
+    )
+    disabled = GhostscriptService(pool_size=0, root=tmp_path)
+    pooled = GhostscriptService(pool_size=1, root=tmp_path / "sub")
+
+    # Act
+    disabled.run("bbox", tmp_path / "in.pdf")
+    pooled.run("bbox", tmp_path / "in.pdf")
+
+    # Assert
+    assert fake_lib.instances == 0
+    assert fake_lib.programs == []
+
+
+def test_pool_is_disabled_when_libgs_cannot_be_loaded(tmp_path, monkeypatch):
+    # Arrange
+    def missing(_path):
+        raise OSError("libgs not found")
+
+    monkeypatch.setattr(ghostscript_service, "_load_library", missing)
+    monkeypatch.setattr(
+        ghostscript_service, "run_captured", lambda cmd, **kwargs: ["from gs"]
+    )
+    service = GhostscriptService(pool_size=2, root=tmp_path)
+
+    # Act
+    lines = service.run("bbox", tmp_path / "in.pdf")
+
+    # Assert
+    assert lines == ["from gs"]
+    assert service._disabled
@@ -0,0 +1,69 @@
+import pytest
+
+from domain.models.tex_document import TexDocument
+from domain.services.tex_preflight_service import TexPreflightService
+
+
+def check(body: str) -> list[tuple[int, str]]:
+    content = "\\documentclass{article}\n\\begin{document}\n" + body + "\n\\end{document}\n"
+    return [(d.line, d.message) for d in TexPreflightService().check(TexDocument(content=content))]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "$a$$b$",  # インライン数式が 2 つ続いたもの
+        "$$a$$ and $b$",
+        "\\[ a \\] $x$$y$",
+    ],
+)
+def test_adjacent_inline_math_is_not_an_error(body):
+    assert check(body) == []
+
+
+@pytest.mark.parametrize(
+    "body, opener",
+    [
+        ("$a\n\nb$ and $c$", "$"),
+        ("\\[ a\n\nb \\] and $c$", "\\["),
+        ("$$ a\n\nb $$", "$$"),
+    ],
+)
+def test_blank_line_in_math_is_reported_once(body, opener):
+    assert check(body) == [(3, f"Blank line inside math mode opened with {opener}")]
+
+
+def test_unclosed_math_is_still_reported():
+    assert check("$$a$ b") == [
+        (3, "$ inside math mode opened with $$ on line 3"),
+        (3, "Unclosed math mode opened with $$"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "\\url{http://example.com/a%20b}",
+        "\\href{http://example.com/a%20b}{link}",
+        "\\mintinline{python}{x % 2}",
+        "\\path{a%b}",
+        "\\lstinline|$x|",
+        "\\lstinline[language=C]{a{b}%c}",
+        "\\Verb|{|",
+        "\\spverb+$+",
+    ],
+)
+def test_verbatim_arguments_are_not_linted(body):
+    assert check(body) == []
+
+
+def test_undecidable_verbatim_argument_is_a_warning():
+    # Arrange
+    content = "\\documentclass{article}\n\\begin{document}\n\\url{a%b\n$x\n\\end{document}\n"
+    service = TexPreflightService()
+
+    # Act
+    diagnostics = service.validate(TexDocument(content=content))
+
+    # Assert
+    assert [(d.level, d.line) for d in diagnostics] == [("warning", 3)]
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# `latexcrop --help` の import にかけてよい累計時間（マイクロ秒）。
+# 実行環境の速さに左右されるため，環境変数で予算を与えた場合だけ検査する
+STARTUP_IMPORT_BUDGET_ENV = "LATEXCROP_STARTUP_BUDGET_US"
+# --help では読み込んではならない重いモジュール
+HEAVY_MODULES = ("pikepdf", "application.usecases", "domain.services", "presentation")
+
+
+def run_importtime(*args: str) -> list[tuple[str, int]]:
+    """
+    `python -X importtime -m latexcrop ...` を実行し，
+    (モジュール名, 自身の import 時間 [us]) のリストを返す。
+    """
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "latexcrop", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us)))
+    return modules
+
+
+def test_help_does_not_import_heavy_modules():
+    modules = [name for name, _ in run_importtime("--help")]
+
+    assert "latexcrop.cli" in modules
+    for name in modules:
+        assert not name.startswith(HEAVY_MODULES), f"{name} imported for --help"
+
+
+@pytest.mark.skipif(
+    STARTUP_IMPORT_BUDGET_ENV not in os.environ,
+    reason=f"set {STARTUP_IMPORT_BUDGET_ENV} to check the startup import time",
+)
+def test_help_import_time_within_budget():
+    budget_us = int(os.environ[STARTUP_IMPORT_BUDGET_ENV])
+    total_us = sum(us for _, us in run_importtime("compile", "--help"))
+
+    assert total_us < budget_us, f"startup imports took {total_us} us"
@@ -0,0 +1,201 @@
+import threading
+import time
+import pytest
+
+from application.dto.pipeline_request import PipelineRequest
+from application.usecases.cluster_worker_usecase import ClusterWorkerUseCase
+from application.usecases.remote_compile_usecase import RemoteCompileUseCase
+from domain.services.compile_cluster_service import (
+    ClusterClient,
+    ClusterCoordinator,
+    ClusterJobError,
+)
+
+RC = "$latex='xelatex %O %S';"
+
+
+def make_request(preamble: str, body: str = "Hello") -> PipelineRequest:
+    return PipelineRequest(
+        tex_content=f"\\documentclass{{article}}{preamble}\\begin{{document}}{body}\\end{{document}}",
+        latexmkrc_content=RC,
+        margins=(0, 0, 0, 0),
+    )
+
+
+@pytest.fixture
+def make_pipeline(fake_pipeline):
+    def make(name: str):
+        return fake_pipeline(
+            name,
+            data=b"%PDF " + name.encode(),
+            logs=(name,),
+            timings={"compile": 0.1},
+            fail_on="FAIL",
+        )
+
+    return make
+
+
+def start_worker(coordinator, worker_uc):
+    host, port = coordinator.address
+    threading.Thread(target=worker_uc.run, args=(host, port), daemon=True).start()
+
+
+def wait_for_workers(coordinator, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        workers = coordinator.workers()
+        if len(workers) == count and all(w["free"] == w["capacity"] for w in workers):
+            return
+        time.sleep(0.01)
+    raise TimeoutError("workers did not register")
+
+
+def test_jobs_are_routed_to_worker_with_cached_preamble(make_pipeline):
+    # Arrange
+    coordinator = ClusterCoordinator()
+    remote_uc = RemoteCompileUseCase(coordinator, timeout=5)
+    warm = ClusterWorkerUseCase(make_pipeline("warm"), capacity=1, worker_id="warm")
+    cold = ClusterWorkerUseCase(make_pipeline("cold"), capacity=4, worker_id="cold")
+    request = make_request("\\usepackage{amsmath}")
+    warm._preambles.add(RemoteCompileUseCase.affinity_key(request))
+    start_worker(coordinator, warm)
+    start_worker(coordinator, cold)
+    wait_for_workers(coordinator, 2)
+
+    try:
+        # Act
+        result = remote_uc.execute(request)
+    finally:
+        coordinator.close()
+
+    # Assert
+    assert result.pdf_path.read_bytes() == b"%PDF warm"
+    assert "Processed on worker warm." in result.logs
+    assert {"compile", "worker", "dispatch"} <= set(result.timings)
+
+
+def test_batch_of_jobs_is_spread_and_failures_are_reported(make_pipeline):
+    # Arrange
+    coordinator = ClusterCoordinator()
+    remote_uc = RemoteCompileUseCase(coordinator, timeout=5)
+    for name in ("a", "b"):
+        start_worker(
+            coordinator,
+            ClusterWorkerUseCase(make_pipeline(name), capacity=2, worker_id=name),
+        )
+    wait_for_workers(coordinator, 2)
+
+    try:
+        # Act
+        futures = [
+            coordinator.submit(make_request(f"% {i}").to_dict(), f"key-{i}") for i in range(8)
+        ]
+        results = [f.result(5) for f in futures]
+        with pytest.raises(ClusterJobError, match="latexmk failed"):
+            remote_uc.execute(make_request("", body="FAIL"))
+    finally:
+        coordinator.close()
+
+    # Assert
+    assert {r["worker_id"] for r in results} == {"a", "b"}
+    assert all(r["data"].startswith(b"%PDF") for r in results)
+
+
+def test_workers_without_the_shared_secret_are_rejected(make_pipeline):
+    # Arrange
+    coordinator = ClusterCoordinator(secret="s3cret")
+    host, port = coordinator.address
+    intruder = ClusterWorkerUseCase(make_pipeline("x"), capacity=1, worker_id="x")
+    trusted = ClusterWorkerUseCase(
+        make_pipeline("ok"), capacity=1, worker_id="ok", secret="s3cret"
+    )
+
+    try:
+        # Act
+        with pytest.raises(ConnectionError, match="rejected"):
+            intruder.run(host, port)
+        start_worker(coordinator, trusted)
+        wait_for_workers(coordinator, 1)
+        result = coordinator.submit(make_request("").to_dict()).result(5)
+    finally:
+        coordinator.close()
+
+    # Assert
+    assert result["worker_id"] == "ok"
+    with pytest.raises(ValueError, match="secret"):
+        ClusterCoordinator(host="0.0.0.0")
+
+
+def test_close_fails_jobs_running_on_workers(make_pipeline):
+    # Arrange
+    coordinator = ClusterCoordinator()
+    started, release = threading.Event(), threading.Event()
+    pipeline = make_pipeline("slow")
+    execute = pipeline.execute.side_effect
+
+    def slow_execute(req):
+        started.set()
+        release.wait(5)
+        return execute(req)
+
+    pipeline.execute.side_effect = slow_execute
+    start_worker(coordinator, ClusterWorkerUseCase(pipeline, capacity=1, worker_id="slow"))
+    wait_for_workers(coordinator, 1)
+    future = coordinator.submit(make_request("").to_dict())
+    assert started.wait(5)
+
+    # Act
+    coordinator.close()
+    release.set()
+
+    # Assert
+    with pytest.raises(ClusterJobError, match="closed"):
+        future.result(1)
+
+
+def test_timed_out_job_is_cancelled_before_it_reaches_a_worker(make_pipeline):
+    # Arrange
+    coordinator = ClusterCoordinator()
+    remote_uc = RemoteCompileUseCase(coordinator, timeout=0.05)
+    pipeline = make_pipeline("late")
+
+    try:
+        # Act
+        with pytest.raises(TimeoutError):
+            remote_uc.execute(make_request(""))
+        start_worker(coordinator, ClusterWorkerUseCase(pipeline, capacity=1, worker_id="late"))
+        wait_for_workers(coordinator, 1)
+        pending = coordinator.pending()
+    finally:
+        coordinator.close()
+
+    # Assert
+    assert pending == 0
+    pipeline.execute.assert_not_called()
+
+
+def test_job_orphaned_too_many_times_fails():
+    # Arrange
+    coordinator = ClusterCoordinator(max_attempts=2)
+    host, port = coordinator.address
+    future = coordinator.submit(make_request("").to_dict())
+    received = []
+
+    try:
+        # Act
+        for i in range(2):
+            # ジョブを受け取ったまま落ちるワーカー
+            client = ClusterClient(host, port, f"crash-{i}", capacity=1)
+            client.pull()
+            received.append(client.receive()["job_id"])
+            client.close()
+        with pytest.raises(ClusterJobError, match="Gave up after 2 attempts"):
+            future.result(5)
+        pending = coordinator.pending()
+    finally:
+        coordinator.close()
+
+    # Assert
+    assert len(set(received)) == 1
+    assert pending == 0
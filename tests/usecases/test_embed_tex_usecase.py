@@ -1,11 +1,18 @@
 from unittest.mock import MagicMock, ANY
 
+import pikepdf
+
 from application.usecases.embed_tex_usecase import EmbedTexUseCase
+from application.usecases.extract_files_usecase import ExtractFilesUseCase
+from application.usecases.extract_tex_usecase import ExtractTexUseCase
 from application.dto.embed_request import EmbedRequest
+from application.dto.extract_request import ExtractRequest
 from application.dto.process_result import ProcessResult
 from domain.services.pdf_embed_service import PdfEmbedService
+from domain.services.pdf_extract_service import PdfExtractService
 from domain.models.pdf_document import PdfDocument
 from domain.models.embedded_file import EmbeddedFile
+from domain.models.project_bundle import BUNDLE_NAME
 
 
 def test_embed_tex_usecase_success(tmp_path):
@@ -31,6 +38,64 @@ def test_embed_tex_usecase_success(tmp_path):
     assert result.pdf_path == dummy_embedded.path
     assert "Validated PdfDocument." in result.logs
     assert f"Embedded files into PDF at {dummy_embedded.path}" in result.logs
-    mock_service.embed.assert_called_once_with(ANY, [embedded_file])
+    mock_service.embed.assert_called_once_with(ANY, [embedded_file], linearize=False, bundle=False)
 
     print(result.logs)
+
+
+def test_embed_tex_usecase_linearize(tmp_path):
+    # Arrange
+    input_pdf_path = tmp_path / "in.pdf"
+    input_pdf_path.write_bytes(b"%PDF-1.4")
+    dummy_embed_path = tmp_path / "in-embed.pdf"
+    dummy_embed_path.write_bytes(b"%PDF-1.4")
+
+    embedded_file = EmbeddedFile(name="test.tex", data=b"content")
+    mock_service = MagicMock(spec=PdfEmbedService)
+    mock_service.embed.return_value = PdfDocument(path=dummy_embed_path)
+
+    usecase = EmbedTexUseCase(embed_service=mock_service)
+    request = EmbedRequest(
+        pdf_path=input_pdf_path, embedded_files=[embedded_file], linearize=True
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert "Linearized PDF for fast web view." in result.logs
+    mock_service.embed.assert_called_once_with(ANY, [embedded_file], linearize=True, bundle=False)
+
+
+def test_embed_tex_usecase_bundle_round_trips_project_files(tmp_path):
+    # Arrange
+    input_pdf_path = tmp_path / "in.pdf"
+    with pikepdf.new() as pdf:
+        pdf.add_blank_page()
+        pdf.save(input_pdf_path)
+    main = EmbeddedFile.from_content(
+        "main.tex", "\\documentclass{article}\n\\begin{document}\n\\input{sections/a}\n\\end{document}\n"
+    )
+    section = EmbeddedFile.from_content("sections/a.tex", "Hello.")
+    figure = EmbeddedFile(name="figures/plot.png", data=b"\x89PNG" + bytes(1000))
+    usecase = EmbedTexUseCase(embed_service=PdfEmbedService())
+
+    # Act
+    result = usecase.execute(
+        EmbedRequest(pdf_path=input_pdf_path, embedded_files=[main, section, figure], bundle=True)
+    )
+    files_result = ExtractFilesUseCase(PdfExtractService()).execute(
+        ExtractRequest(pdf_path=result.pdf_path, file_names=("figures/plot.png",))
+    )
+    tex_result = ExtractTexUseCase(PdfExtractService()).execute(
+        ExtractRequest(pdf_path=result.pdf_path)
+    )
+
+    # Assert
+    with pikepdf.open(result.pdf_path) as pdf:
+        assert list(pdf.attachments) == [BUNDLE_NAME]
+    assert [entry.name for entry in files_result.entries] == [
+        "main.tex", "sections/a.tex", "figures/plot.png"
+    ]
+    assert files_result.files == [figure]
+    assert tex_result.body == "\\input{sections/a}"
@@ -1,9 +1,16 @@
+import subprocess
+from dataclasses import replace
 from unittest.mock import MagicMock
 
+import pytest
+
 from application.usecases.generate_pdf_usecase import GeneratePdfUseCase
 from application.dto.compile_request import CompileRequest
 from application.dto.process_result import ProcessResult
-from domain.services.latex_compile_service import LatexCompileService
+from domain.services.asset_store_service import AssetStore
+from domain.services.file_cache_service import FileCache
+from domain.services.latex_compile_service import LatexCompileError, LatexCompileService
+from domain.services.tex_preflight_service import TexPreflightError
 from domain.models.pdf_document import PdfDocument
 
 from logging import getLogger
@@ -38,3 +45,184 @@ def test_generate_pdf_usecase_success(tmp_path):
     mock_service.compile.assert_called_once()
 
     print(result.logs)
+
+
+def test_generate_pdf_usecase_reuses_workdir(tmp_path):
+    # Arrange
+    dummy_pdf_path = tmp_path / "main.pdf"
+    dummy_pdf_path.write_bytes(b"%PDF-1.4")
+
+    mock_service = MagicMock(spec=LatexCompileService)
+    mock_service.compile.return_value = PdfDocument(path=dummy_pdf_path)
+
+    usecase = GeneratePdfUseCase(compile_service=mock_service)
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        workdir=tmp_path,
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert f"Reused warm workdir {tmp_path}." in result.logs
+    assert mock_service.compile.call_args.kwargs["workdir"] == tmp_path
+
+
+def test_generate_pdf_usecase_fails_fast_on_known_bad_input(tmp_path, fake_run_captured):
+    # Arrange: latexmk の代わりにエラーを出力して失敗させる
+    streamed = []
+
+    def fail(cmd, cwd, on_line):
+        output = ["(./main.tex", "! Undefined control sequence.", "l.3 \\foo"]
+        (cwd / "main.log").write_text("\n".join(output))
+        if any(on_line(line) for line in output):
+            raise subprocess.CalledProcessError(-15, cmd)
+
+    fake_run_captured.on_run = fail
+    service = LatexCompileService(failure_cache=FileCache(tmp_path / "failures"))
+    usecase = GeneratePdfUseCase(compile_service=service)
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document} \\foo \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        workdir=tmp_path / "work",
+        log_sink=streamed.append,
+    )
+
+    # Act
+    with pytest.raises(LatexCompileError) as first:
+        usecase.execute(request)
+    with pytest.raises(LatexCompileError) as second:
+        usecase.execute(request)
+
+    # Assert
+    assert len(fake_run_captured.calls) == 1
+    assert streamed == ["[TeX error] ./main.tex:3: Undefined control sequence."]
+    assert (first.value.diagnostic.file, first.value.diagnostic.line) == ("./main.tex", 3)
+    assert second.value.cached and second.value.diagnostic == first.value.diagnostic
+    assert not any((tmp_path / "work").iterdir())
+
+    # Act: コメント行を足すとエラーの行番号が変わるため，記録した失敗は使わない
+    with pytest.raises(LatexCompileError) as third:
+        usecase.execute(replace(request, tex_content="% note\n" + request.tex_content))
+
+    # Assert
+    assert len(fake_run_captured.calls) == 2 and not third.value.cached
+
+
+def test_generate_pdf_usecase_rejects_broken_input_before_compiling():
+    # Arrange
+    mock_service = MagicMock(spec=LatexCompileService)
+    usecase = GeneratePdfUseCase(compile_service=mock_service)
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\n\\begin{document}\n{\\bf Hello\n\\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+    )
+
+    # Act
+    with pytest.raises(TexPreflightError) as e:
+        usecase.execute(request)
+
+    # Assert
+    assert [(d.line, d.message) for d in e.value.diagnostics] == [(3, "Unclosed '{'")]
+    mock_service.compile.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "engine_output, expected_commands",
+    [
+        (["(./main.tex)", "Output written on main.pdf (1 page)."], ["pdflatex"]),
+        (
+            ["(./main.tex", "LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.", ")"],
+            ["pdflatex", "latexmk"],
+        ),
+    ],
+)
+def test_generate_pdf_usecase_fast_mode_escalates_only_on_rerun(
+    tmp_path, fake_run_captured, engine_output, expected_commands
+):
+    # Arrange: エンジンを直接起動し，再実行が必要なときだけ latexmk を呼ぶ
+    def emit(cmd, cwd, on_line):
+        for line in engine_output if cmd[0] == "pdflatex" else []:
+            on_line(line)
+
+    fake_run_captured.on_run = emit
+    usecase = GeneratePdfUseCase(compile_service=LatexCompileService(fast_mode=True))
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$pdf_mode = 1;\n$pdflatex = 'pdflatex %O %S';\n",
+        workdir=tmp_path / "work",
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert fake_run_captured.commands == expected_commands
+    assert result.pdf_path == tmp_path / "work" / "main.pdf"
+
+
+@pytest.mark.parametrize(
+    "previous_aux, written, expected_commands",
+    [
+        # \tableofcontents は初回に .toc を書くだけで再実行を求めない
+        (None, {"main.aux": "\\relax", "main.toc": "\\contentsline"}, ["pdflatex", "latexmk"]),
+        (None, {"main.aux": "\\relax", "main.lof": ""}, ["pdflatex"]),
+        ("\\relax", {"main.aux": "\\relax"}, ["pdflatex"]),
+        ("\\relax", {"main.aux": "\\newlabel{x}{{1}{1}}"}, ["pdflatex", "latexmk"]),
+    ],
+)
+def test_generate_pdf_usecase_fast_mode_escalates_when_auxiliary_files_change(
+    tmp_path, fake_run_captured, previous_aux, written, expected_commands
+):
+    # Arrange
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    if previous_aux is not None:
+        (workdir / "main.aux").write_text(previous_aux)
+
+    def write_auxiliary(cmd, cwd, on_line):
+        if cmd[0] == "pdflatex":
+            for name, content in written.items():
+                (cwd / name).write_text(content)
+
+    fake_run_captured.on_run = write_auxiliary
+    usecase = GeneratePdfUseCase(compile_service=LatexCompileService(fast_mode=True))
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document}\\tableofcontents\\end{document}",
+        latexmkrc_content="$pdf_mode = 1;\n$pdflatex = 'pdflatex %O %S';\n",
+        workdir=workdir,
+    )
+
+    # Act
+    usecase.execute(request)
+
+    # Assert
+    assert fake_run_captured.commands == expected_commands
+
+
+def test_generate_pdf_usecase_links_assets_into_workdir(tmp_path, fake_run_captured):
+    # Arrange: 1 度だけ保存した画像を，コンパイルのたびに作業ディレクトリへ配置する
+    seen = []
+    fake_run_captured.on_run = lambda cmd, cwd, on_line: seen.append(
+        (cwd / "figures" / "plot.png").read_bytes()
+    )
+    store = AssetStore(tmp_path / "assets")
+    digest = store.put(b"\x89PNG figure")
+    usecase = GeneratePdfUseCase(compile_service=LatexCompileService(asset_store=store))
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document}\\includegraphics{figures/plot}\\end{document}",
+        latexmkrc_content="$pdf_mode = 1;",
+        workdir=tmp_path / "work",
+        assets={"figures/plot.png": digest},
+    )
+
+    # Act
+    usecase.execute(request)
+    usecase.execute(request)
+
+    # Assert
+    assert seen == [b"\x89PNG figure"] * 2
+    assert store.put(b"\x89PNG figure") == digest
+    assert store.missing([digest, "0" * 64]) == ["0" * 64]
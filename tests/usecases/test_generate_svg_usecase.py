@@ -0,0 +1,111 @@
+from pathlib import Path
+from unittest.mock import MagicMock, ANY
+
+from application.usecases.generate_svg_usecase import GenerateSvgUseCase
+from application.dto.compile_request import CompileRequest
+from application.dto.process_result import ProcessResult
+from domain.services.latex_compile_service import LatexCompileService
+from domain.services.svg_embed_service import SvgEmbedService
+from domain.models.svg_document import SvgDocument
+from domain.models.embedded_file import EmbeddedFile
+
+
+def test_generate_svg_usecase_success(tmp_path):
+    # Arrange
+    svg_path = tmp_path / "main.svg"
+    svg_path.write_text("<svg></svg>")
+    embedded_path = tmp_path / "main-embed.svg"
+    embedded_path.write_text("<svg></svg>")
+
+    mock_compile = MagicMock(spec=LatexCompileService)
+    mock_compile.compile_svg.return_value = SvgDocument(path=svg_path)
+    mock_embed = MagicMock(spec=SvgEmbedService)
+    mock_embed.embed.return_value = SvgDocument(path=embedded_path)
+
+    usecase = GenerateSvgUseCase(
+        compile_service=mock_compile, svg_embed_service=mock_embed
+    )
+    tex_content = "\\documentclass{article}\\begin{document} Hello, world! \\end{document}"
+    request = CompileRequest(
+        tex_content=tex_content,
+        latexmkrc_content="$latex='xelatex %O %S';",
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert isinstance(result, ProcessResult)
+    assert result.pdf_path == embedded_path
+    assert f"Generated SVG at {svg_path}" in result.logs
+    mock_compile.compile_svg.assert_called_once()
+    mock_embed.embed.assert_called_once_with(
+        ANY, [EmbeddedFile.from_content("main.tex", tex_content)]
+    )
+
+
+def test_generate_svg_usecase_streams_repeated_diagnostics(tmp_path):
+    # Arrange
+    from domain.models.tex_diagnostic import TexDiagnostic
+
+    svg_path = tmp_path / "main.svg"
+    svg_path.write_text("<svg></svg>")
+    warning = TexDiagnostic("badbox", "Overfull \\hbox", "./main.tex", 3)
+
+    def compile_svg(tex_doc, rc_source, on_diagnostic=None, assets=None, workdir=None):
+        on_diagnostic(warning)
+        on_diagnostic(warning)
+        return SvgDocument(path=svg_path)
+
+    mock_compile = MagicMock(spec=LatexCompileService)
+    mock_compile.compile_svg.side_effect = compile_svg
+    mock_embed = MagicMock(spec=SvgEmbedService)
+    mock_embed.embed.return_value = SvgDocument(path=svg_path)
+    streamed = []
+    usecase = GenerateSvgUseCase(compile_service=mock_compile, svg_embed_service=mock_embed)
+    request = CompileRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        log_sink=streamed.append,
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    line = f"[TeX badbox] {warning}"
+    assert streamed == [line, line]
+    assert result.logs.count(line) == 2
+
+
+def test_compile_svg_removes_build_dir_and_keys_cache_on_toolchain(
+    tmp_path, fake_run_captured, monkeypatch
+):
+    # Arrange
+    from domain.models.latexmkrc_source import LatexmkrcSource
+    from domain.models.tex_document import TexDocument
+    from domain.services.file_cache_service import FileCache
+
+    build_dirs = []
+
+    def on_run(cmd, cwd, on_line):
+        if cmd[0] == "dvisvgm":
+            build_dirs.append(cwd)
+            output = next(arg for arg in cmd if arg.startswith("--output="))
+            Path(output.removeprefix("--output=")).write_text("<svg></svg>")
+
+    fake_run_captured.on_run = on_run
+    service = LatexCompileService(svg_cache=FileCache(tmp_path / "svg"))
+    tex_doc = TexDocument(content="\\documentclass{article}\\begin{document} Hi \\end{document}")
+    rc_source = LatexmkrcSource(content="$latex='xelatex %O %S';")
+
+    # Act
+    first = service.compile_svg(tex_doc, rc_source, workdir=tmp_path / "a")
+    cached = service.compile_svg(tex_doc, rc_source, workdir=tmp_path / "b")
+    monkeypatch.setattr(LatexCompileService, "toolchain", staticmethod(lambda rc: ["latexmk=new"]))
+    rebuilt = service.compile_svg(tex_doc, rc_source, workdir=tmp_path / "c")
+
+    # Assert
+    assert first.path.read_text() == cached.path.read_text() == rebuilt.path.read_text()
+    assert fake_run_captured.commands == ["latexmk", "dvisvgm", "latexmk", "dvisvgm"]
+    assert build_dirs and not any(d.exists() for d in build_dirs)
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+from application.usecases.submit_job_usecase import SubmitJobUseCase
+from application.usecases.get_job_status_usecase import GetJobStatusUseCase
+from application.usecases.job_worker_usecase import JobWorkerUseCase
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.dto.pipeline_request import PipelineRequest
+from domain.services.job_queue_service import JobQueueService
+
+REQUEST = PipelineRequest(
+    tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+    latexmkrc_content="$latex='xelatex %O %S';",
+    margins=(1, 2, 3, 4),
+)
+
+
+def test_submitted_job_is_processed_and_pollable(tmp_path, fake_pipeline):
+    # Arrange
+    queue = JobQueueService(tmp_path / "jobs.db")
+    pipeline = fake_pipeline(timings={"compile": 0.5})
+    worker = JobWorkerUseCase(queue, pipeline, tmp_path / "results", worker_id="w1")
+
+    # Act
+    job_id = SubmitJobUseCase(queue).execute(REQUEST)
+    queued = GetJobStatusUseCase(queue).execute(job_id)
+    processed = worker.run_once()
+    done = GetJobStatusUseCase(queue).execute(job_id)
+
+    # Assert
+    assert queued.status == "queued"
+    assert processed and not worker.run_once()
+    assert pipeline.execute.call_args.args[0] == REQUEST
+    assert done.status == "done"
+    assert done.pdf_path == tmp_path / "results" / f"{job_id}.pdf"
+    assert done.pdf_path.exists()
+    assert done.timings["compile"] == 0.5 and "total" in done.timings
+
+
+def test_failed_job_is_retried_until_max_attempts(tmp_path):
+    # Arrange
+    queue = JobQueueService(tmp_path / "jobs.db", max_attempts=2)
+    pipeline = MagicMock(spec=ProcessPdfPipelineUseCase)
+    pipeline.execute.side_effect = RuntimeError("latexmk failed")
+    worker = JobWorkerUseCase(queue, pipeline, tmp_path / "results")
+    job_id = SubmitJobUseCase(queue).execute(REQUEST)
+
+    # Act
+    worker.run_once()
+    after_first = GetJobStatusUseCase(queue).execute(job_id)
+    worker.run_once()
+    after_second = GetJobStatusUseCase(queue).execute(job_id)
+
+    # Assert
+    assert after_first.status == "queued" and after_first.error == "latexmk failed"
+    assert after_second.status == "failed" and after_second.attempts == 2
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    # Arrange
+    queue = JobQueueService(tmp_path / "jobs.db")
+    job_id = SubmitJobUseCase(queue).execute(REQUEST)
+    crashed = queue.claim("crashed-worker", lease_seconds=-1)
+
+    # Act
+    reclaimed = queue.claim("healthy-worker")
+
+    # Assert
+    assert crashed.job_id == reclaimed.job_id == job_id
+    assert reclaimed.attempts == 2
+    assert not queue.complete(job_id, "crashed-worker", {})
+
+
+def test_worker_prefers_jobs_sharing_its_last_preamble(tmp_path, fake_pipeline):
+    # Arrange
+    queue = JobQueueService(tmp_path / "jobs.db")
+    pipeline = fake_pipeline()
+    worker = JobWorkerUseCase(queue, pipeline, tmp_path / "results", workdir=tmp_path / "warm")
+    other = PipelineRequest(
+        tex_content="\\documentclass{book}\\begin{document} Other \\end{document}",
+        latexmkrc_content=REQUEST.latexmkrc_content,
+        margins=(0, 0, 0, 0),
+    )
+    SubmitJobUseCase(queue).execute_many([REQUEST, other, REQUEST])
+
+    # Act
+    for _ in range(3):
+        worker.run_once()
+
+    # Assert
+    ran = [call.args[0].tex_content for call in pipeline.execute.call_args_list]
+    assert ran == [REQUEST.tex_content, REQUEST.tex_content, other.tex_content]
+    assert all(call.args[0].workdir == tmp_path / "warm" for call in pipeline.execute.call_args_list)
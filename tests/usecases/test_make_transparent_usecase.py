@@ -0,0 +1,136 @@
+import shutil
+from unittest.mock import MagicMock
+
+import pikepdf
+
+from application.dto.transparency_request import TransparencyRequest
+from application.usecases.make_transparent_usecase import MakeTransparentUseCase
+from domain.models.pdf_document import PdfDocument
+from domain.services.pdf_background_service import PdfBackgroundService
+from domain.services.pdf_transparency_service import PdfTransparencyService
+
+
+def make_pdf(path, content: bytes):
+    pdf = pikepdf.new()
+    pdf.add_blank_page(page_size=(200, 100))
+    pdf.pages[0].obj.Contents = pdf.make_stream(content)
+    pdf.save(path)
+    return path
+
+
+def test_make_transparent_usecase_skips_pdf_without_background(tmp_path):
+    # Arrange
+    # 白い文字サイズの矩形と黒い全面の塗りだけで，白い背景はない
+    input_pdf_path = make_pdf(
+        tmp_path / "plain.pdf", b"1 1 1 rg 10 10 5 5 re f 0 g 0 0 200 100 re f"
+    )
+    transparency_service = MagicMock(spec=PdfTransparencyService)
+    usecase = MakeTransparentUseCase(transparency_service, PdfBackgroundService())
+
+    # Act
+    result = usecase.execute(TransparencyRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert result.pdf_path == input_pdf_path
+    assert "Skipped transparency: no background fill in mask color." in result.logs
+    transparency_service.make_transparent.assert_not_called()
+
+
+def test_make_transparent_usecase_keeps_page_background_in_form(tmp_path):
+    # Arrange
+    # \pagecolor 相当の白い全面の塗りを，縮小した Form XObject の中に置く
+    input_pdf_path = tmp_path / "background.pdf"
+    pdf = pikepdf.new()
+    pdf.add_blank_page(page_size=(200, 100))
+    form = pdf.make_stream(b"1 1 1 rg 0 0 400 200 re f")
+    form.Type = pikepdf.Name.XObject
+    form.Subtype = pikepdf.Name.Form
+    form.BBox = [0, 0, 400, 200]
+    form.Matrix = [0.5, 0, 0, 0.5, 0, 0]
+    page = pdf.pages[0]
+    page.obj.Resources = pikepdf.Dictionary(XObject=pikepdf.Dictionary(Fm0=form))
+    page.obj.Contents = pdf.make_stream(b"q /Fm0 Do Q")
+    pdf.save(input_pdf_path)
+    output_pdf_path = tmp_path / "background-transp.pdf"
+    transparency_service = MagicMock(spec=PdfTransparencyService)
+    transparency_service.make_transparent.return_value = PdfDocument(path=output_pdf_path)
+    usecase = MakeTransparentUseCase(transparency_service, PdfBackgroundService())
+
+    # Act
+    result = usecase.execute(TransparencyRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert result.pdf_path == output_pdf_path
+    transparency_service.make_transparent.assert_called_once()
+
+
+def test_make_transparent_usecase_processes_page_ranges_in_parallel(tmp_path):
+    # Arrange
+    # 幅でページを見分けられる 3 ページの PDF（白い全面の背景つき）
+    input_pdf_path = tmp_path / "pages.pdf"
+    pdf = pikepdf.new()
+    for width in (100, 200, 300):
+        pdf.add_blank_page(page_size=(width, 100))
+        pdf.pages[-1].obj.Contents = pdf.make_stream(b"1 g 0 0 300 100 re f")
+    pdf.save(input_pdf_path)
+    ghostscript = MagicMock()
+    ghostscript.run.side_effect = lambda device, src, dst, **kwargs: shutil.copy(src, dst)
+    usecase = MakeTransparentUseCase(
+        PdfTransparencyService(ghostscript, max_workers=2), PdfBackgroundService()
+    )
+
+    # Act
+    result = usecase.execute(TransparencyRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert ghostscript.run.call_count == 2
+    with pikepdf.open(result.pdf_path) as merged:
+        assert [float(page.mediabox[2]) for page in merged.pages] == [100, 200, 300]
+    assert not (tmp_path / "pages-transp-pages").exists()
+
+
+def test_make_transparent_usecase_parallel_path_keeps_outline_labels_and_links(tmp_path):
+    # Arrange
+    # 4 ページの PDF。しおり・ページラベルと，1 ページ目から 4 ページ目へのリンクを持つ
+    input_pdf_path = tmp_path / "handout.pdf"
+    pdf = pikepdf.new()
+    for _ in range(4):
+        pdf.add_blank_page(page_size=(100, 100))
+        pdf.pages[-1].obj.Contents = pdf.make_stream(b"1 g 0 0 100 100 re f")
+    last = pdf.pages[3].obj
+    pdf.pages[0].obj.Annots = pdf.make_indirect(
+        [
+            pdf.make_indirect(
+                pikepdf.Dictionary(
+                    Type=pikepdf.Name.Annot,
+                    Subtype=pikepdf.Name.Link,
+                    Rect=[0, 0, 10, 10],
+                    Dest=[last, pikepdf.Name.Fit],
+                )
+            )
+        ]
+    )
+    pdf.Root.PageLabels = pikepdf.Dictionary(
+        Nums=[0, pikepdf.Dictionary(S=pikepdf.Name.r)]
+    )
+    with pdf.open_outline() as outline:
+        outline.root.append(pikepdf.OutlineItem("Last", 3))
+    pdf.save(input_pdf_path)
+    ghostscript = MagicMock()
+    ghostscript.run.side_effect = lambda device, src, dst, **kwargs: shutil.copy(src, dst)
+    usecase = MakeTransparentUseCase(
+        PdfTransparencyService(ghostscript, max_workers=2), PdfBackgroundService()
+    )
+
+    # Act
+    result = usecase.execute(TransparencyRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert ghostscript.run.call_count == 2
+    with pikepdf.open(result.pdf_path) as out:
+        last_page = out.pages[3].obj.objgen
+        with out.open_outline() as outline:
+            assert [item.title for item in outline.root] == ["Last"]
+            assert outline.root[0].destination[0].objgen == last_page
+        assert "/PageLabels" in out.Root
+        assert out.pages[0].obj.Annots[0].Dest[0].objgen == last_page
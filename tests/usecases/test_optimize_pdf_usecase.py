@@ -0,0 +1,67 @@
+import pikepdf
+
+from application.dto.optimize_request import OptimizeRequest
+from application.usecases.optimize_pdf_usecase import OptimizePdfUseCase
+from domain.services.pdf_optimize_service import PdfOptimizeService
+
+
+def test_optimize_pdf_usecase_merges_duplicate_xobjects_and_reports_savings(tmp_path):
+    # Arrange
+    # ページごとに同じ内容の Form XObject を別オブジェクトとして持ち，未使用のリソースもある PDF
+    input_pdf_path = tmp_path / "in.pdf"
+    pdf = pikepdf.new()
+    for _ in range(3):
+        pdf.add_blank_page(page_size=(100, 100))
+        form = pdf.make_stream(b"0 0 50 50 re f\n" * 200)
+        form.Type = pikepdf.Name.XObject
+        form.Subtype = pikepdf.Name.Form
+        form.BBox = [0, 0, 100, 100]
+        unused = pdf.make_stream(b"1 0 0 RG 0 0 m 100 100 l S\n" * 50)
+        unused.Type = pikepdf.Name.XObject
+        unused.Subtype = pikepdf.Name.Form
+        unused.BBox = [0, 0, 100, 100]
+        page = pdf.pages[-1]
+        page.obj.Resources = pikepdf.Dictionary(
+            XObject=pikepdf.Dictionary(Fm0=form, Fm1=unused)
+        )
+        page.obj.Contents = pdf.make_stream(b"/Fm0 Do")
+    pdf.save(input_pdf_path, compress_streams=False)
+    usecase = OptimizePdfUseCase(PdfOptimizeService(compression_level=6))
+
+    # Act
+    result = usecase.execute(OptimizeRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert "Merged 2 duplicate stream(s)." in result.logs
+    assert result.size_metrics["input_bytes"] == input_pdf_path.stat().st_size
+    assert result.size_metrics["saved_bytes"] > 0
+    with pikepdf.open(result.pdf_path) as optimized:
+        forms = [page.Resources.XObject for page in optimized.pages]
+        assert {xobjects.Fm0.objgen for xobjects in forms} == {forms[0].Fm0.objgen}
+        assert all("/Fm1" not in xobjects for xobjects in forms)
+
+
+def test_optimize_pdf_usecase_restores_flate_level_even_if_save_fails(tmp_path, monkeypatch):
+    # Arrange
+    import pytest
+
+    input_pdf_path = tmp_path / "in.pdf"
+    pdf = pikepdf.new()
+    pdf.add_blank_page(page_size=(100, 100))
+    pdf.save(input_pdf_path)
+    levels = []
+    monkeypatch.setattr(pikepdf.settings, "set_flate_compression_level", levels.append)
+
+    def failing_save(self, *args, **kwargs):
+        raise OSError("disk full")
+
+    usecase = OptimizePdfUseCase(PdfOptimizeService(compression_level=3))
+
+    # Act
+    usecase.execute(OptimizeRequest(pdf_path=input_pdf_path))
+    monkeypatch.setattr(pikepdf.Pdf, "save", failing_save)
+    with pytest.raises(OSError, match="disk full"):
+        usecase.execute(OptimizeRequest(pdf_path=input_pdf_path))
+
+    # Assert
+    assert levels == [3, -1, 3, -1]
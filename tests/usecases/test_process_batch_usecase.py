@@ -0,0 +1,83 @@
+import json
+from unittest.mock import MagicMock
+
+from application.usecases.process_batch_usecase import ProcessBatchUseCase
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.dto.batch_request import BatchItem, BatchRequest
+
+TEX = "\\documentclass{article}\\begin{document} %s \\end{document}"
+RC = "$latex='xelatex %O %S';"
+
+
+def test_process_batch_usecase_writes_outputs_and_manifest(tmp_path, fake_pipeline):
+    # Arrange
+    out_dir = tmp_path / "out"
+    pipeline = fake_pipeline()
+    usecase = ProcessBatchUseCase(pipeline_uc=pipeline)
+    items = [BatchItem(item_id=f"item{i}", tex_content=TEX % i, latexmkrc_content=RC) for i in range(3)]
+
+    # Act
+    result = usecase.execute(BatchRequest(items=items, output_dir=out_dir, jobs=2))
+
+    # Assert
+    assert result.is_success
+    assert [r.item_id for r in result.items] == ["item0", "item1", "item2"]
+    assert all((out_dir / f"item{i}.pdf").exists() for i in range(3))
+    manifest = json.loads(result.manifest_path.read_text())
+    assert [e["status"] for e in manifest["items"]] == ["ok", "ok", "ok"]
+    assert pipeline.execute.call_count == 3
+
+
+def test_process_batch_usecase_resumes_unchanged_items(tmp_path, fake_pipeline):
+    # Arrange
+    out_dir = tmp_path / "out"
+    pipeline = fake_pipeline()
+    usecase = ProcessBatchUseCase(pipeline_uc=pipeline)
+    items = [BatchItem(item_id=f"item{i}", tex_content=TEX % i, latexmkrc_content=RC) for i in range(2)]
+    usecase.execute(BatchRequest(items=items, output_dir=out_dir))
+    pipeline.execute.reset_mock()
+
+    # Act: item1 だけ変更する
+    items[1] = BatchItem(item_id="item1", tex_content=TEX % "changed", latexmkrc_content=RC)
+    result = usecase.execute(BatchRequest(items=items, output_dir=out_dir))
+
+    # Assert
+    assert [r.status for r in result.items] == ["skipped", "ok"]
+    assert pipeline.execute.call_count == 1
+
+
+def test_process_batch_usecase_records_failures(tmp_path):
+    # Arrange
+    pipeline = MagicMock(spec=ProcessPdfPipelineUseCase)
+    pipeline.execute.side_effect = RuntimeError("latexmk failed")
+    usecase = ProcessBatchUseCase(pipeline_uc=pipeline)
+    items = [BatchItem(item_id="bad", tex_content=TEX % "x", latexmkrc_content=RC)]
+
+    # Act
+    result = usecase.execute(BatchRequest(items=items, output_dir=tmp_path / "out"))
+
+    # Assert
+    assert not result.is_success
+    assert result.items[0].status == "failed"
+    assert result.items[0].error == "latexmk failed"
+
+
+def test_process_batch_usecase_groups_items_sharing_a_preamble(tmp_path, fake_pipeline):
+    # Arrange
+    pipeline = fake_pipeline()
+    usecase = ProcessBatchUseCase(pipeline_uc=pipeline)
+    other = "\\documentclass{book}\\begin{document} %s \\end{document}"
+    items = [
+        BatchItem(item_id=f"item{i}", tex_content=(TEX if i % 2 else other) % i, latexmkrc_content=RC)
+        for i in range(4)
+    ]
+
+    # Act
+    result = usecase.execute(BatchRequest(items=items, output_dir=tmp_path / "out", jobs=2))
+
+    # Assert: 同じプリアンブルの項目は同じ作業ディレクトリで処理される
+    workdirs = {
+        call.args[0].tex_content: call.args[0].workdir for call in pipeline.execute.call_args_list
+    }
+    assert workdirs[TEX % 1] == workdirs[TEX % 3] != workdirs[other % 0] == workdirs[other % 2]
+    assert [r.item_id for r in result.items] == ["item0", "item1", "item2", "item3"]
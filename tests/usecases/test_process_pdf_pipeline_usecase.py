@@ -0,0 +1,169 @@
+from unittest.mock import MagicMock
+
+from application.usecases.process_pdf_pipeline_usecase import ProcessPdfPipelineUseCase
+from application.usecases.generate_pdf_usecase import GeneratePdfUseCase
+from application.usecases.trim_pdf_usecase import TrimPdfUseCase
+from application.usecases.embed_tex_usecase import EmbedTexUseCase
+from application.usecases.make_transparent_usecase import MakeTransparentUseCase
+from application.dto.pipeline_request import PipelineRequest
+from application.dto.process_result import ProcessResult
+from application.pipeline_factory import build_pipeline_usecase
+
+
+def make_stage(tmp_path, cls, name):
+    path = tmp_path / f"{name}.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    stage = MagicMock(spec=cls)
+    stage.execute.return_value = ProcessResult(pdf_path=path, logs=[f"{name} done"])
+    return stage
+
+
+def test_process_pdf_pipeline_usecase_runs_all_stages(tmp_path):
+    # Arrange
+    generate_uc = make_stage(tmp_path, GeneratePdfUseCase, "compile")
+    trim_uc = make_stage(tmp_path, TrimPdfUseCase, "crop")
+    transparency_uc = make_stage(tmp_path, MakeTransparentUseCase, "transparency")
+    embed_uc = make_stage(tmp_path, EmbedTexUseCase, "embed")
+    usecase = ProcessPdfPipelineUseCase(
+        generate_uc=generate_uc,
+        trim_uc=trim_uc,
+        embed_uc=embed_uc,
+        transparency_uc=transparency_uc,
+    )
+    request = PipelineRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        margins=(1, 2, 3, 4),
+    )
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert result.pdf_path == tmp_path / "embed.pdf"
+    assert result.logs == ["compile done", "crop done", "transparency done", "embed done"]
+    assert list(result.timings) == ["compile", "crop", "transparency", "embed"]
+    assert trim_uc.execute.call_args.args[0].margins == (1, 2, 3, 4)
+    assert transparency_uc.execute.call_args.args[0].pdf_path == tmp_path / "crop.pdf"
+
+
+def test_process_pdf_pipeline_usecase_memoizes_unchanged_prefix(tmp_path):
+    # Arrange
+    from dataclasses import replace
+    from domain.services.file_cache_service import FileCache
+
+    generate_uc = make_stage(tmp_path, GeneratePdfUseCase, "compile")
+    generate_uc.compile_service = MagicMock()
+    generate_uc.compile_service.toolchain.return_value = ["latexmk=/usr/bin/latexmk"]
+    trim_uc = make_stage(tmp_path, TrimPdfUseCase, "crop")
+    transparency_uc = make_stage(tmp_path, MakeTransparentUseCase, "transparency")
+    embed_uc = make_stage(tmp_path, EmbedTexUseCase, "embed")
+    usecase = ProcessPdfPipelineUseCase(
+        generate_uc=generate_uc,
+        trim_uc=trim_uc,
+        embed_uc=embed_uc,
+        transparency_uc=transparency_uc,
+        cache=FileCache(tmp_path / "stages"),
+    )
+    request = PipelineRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        margins=(0, 0, 0, 0),
+    )
+
+    # Act
+    usecase.execute(request)
+    rerun = usecase.execute(replace(request, margins=(5, 5, 5, 5), skip_stages=("transparency",)))
+
+    # Assert
+    assert generate_uc.execute.call_count == 1
+    assert trim_uc.execute.call_count == 2
+    assert transparency_uc.execute.call_count == 1
+    assert embed_uc.execute.call_count == 2
+    assert rerun.cache_hits == ["compile"]
+    assert "Skipped transparency." in rerun.logs
+    assert list(rerun.timings) == ["compile", "crop", "embed"]
+
+
+def test_process_pdf_pipeline_usecase_ignores_cosmetic_edits_until_embed(tmp_path):
+    # Arrange
+    from dataclasses import replace
+    from domain.services.file_cache_service import FileCache
+
+    generate_uc = make_stage(tmp_path, GeneratePdfUseCase, "compile")
+    generate_uc.compile_service = MagicMock()
+    generate_uc.compile_service.toolchain.return_value = []
+    trim_uc = make_stage(tmp_path, TrimPdfUseCase, "crop")
+    transparency_uc = make_stage(tmp_path, MakeTransparentUseCase, "transparency")
+    embed_uc = make_stage(tmp_path, EmbedTexUseCase, "embed")
+    usecase = ProcessPdfPipelineUseCase(
+        generate_uc=generate_uc,
+        trim_uc=trim_uc,
+        embed_uc=embed_uc,
+        transparency_uc=transparency_uc,
+        cache=FileCache(tmp_path / "stages"),
+    )
+    request = PipelineRequest(
+        tex_content="\\documentclass{article}\n\\begin{document}\nHello world.\n\\end{document}\n",
+        latexmkrc_content="$latex = 'xelatex %O %S';\n",
+        margins=(0, 0, 0, 0),
+    )
+    edited = replace(
+        request,
+        tex_content="\\documentclass{article} % draft\r\n\\begin{document}\r\n  Hello   world.  \r\n\\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S'; # engine\n",
+    )
+
+    # Act
+    usecase.execute(request)
+    rerun = usecase.execute(edited)
+
+    # Assert
+    # 最も後ろのキャッシュ（transparency）だけを取り出し，それより前は取り出さない
+    assert rerun.cache_hits == ["transparency"]
+    assert generate_uc.execute.call_count == trim_uc.execute.call_count == 1
+    assert embed_uc.execute.call_count == 2
+    embedded = embed_uc.execute.call_args.args[0].embedded_files[0]
+    assert embedded.data == edited.tex_content.encode("utf-8")
+
+
+def test_process_pdf_pipeline_usecase_materializes_only_the_deepest_hit(tmp_path):
+    # Arrange
+    from domain.services.file_cache_service import FileCache
+
+    generate_uc = make_stage(tmp_path, GeneratePdfUseCase, "compile")
+    generate_uc.compile_service = MagicMock()
+    generate_uc.compile_service.toolchain.return_value = []
+    usecase = ProcessPdfPipelineUseCase(
+        generate_uc=generate_uc,
+        trim_uc=make_stage(tmp_path, TrimPdfUseCase, "crop"),
+        embed_uc=make_stage(tmp_path, EmbedTexUseCase, "embed"),
+        transparency_uc=make_stage(tmp_path, MakeTransparentUseCase, "transparency"),
+        cache=FileCache(tmp_path / "stages"),
+    )
+    request = PipelineRequest(
+        tex_content="\\documentclass{article}\\begin{document} Hello \\end{document}",
+        latexmkrc_content="$latex='xelatex %O %S';",
+        margins=(0, 0, 0, 0),
+        workdir=tmp_path / "work",
+    )
+
+    # Act
+    usecase.execute(request)
+    rerun = usecase.execute(request)
+
+    # Assert
+    assert rerun.cache_hits == ["embed"]
+    assert rerun.logs == ["Reused cached embed output."]
+    assert rerun.pdf_path == tmp_path / "work" / "stages" / "embed.pdf"
+    assert [p.name for p in (tmp_path / "work" / "stages").iterdir()] == ["embed.pdf"]
+
+
+def test_build_pipeline_usecase_includes_optimize_stage(tmp_path):
+    # Arrange / Act
+    usecase = build_pipeline_usecase(cache_root=tmp_path)
+
+    # Assert
+    assert [stage.name for stage in usecase.stages] == [
+        "compile", "crop", "transparency", "embed", "optimize"
+    ]
@@ -0,0 +1,30 @@
+from unittest.mock import MagicMock
+
+from application.usecases.render_preview_usecase import RenderPreviewUseCase
+from application.dto.preview_request import PreviewRequest
+from application.dto.preview_result import PreviewResult
+from domain.services.pdf_raster_service import PdfRasterService
+
+
+def test_render_preview_usecase_success(tmp_path):
+    # Arrange
+    input_pdf_path = tmp_path / "in.pdf"
+    input_pdf_path.write_bytes(b"%PDF-1.4")
+    page_72 = tmp_path / "page-001-72.png"
+    page_144 = tmp_path / "page-001-144.png"
+
+    mock_service = MagicMock(spec=PdfRasterService)
+    mock_service.render.side_effect = [([page_72], False), ([page_144], True)]
+
+    usecase = RenderPreviewUseCase(raster_service=mock_service)
+    request = PreviewRequest(pdf_path=input_pdf_path, dpis=(72, 144))
+
+    # Act
+    result = usecase.execute(request)
+
+    # Assert
+    assert isinstance(result, PreviewResult)
+    assert result.images == {72: [page_72], 144: [page_144]}
+    assert "Rendered 1 page(s) at 72 dpi as png (Ghostscript)." in result.logs
+    assert "Rendered 1 page(s) at 144 dpi as png (cache)." in result.logs
+    assert mock_service.render.call_count == 2
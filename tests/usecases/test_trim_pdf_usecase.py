@@ -30,3 +30,40 @@ def test_trim_pdf_usecase_success(tmp_path):
     assert "Validated PdfDocument." in result.logs
     mock_service.crop.assert_called_once_with(ANY, request.margins)
     print(result.logs)
+
+
+def test_trim_pdf_usecase_margin_only_rerun_reuses_bbox(tmp_path, monkeypatch):
+    # Arrange
+    import pikepdf
+    from domain.services import ghostscript_service
+    from domain.services.file_cache_service import FileCache
+    from domain.services.ghostscript_service import GhostscriptService
+    from domain.services.pdf_bbox_service import PdfBboxService
+
+    input_pdf_path = tmp_path / "input.pdf"
+    pdf = pikepdf.new()
+    pdf.add_blank_page(page_size=(200, 300))
+    pdf.save(input_pdf_path)
+
+    gs_calls = []
+
+    def fake_run_captured(cmd, cwd=None, on_line=None, tail_lines=200):
+        gs_calls.append(cmd)
+        return ["%%BoundingBox: 10 20 50 60", "%%HiResBoundingBox: 10.1 20.2 49.9 59.8"]
+
+    monkeypatch.setattr(ghostscript_service, "run_captured", fake_run_captured)
+    usecase = TrimPdfUseCase(
+        crop_service=PdfCropService(),
+        bbox_service=PdfBboxService(FileCache(tmp_path / "bbox"), GhostscriptService(pool_size=0)),
+    )
+
+    # Act
+    first = usecase.execute(CropRequest(pdf_path=input_pdf_path, margins=(0, 0, 0, 0)))
+    second = usecase.execute(CropRequest(pdf_path=input_pdf_path, margins=(5, 5, 5, 5)))
+
+    # Assert
+    assert len(gs_calls) == 1
+    assert "Computed bounding box." in first.logs
+    assert "Reused cached bounding box." in second.logs
+    with pikepdf.open(second.pdf_path) as cropped:
+        assert [float(v) for v in cropped.pages[0].mediabox] == [5, 15, 55, 65]